@@ -0,0 +1,30 @@
+"""transaction import hash
+
+Revision ID: 0002_transaction_import_hash
+Revises: 0001_initial
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_transaction_import_hash"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transactions", sa.Column("import_hash", sa.String(length=64), nullable=True)
+    )
+    op.create_index(
+        "ix_transactions_import_hash", "transactions", ["import_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_import_hash", table_name="transactions")
+    op.drop_column("transactions", "import_hash")
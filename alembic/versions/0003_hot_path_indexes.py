@@ -0,0 +1,56 @@
+"""hot path indexes
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_transaction_import_hash
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_hot_path_indexes"
+down_revision = "0002_transaction_import_hash"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    (
+        "ix_transactions_account_id_transaction_date",
+        "transactions",
+        ["account_id", "transaction_date"],
+    ),
+    (
+        "ix_transactions_category_id_transaction_date",
+        "transactions",
+        ["category_id", "transaction_date"],
+    ),
+    ("ix_accounts_user_id", "accounts", ["user_id"]),
+    ("ix_categories_user_id_parent_id", "categories", ["user_id", "parent_id"]),
+    ("ix_budgets_user_id", "budgets", ["user_id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on Postgres;
+    # the flag is ignored by other dialects.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
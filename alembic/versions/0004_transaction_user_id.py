@@ -0,0 +1,53 @@
+"""denormalized transaction user_id
+
+Revision ID: 0004_transaction_user_id
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_transaction_user_id"
+down_revision = "0003_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("transactions", sa.Column("user_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE transactions SET user_id = ("
+        "SELECT accounts.user_id FROM accounts "
+        "WHERE accounts.id = transactions.account_id)"
+    )
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.alter_column("user_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            "fk_transactions_user_id", "users", ["user_id"], ["id"]
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_user_id_transaction_date_id",
+            "transactions",
+            ["user_id", "transaction_date", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_user_id_transaction_date_id",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_constraint("fk_transactions_user_id", type_="foreignkey")
+        batch_op.drop_column("user_id")
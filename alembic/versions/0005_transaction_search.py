@@ -0,0 +1,43 @@
+"""transaction search indexes
+
+Revision ID: 0005_transaction_search
+Revises: 0004_transaction_user_id
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_transaction_search"
+down_revision = "0004_transaction_user_id"
+branch_labels = None
+depends_on = None
+
+# Must match app.modules.transactions.search.search_document().
+DOCUMENT = "coalesce(merchant, '') || ' ' || coalesce(description, '')"
+
+
+def upgrade() -> None:
+    # Full-text and trigram indexes are Postgres-only; other dialects use the
+    # in-process fallback in app.modules.transactions.search.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_search_tsv "
+            "ON transactions USING gin "
+            f"(to_tsvector('portuguese'::regconfig, {DOCUMENT}))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_search_trgm "
+            f"ON transactions USING gin (lower({DOCUMENT}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_transactions_search_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_transactions_search_tsv")
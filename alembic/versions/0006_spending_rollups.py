@@ -0,0 +1,72 @@
+"""spending rollups
+
+Revision ID: 0006_spending_rollups
+Revises: 0005_transaction_search
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_spending_rollups"
+down_revision = "0005_transaction_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "spending_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.String(length=7), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("min_amount", sa.Float(), nullable=False),
+        sa.Column("max_amount", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="fk_spending_rollups_user_id"
+        ),
+        sa.ForeignKeyConstraint(
+            ["account_id"], ["accounts.id"], name="fk_spending_rollups_account_id"
+        ),
+        sa.UniqueConstraint(
+            "user_id",
+            "account_id",
+            "category_id",
+            "month",
+            name="uq_spending_rollups_bucket",
+        ),
+    )
+    op.create_index(
+        "ix_spending_rollups_user_id_month",
+        "spending_rollups",
+        ["user_id", "month"],
+        unique=False,
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        month = "to_char(transaction_date, 'YYYY-MM')"
+    else:
+        month = "strftime('%Y-%m', transaction_date)"
+    # Same aggregation as app.modules.analytics.rollups.rebuild_spending_rollups.
+    op.execute(
+        "INSERT INTO spending_rollups (user_id, account_id, category_id, month, "
+        "total_amount, transaction_count, min_amount, max_amount) "
+        f"SELECT user_id, account_id, coalesce(category_id, 0), {month}, "
+        "sum(amount), count(*), min(amount), max(amount) "
+        "FROM transactions "
+        "WHERE transaction_date IS NOT NULL "
+        "AND (transaction_type IS NULL "
+        "OR transaction_type NOT IN ('pix_in', 'deposit')) "
+        f"GROUP BY user_id, account_id, coalesce(category_id, 0), {month}"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_spending_rollups_user_id_month", table_name="spending_rollups")
+    op.drop_table("spending_rollups")
@@ -0,0 +1,81 @@
+"""installment plans
+
+Revision ID: 0007_installment_plans
+Revises: 0006_spending_rollups
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_installment_plans"
+down_revision = "0006_spending_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "installment_plans",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("card_last4", sa.String(length=4), nullable=False),
+        sa.Column("merchant", sa.String(length=255), nullable=True),
+        sa.Column("merchant_key", sa.String(length=255), nullable=False),
+        sa.Column("installment_amount", sa.Float(), nullable=False),
+        sa.Column("amount_cents", sa.Integer(), nullable=False),
+        sa.Column("installments_total", sa.Integer(), nullable=False),
+        sa.Column("start_month", sa.String(length=7), nullable=False),
+        sa.Column("last_installment_seen", sa.Integer(), nullable=False),
+        sa.Column("parcel_count", sa.Integer(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="fk_installment_plans_user_id"
+        ),
+        sa.ForeignKeyConstraint(
+            ["account_id"], ["accounts.id"], name="fk_installment_plans_account_id"
+        ),
+        sa.UniqueConstraint(
+            "user_id",
+            "account_id",
+            "card_last4",
+            "merchant_key",
+            "amount_cents",
+            "installments_total",
+            "start_month",
+            name="uq_installment_plans_key",
+        ),
+    )
+    op.add_column(
+        "transactions",
+        sa.Column("installment_plan_id", sa.Integer(), nullable=True),
+    )
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.create_foreign_key(
+            "fk_transactions_installment_plan_id",
+            "installment_plans",
+            ["installment_plan_id"],
+            ["id"],
+        )
+    op.create_index(
+        "ix_transactions_installment_plan_id",
+        "transactions",
+        ["installment_plan_id"],
+        unique=False,
+    )
+    # Existing parcels are grouped by
+    # `python -m app.modules.installments.cli`, which needs the same merchant
+    # normalization as the ingest path.
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_installment_plan_id", table_name="transactions")
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_constraint(
+            "fk_transactions_installment_plan_id", type_="foreignkey"
+        )
+        batch_op.drop_column("installment_plan_id")
+    op.drop_table("installment_plans")
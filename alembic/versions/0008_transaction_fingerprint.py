@@ -0,0 +1,43 @@
+"""transaction fingerprint
+
+Revision ID: 0008_transaction_fingerprint
+Revises: 0007_installment_plans
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_transaction_fingerprint"
+down_revision = "0007_installment_plans"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transactions", sa.Column("fingerprint", sa.String(length=64), nullable=True)
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_user_id_fingerprint",
+            "transactions",
+            ["user_id", "fingerprint"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+    # Existing rows are fingerprinted by `python -m app.modules.transactions.cli`.
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_transactions_user_id_fingerprint",
+            table_name="transactions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("transactions", "fingerprint")
@@ -0,0 +1,60 @@
+"""account balances
+
+Revision ID: 0009_account_balances
+Revises: 0008_transaction_fingerprint
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009_account_balances"
+down_revision = "0008_transaction_fingerprint"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_balance_snapshots",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="fk_account_balance_snapshots_user_id"
+        ),
+        sa.ForeignKeyConstraint(
+            ["account_id"],
+            ["accounts.id"],
+            name="fk_account_balance_snapshots_account_id",
+        ),
+        sa.UniqueConstraint(
+            "account_id", "snapshot_date", name="uq_account_balance_snapshots_day"
+        ),
+    )
+    op.create_index(
+        "ix_account_balance_snapshots_user_id_snapshot_date",
+        "account_balance_snapshots",
+        ["user_id", "snapshot_date"],
+        unique=False,
+    )
+
+    # Same sum as app.modules.accounts.balances.rebuild_balances.
+    op.execute(
+        "UPDATE accounts SET last_balance = ("
+        "SELECT coalesce(sum(CASE WHEN transaction_type IN ('pix_in', 'deposit') "
+        "THEN amount ELSE -amount END), 0) "
+        "FROM transactions WHERE transactions.account_id = accounts.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_account_balance_snapshots_user_id_snapshot_date",
+        table_name="account_balance_snapshots",
+    )
+    op.drop_table("account_balance_snapshots")
@@ -0,0 +1,138 @@
+"""transaction partitions
+
+Revision ID: 0010_transaction_partitions
+Revises: 0009_account_balances
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+from app.core.config import settings
+from app.modules.transactions.partitions import (
+    DEFAULT_PARTITION,
+    PARTITION_INTERVALS,
+    ensure_transaction_partitions,
+    is_partitioned,
+    partition_ranges,
+)
+
+# revision identifiers, used by Alembic.
+revision = "0010_transaction_partitions"
+down_revision = "0009_account_balances"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Opt-in and Postgres-only: set TRANSACTIONS_PARTITION_INTERVAL=month|year
+    # before upgrading. To enable it later, downgrade to 0009 and upgrade again.
+    bind = op.get_bind()
+    interval = settings.transactions_partition_interval
+    if (
+        bind.dialect.name != "postgresql"
+        or interval not in PARTITION_INTERVALS
+        or is_partitioned(bind)
+    ):
+        return
+
+    op.execute("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE")
+    # The partition key must be part of the primary key, so it can't be NULL.
+    op.execute(
+        "UPDATE transactions SET transaction_date = now() "
+        "WHERE transaction_date IS NULL"
+    )
+    op.execute(
+        "CREATE TABLE transactions_partitioned "
+        "(LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (transaction_date)"
+    )
+    op.execute(
+        "ALTER TABLE transactions_partitioned "
+        "ALTER COLUMN transaction_date SET NOT NULL"
+    )
+    op.execute(
+        f"CREATE TABLE {DEFAULT_PARTITION} "
+        "PARTITION OF transactions_partitioned DEFAULT"
+    )
+    first, last = bind.exec_driver_sql(
+        "SELECT min(transaction_date)::date, max(transaction_date)::date "
+        "FROM transactions"
+    ).one()
+    if first is not None:
+        for name, start, end in partition_ranges(first, last, interval):
+            op.execute(
+                f"CREATE TABLE {name} PARTITION OF transactions_partitioned "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+    op.execute("INSERT INTO transactions_partitioned SELECT * FROM transactions")
+
+    indexes, foreign_keys = _secondary_definitions(bind)
+    _swap_tables(bind, "transactions_partitioned")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_pkey "
+        "PRIMARY KEY (id, transaction_date)"
+    )
+    _restore_definitions(indexes, foreign_keys)
+    ensure_transaction_partitions(bind, interval=interval)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if not is_partitioned(bind):
+        return
+
+    op.execute("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TABLE transactions_unpartitioned "
+        "(LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute(
+        "ALTER TABLE transactions_unpartitioned "
+        "ALTER COLUMN transaction_date DROP NOT NULL"
+    )
+    op.execute("INSERT INTO transactions_unpartitioned SELECT * FROM transactions")
+
+    indexes, foreign_keys = _secondary_definitions(bind)
+    _swap_tables(bind, "transactions_unpartitioned")
+    op.execute(
+        "ALTER TABLE transactions ADD CONSTRAINT transactions_pkey PRIMARY KEY (id)"
+    )
+    _restore_definitions(indexes, foreign_keys)
+
+
+def _secondary_definitions(bind) -> tuple[list[str], list[tuple[str, str]]]:
+    """Index and foreign key DDL of ``transactions``, minus the primary key."""
+    indexes = [
+        definition.replace(" ON ONLY ", " ON ")
+        for (definition,) in bind.exec_driver_sql(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = 'transactions'::regclass AND NOT indisprimary"
+        )
+    ]
+    foreign_keys = bind.exec_driver_sql(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = 'transactions'::regclass AND contype = 'f'"
+    ).all()
+    return indexes, foreign_keys
+
+
+def _swap_tables(bind, replacement: str) -> None:
+    # The id sequence belongs to the old table; keep it across the drop.
+    (sequence,) = bind.exec_driver_sql(
+        "SELECT pg_get_serial_sequence('transactions', 'id')"
+    ).one()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute("DROP TABLE transactions CASCADE")
+    op.execute(f"ALTER TABLE {replacement} RENAME TO transactions")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY transactions.id")
+
+
+def _restore_definitions(
+    indexes: list[str], foreign_keys: list[tuple[str, str]]
+) -> None:
+    # Definitions name "transactions", which is now the replacement table.
+    for definition in indexes:
+        op.execute(definition)
+    for name, definition in foreign_keys:
+        op.execute(f"ALTER TABLE transactions ADD CONSTRAINT {name} {definition}")
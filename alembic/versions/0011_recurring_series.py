@@ -0,0 +1,66 @@
+"""recurring series
+
+Revision ID: 0011_recurring_series
+Revises: 0010_transaction_partitions
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011_recurring_series"
+down_revision = "0010_transaction_partitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recurring_series",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("merchant", sa.String(length=255), nullable=True),
+        sa.Column("merchant_key", sa.String(length=255), nullable=False),
+        sa.Column("occurrence_count", sa.Integer(), nullable=False),
+        sa.Column("first_seen_at", sa.DateTime(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=False),
+        sa.Column("last_amount", sa.Float(), nullable=False),
+        sa.Column("amount_sum", sa.Float(), nullable=False),
+        sa.Column("amount_sq_sum", sa.Float(), nullable=False),
+        sa.Column("interval_sum", sa.Float(), nullable=False),
+        sa.Column("interval_sq_sum", sa.Float(), nullable=False),
+        sa.Column("cadence", sa.String(length=16), nullable=True),
+        sa.Column("next_expected_date", sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="fk_recurring_series_user_id"
+        ),
+        sa.ForeignKeyConstraint(
+            ["account_id"], ["accounts.id"], name="fk_recurring_series_account_id"
+        ),
+        sa.UniqueConstraint("user_id", "merchant_key", name="uq_recurring_series_key"),
+    )
+    op.create_index(
+        "ix_recurring_series_user_id_next_expected_date",
+        "recurring_series",
+        ["user_id", "next_expected_date"],
+        unique=False,
+    )
+    op.create_table(
+        "job_watermarks",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("last_transaction_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    # Series are filled by `python -m app.modules.recurring.cli`.
+
+
+def downgrade() -> None:
+    op.drop_table("job_watermarks")
+    op.drop_index(
+        "ix_recurring_series_user_id_next_expected_date",
+        table_name="recurring_series",
+    )
+    op.drop_table("recurring_series")
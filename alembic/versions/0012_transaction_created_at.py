@@ -0,0 +1,49 @@
+"""transaction created_at
+
+Revision ID: 0012_transaction_created_at
+Revises: 0011_recurring_series
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012_transaction_created_at"
+down_revision = "0011_recurring_series"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transactions",
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    # Not concurrently: the table may be partitioned (0010).
+    op.create_index(
+        "ix_transactions_created_at_id",
+        "transactions",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.add_column(
+        "job_watermarks", sa.Column("last_created_at", sa.DateTime(), nullable=True)
+    )
+    # Existing rows all get the upgrade time, so the recurring watermark can't
+    # be carried over: drop it and its series, and the next run of
+    # `python -m app.modules.recurring.cli` rebuilds them.
+    op.execute("DELETE FROM job_watermarks WHERE name = 'recurring'")
+    op.execute("DELETE FROM recurring_series")
+
+
+def downgrade() -> None:
+    op.drop_column("job_watermarks", "last_created_at")
+    op.drop_index("ix_transactions_created_at_id", table_name="transactions")
+    op.drop_column("transactions", "created_at")
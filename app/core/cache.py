@@ -0,0 +1,29 @@
+"""Shared Redis client for cross-request caches.
+
+Redis only ever holds derived data here, so callers treat ``RedisError`` as
+a cache miss and fall back to the database instead of failing the request.
+"""
+
+import redis
+
+from app.core.config import settings
+
+_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.cache_socket_timeout_seconds,
+            socket_connect_timeout=settings.cache_socket_timeout_seconds,
+        )
+    return _client
+
+
+def set_redis(client: redis.Redis | None) -> None:
+    """Swap the shared client (tests install a fakeredis instance)."""
+    global _client
+    _client = client
@@ -9,6 +9,23 @@ class Settings(BaseSettings):
     secret_key: str
     access_token_expire_minutes: int = 60
 
+    # List endpoints count with COUNT(*) OVER() until a result set grows past
+    # this size; larger totals are cached and reused instead of recounted.
+    pagination_exact_count_threshold: int = 10000
+    pagination_count_cache_ttl_seconds: int = 300
+    pagination_count_cache_max_entries: int = 1024
+
+    # Redis backs derived caches only; give up quickly when it is unreachable.
+    cache_socket_timeout_seconds: float = 0.5
+
+    # "month" or "year" partitions transactions by transaction_date on
+    # Postgres (see app.modules.transactions.partitions); empty disables it.
+    transactions_partition_interval: str = ""
+
+    # Percentages of a budget's limit that trigger an alert once per window
+    # (JSON list in the environment, e.g. BUDGET_ALERT_THRESHOLDS=[80,100]).
+    budget_alert_thresholds: list[int] = [80, 100]
+
     # Gmail OAuth settings (optional - can also use env vars directly)
     gmail_client_id: str = ""
     gmail_client_secret: str = ""
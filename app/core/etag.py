@@ -0,0 +1,134 @@
+"""Conditional GET for list and detail endpoints.
+
+Every user has one version counter per resource in Redis. Writes call
+``touch`` and the counters are bumped once the database transaction commits;
+reads derive a weak ETag from the counters and the request URL, so a
+matching ``If-None-Match`` is answered with 304 before the endpoint runs its
+query. Without Redis no ETag is sent and requests are served as usual.
+Server-side caches of derived data key on the same counters (see
+``resource_versions``).
+"""
+
+import hashlib
+import logging
+import time
+
+from fastapi import Depends, HTTPException, Request, Response
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis
+from app.models import User
+
+ACCOUNTS = "accounts"
+BUDGETS = "budgets"
+CATEGORIES = "categories"
+RECURRING = "recurring"
+TRANSACTIONS = "transactions"
+
+CACHE_CONTROL = "private, no-cache"
+# Bounds how long a bump lost to a Redis outage can keep a stale ETag valid.
+VERSION_TTL_SECONDS = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+_PENDING = "etag_pending_versions"
+
+
+def touch(db: Session, user_id: int, *resources: str) -> None:
+    """Bump ``resources`` for ``user_id`` when ``db`` commits (now if idle)."""
+    keys = {_version_key(user_id, resource) for resource in resources}
+    if db.in_transaction():
+        db.info.setdefault(_PENDING, set()).update(keys)
+    else:
+        _bump(keys)
+
+
+def resource_versions(user_id: int, resources: tuple[str, ...]) -> list[str] | None:
+    """Current counters of ``resources``, or None when Redis is unavailable."""
+    keys = [_version_key(user_id, resource) for resource in resources]
+    try:
+        pipeline = get_redis().pipeline()
+        for key in keys:
+            # A missing counter (new user, eviction, TTL) restarts from the
+            # clock so it never reuses a version a client may still hold.
+            pipeline.set(key, _initial_version(), nx=True, ex=VERSION_TTL_SECONDS)
+            pipeline.get(key)
+        return pipeline.execute()[1::2]
+    except RedisError:
+        return None
+
+
+def current_etag(user_id: int, resources: tuple[str, ...], variant: str) -> str | None:
+    versions = resource_versions(user_id, resources)
+    if versions is None:
+        return None
+    basis = "|".join([str(user_id), variant, *versions])
+    return f'W/"{hashlib.sha1(basis.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison.
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_get(*resources: str):
+    """Dependency answering unchanged re-fetches of ``resources`` with 304."""
+    # Imported here: auth imports services that call ``touch``.
+    from app.modules.auth.router import get_current_user
+
+    def dependency(
+        request: Request,
+        response: Response,
+        current_user: User = Depends(get_current_user),
+    ) -> None:
+        variant = f"{request.url.path}?{request.url.query}"
+        etag = current_etag(current_user.id, resources, variant)
+        if etag is None:
+            return
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_pending(session: Session) -> None:
+    keys = session.info.pop(_PENDING, None)
+    if keys:
+        _bump(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def _bump(keys: set[str]) -> None:
+    try:
+        pipeline = get_redis().pipeline()
+        for key in sorted(keys):
+            pipeline.set(key, _initial_version(), nx=True)
+            pipeline.incr(key)
+            pipeline.expire(key, VERSION_TTL_SECONDS)
+        pipeline.execute()
+    except RedisError:
+        logger.warning("Could not bump ETag versions %s", sorted(keys))
+
+
+def _version_key(user_id: int, resource: str) -> str:
+    return f"etag:{user_id}:{resource}"
+
+
+def _initial_version() -> int:
+    return time.time_ns() // 1000
@@ -0,0 +1,32 @@
+"""Sparse fieldsets (``?fields=id,amount``) for list endpoints."""
+
+from fastapi import HTTPException, Query
+
+
+def sparse_fields(allowed: tuple[str, ...]):
+    """Dependency parsing ``fields=`` into a subset of ``allowed``.
+
+    ``id`` is always included so clients can still key the rows; without the
+    parameter every allowed field is returned. Unknown names are a 400.
+    """
+
+    def dependency(
+        fields: str | None = Query(
+            None,
+            description="Comma-separated subset of: " + ", ".join(allowed),
+        ),
+    ) -> tuple[str, ...]:
+        if fields is None or not fields.strip():
+            return allowed
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        requested.add("id")
+        # Keep the schema's field order so responses are stable.
+        return tuple(name for name in allowed if name in requested)
+
+    return dependency
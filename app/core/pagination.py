@@ -1,6 +1,19 @@
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 
 from fastapi import Query
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.etag import resource_versions
+
+# Totals above the exact-count threshold, keyed by the user's resource
+# versions and the compiled statement + params, least recently used first.
+_total_cache: "OrderedDict[str, tuple[float, int]]" = OrderedDict()
+# (user_id, resources) scopes that have returned a total above the threshold.
+# Only their queries pay for a cache key; small lists never touch Redis.
+_large_scopes: "OrderedDict[tuple[int, tuple[str, ...]], None]" = OrderedDict()
 
 
 @dataclass(frozen=True)
@@ -16,7 +29,101 @@ def get_pagination_params(
     return PaginationParams(skip=skip, limit=limit)
 
 
-def paginate_query(query, skip: int, limit: int):
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+def paginate_query(
+    query,
+    skip: int,
+    limit: int,
+    user_id: int | None = None,
+    resources: tuple[str, ...] = (),
+):
+    """Return one page of ``query`` and the total row count.
+
+    The page and its total come back from a single statement using
+    ``COUNT(*) OVER()``. Once a total crosses
+    ``settings.pagination_exact_count_threshold`` it is cached for
+    ``settings.pagination_count_cache_ttl_seconds`` and later pages skip the
+    window count entirely, since counting a large set costs more than the page.
+    Totals are only cached for callers naming the ETag ``resources`` the
+    query reads, whose ``user_id`` versions are part of the key so a write
+    drops them; at most ``settings.pagination_count_cache_max_entries`` are
+    kept per process. Building that key costs a Redis round trip and a
+    statement compile, so it is skipped until the user's scope has returned
+    a large total once: the first large page is counted, later ones cached.
+
+    A query over one entity yields its objects; a column projection yields
+    one tuple of column values per row.
+    """
+    descriptions = query.column_descriptions
+    single_entity = (
+        len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]
+    )
+    scope = (user_id, resources) if user_id is not None and resources else None
+    key = None
+    if scope is not None and scope in _large_scopes:
+        _large_scopes.move_to_end(scope)
+        key = _cache_key(query, user_id, resources)
+    cached_total = _get_cached_total(key)
+    if cached_total is not None:
+        items = query.offset(skip).limit(limit).all()
+        if not single_entity:
+            items = [tuple(row) for row in items]
+        return items, cached_total
+
+    rows = (
+        query.add_columns(func.count().over().label("_total"))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    if rows:
+        if single_entity:
+            items = [row[0] for row in rows]
+        else:
+            items = [tuple(row[:-1]) for row in rows]
+        total = rows[0][-1]
+    elif skip == 0:
+        items, total = [], 0
+    else:
+        # Past the last page the window has nothing to report on.
+        items, total = [], query.order_by(None).count()
+
+    if scope is not None and total >= settings.pagination_exact_count_threshold:
+        _remember(_large_scopes, scope, None)
+        if key is not None:
+            _remember(_total_cache, key, (time.monotonic(), total))
     return items, total
+
+
+def clear_count_cache() -> None:
+    _total_cache.clear()
+    _large_scopes.clear()
+
+
+def _remember(cache: OrderedDict, key, value) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > settings.pagination_count_cache_max_entries:
+        cache.popitem(last=False)
+
+
+def _cache_key(query, user_id: int, resources: tuple[str, ...]) -> str | None:
+    versions = resource_versions(user_id, resources)
+    if versions is None:
+        return None
+    compiled = query.statement.compile()
+    return (
+        f"{user_id}|{'|'.join(versions)}|{compiled}|"
+        f"{sorted(compiled.params.items())!r}"
+    )
+
+
+def _get_cached_total(key: str | None) -> int | None:
+    entry = _total_cache.get(key) if key is not None else None
+    if entry is None:
+        return None
+    stored_at, total = entry
+    if time.monotonic() - stored_at > settings.pagination_count_cache_ttl_seconds:
+        _total_cache.pop(key, None)
+        return None
+    _total_cache.move_to_end(key)
+    return total
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -5,15 +7,29 @@ from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.modules.accounts.router import router as accounts_router
 from app.modules.ai_agent.router import router as ai_agent_router
+from app.modules.analytics.router import router as analytics_router
 from app.modules.auth.router import router as auth_router
 from app.modules.budgets.router import router as budgets_router
 from app.modules.categories.router import router as categories_router
 from app.modules.email_parser.router import router as email_parser_router
+from app.modules.forecast.router import router as forecast_router
 from app.modules.gmail_sync.router import router as gmail_sync_router
+from app.modules.installments.router import router as installments_router
 from app.modules.notifications.router import router as notifications_router
+from app.modules.recurring.router import router as recurring_router
+from app.modules.statement_import.router import router as statement_import_router
+from app.modules.transactions.partitions import create_upcoming_partitions
 from app.modules.transactions.router import router as transactions_router
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.transactions_partition_interval:
+        create_upcoming_partitions()
+    yield
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # Include API routers
 app.include_router(accounts_router)
@@ -25,6 +41,11 @@ app.include_router(ai_agent_router)
 app.include_router(notifications_router)
 app.include_router(gmail_sync_router)
 app.include_router(auth_router)
+app.include_router(statement_import_router)
+app.include_router(analytics_router)
+app.include_router(installments_router)
+app.include_router(recurring_router)
+app.include_router(forecast_router)
 
 # Serve static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
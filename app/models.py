@@ -1,8 +1,21 @@
 import enum
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    event,
+    select,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -40,10 +53,13 @@ class Account(Base):
     __tablename__ = "accounts"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
     bank_name: Mapped[str] = mapped_column(String(80), nullable=False)
     account_type: Mapped[AccountType] = mapped_column(Enum(AccountType), nullable=False)
     nickname: Mapped[Optional[str]] = mapped_column(String(120))
+    # Running sum of signed transaction amounts, see app.modules.accounts.balances.
     last_balance: Mapped[Optional[float]] = mapped_column(Float)
 
     user: Mapped["User"] = relationship(back_populates="accounts")
@@ -52,6 +68,7 @@ class Account(Base):
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (Index("ix_categories_user_id_parent_id", "user_id", "parent_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
@@ -83,8 +100,30 @@ class RawEmail(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index(
+            "ix_transactions_account_id_transaction_date",
+            "account_id",
+            "transaction_date",
+        ),
+        Index(
+            "ix_transactions_category_id_transaction_date",
+            "category_id",
+            "transaction_date",
+        ),
+        Index(
+            "ix_transactions_user_id_transaction_date_id",
+            "user_id",
+            "transaction_date",
+            "id",
+        ),
+        Index("ix_transactions_user_id_fingerprint", "user_id", "fingerprint"),
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Denormalized from accounts.user_id so user-scoped reads skip the join.
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
     amount: Mapped[float] = mapped_column(Float, nullable=False)
     merchant: Mapped[Optional[str]] = mapped_column(String(255))
@@ -100,6 +139,16 @@ class Transaction(Base):
     category_id: Mapped[Optional[int]] = mapped_column(ForeignKey("categories.id"))
     raw_email_id: Mapped[Optional[int]] = mapped_column(ForeignKey("raw_emails.id"))
     is_manual: Mapped[bool] = mapped_column(Boolean, default=False)
+    import_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)
+    # See app.modules.transactions.dedup.transaction_fingerprint.
+    fingerprint: Mapped[Optional[str]] = mapped_column(String(64))
+    installment_plan_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("installment_plans.id"), index=True
+    )
+    # Insert time; incremental jobs read new rows in (created_at, id) order.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=lambda: datetime.now(UTC)
+    )
 
     account: Mapped["Account"] = relationship(back_populates="transactions")
 
@@ -108,7 +157,9 @@ class Budget(Base):
     __tablename__ = "budgets"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
     category_id: Mapped[int] = mapped_column(
         ForeignKey("categories.id"), nullable=False
     )
@@ -120,3 +171,142 @@ class Budget(Base):
 
     user: Mapped["User"] = relationship(back_populates="budgets")
     category: Mapped["Category"] = relationship(back_populates="budgets")
+
+
+class SpendingRollup(Base):
+    __tablename__ = "spending_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "account_id",
+            "category_id",
+            "month",
+            name="uq_spending_rollups_bucket",
+        ),
+        Index("ix_spending_rollups_user_id_month", "user_id", "month"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    # 0 stands for "uncategorized": NULLs never collide in a unique key, which
+    # would break the upsert.
+    category_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    month: Mapped[str] = mapped_column(String(7), nullable=False)
+    total_amount: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    transaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    min_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    max_amount: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class InstallmentPlan(Base):
+    """One installment purchase, grouped from its parcels at ingest time."""
+
+    __tablename__ = "installment_plans"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "account_id",
+            "card_last4",
+            "merchant_key",
+            "amount_cents",
+            "installments_total",
+            "start_month",
+            name="uq_installment_plans_key",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    # "" when unknown, so the unique key still matches (NULLs never collide).
+    card_last4: Mapped[str] = mapped_column(String(4), nullable=False, default="")
+    merchant: Mapped[Optional[str]] = mapped_column(String(255))
+    merchant_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    installment_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+    installments_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_month: Mapped[str] = mapped_column(String(7), nullable=False)
+    last_installment_seen: Mapped[int] = mapped_column(Integer, nullable=False)
+    parcel_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+
+class AccountBalanceSnapshot(Base):
+    """Balance of an account at the end of ``snapshot_date``."""
+
+    __tablename__ = "account_balance_snapshots"
+    __table_args__ = (
+        UniqueConstraint(
+            "account_id", "snapshot_date", name="uq_account_balance_snapshots_day"
+        ),
+        Index(
+            "ix_account_balance_snapshots_user_id_snapshot_date",
+            "user_id",
+            "snapshot_date",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    snapshot_date: Mapped[date] = mapped_column(Date, nullable=False)
+    balance: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class RecurringSeries(Base):
+    """Charges from one merchant, with running stats for recurrence detection.
+
+    Every spending merchant seen by the detector gets a row; ``cadence`` is
+    only set once the charges look periodic. See
+    ``app.modules.recurring.detection``.
+    """
+
+    __tablename__ = "recurring_series"
+    __table_args__ = (
+        UniqueConstraint("user_id", "merchant_key", name="uq_recurring_series_key"),
+        Index(
+            "ix_recurring_series_user_id_next_expected_date",
+            "user_id",
+            "next_expected_date",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    merchant: Mapped[Optional[str]] = mapped_column(String(255))
+    merchant_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    occurrence_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_amount: Mapped[float] = mapped_column(Float, nullable=False)
+    amount_sum: Mapped[float] = mapped_column(Float, nullable=False)
+    amount_sq_sum: Mapped[float] = mapped_column(Float, nullable=False)
+    # Days between consecutive charges.
+    interval_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    interval_sq_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    cadence: Mapped[Optional[str]] = mapped_column(String(16))
+    next_expected_date: Mapped[Optional[date]] = mapped_column(Date)
+
+
+class JobWatermark(Base):
+    """Last transaction an incremental batch job has processed.
+
+    The position is the transaction's ``(created_at, id)``.
+    """
+
+    __tablename__ = "job_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_created_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    last_transaction_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+
+@event.listens_for(Transaction, "before_insert")
+def _fill_transaction_user_id(mapper, connection, target: Transaction) -> None:
+    if target.user_id is None and target.account_id is not None:
+        target.user_id = connection.scalar(
+            select(Account.user_id).where(Account.id == target.account_id)
+        )
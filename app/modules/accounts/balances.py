@@ -0,0 +1,292 @@
+"""Running account balances and daily balance snapshots.
+
+A transaction moves its account's balance by its signed amount: inflows
+(``INFLOW_TRANSACTION_TYPES``) add, everything else subtracts. Transaction
+writes report those moves through ``apply_balance_changes`` inside the same
+database transaction, which keeps ``accounts.last_balance`` current and
+shifts every snapshot taken on or after the transaction's day, so backdated
+entries never leave a stale snapshot behind. A balance at any moment starts
+from the nearest earlier snapshot and only sums the transactions since.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.etag import ACCOUNTS, touch
+from app.models import Account, AccountBalanceSnapshot, Transaction
+from app.modules.transactions.schemas import INFLOW_TRANSACTION_TYPES
+
+
+@dataclass(frozen=True)
+class BalanceEntry:
+    account_id: int
+    transaction_date: datetime | None
+    amount: float
+
+
+class BalanceAt(NamedTuple):
+    balance: float
+    snapshot_date: date | None
+
+
+def signed_amount(transaction_type: str | None, amount: float) -> float:
+    return amount if transaction_type in INFLOW_TRANSACTION_TYPES else -amount
+
+
+def signed_amount_expression():
+    """SQL counterpart of ``signed_amount``."""
+    return case(
+        (
+            Transaction.transaction_type.in_(INFLOW_TRANSACTION_TYPES),
+            Transaction.amount,
+        ),
+        else_=-Transaction.amount,
+    )
+
+
+def balance_entry(
+    account_id: int,
+    transaction_date: datetime | None,
+    transaction_type: str | None,
+    amount: float,
+) -> BalanceEntry:
+    return BalanceEntry(
+        account_id=account_id,
+        transaction_date=transaction_date,
+        amount=signed_amount(transaction_type, amount),
+    )
+
+
+def balance_entry_for_transaction(transaction: Transaction) -> BalanceEntry:
+    return balance_entry(
+        transaction.account_id,
+        transaction.transaction_date,
+        transaction.transaction_type,
+        transaction.amount,
+    )
+
+
+def balance_entry_for_row(row: dict) -> BalanceEntry:
+    return balance_entry(
+        row["account_id"],
+        row["transaction_date"],
+        row["transaction_type"],
+        row["amount"],
+    )
+
+
+def apply_balance_changes(
+    db: Session,
+    added: Iterable[BalanceEntry] = (),
+    removed: Iterable[BalanceEntry] = (),
+) -> None:
+    """Move ``last_balance`` and later snapshots by the net of the changes.
+
+    One UPDATE per touched account and one per (account, day); the caller
+    owns the commit.
+    """
+    accounts: dict[int, float] = defaultdict(float)
+    days: dict[tuple[int, date], float] = defaultdict(float)
+    for sign, entries in ((1, added), (-1, removed)):
+        for entry in entries:
+            accounts[entry.account_id] += sign * entry.amount
+            if entry.transaction_date is not None:
+                day = entry.transaction_date.date()
+                days[(entry.account_id, day)] += sign * entry.amount
+
+    options = {"synchronize_session": False}
+    for account_id, delta in accounts.items():
+        if delta:
+            db.execute(
+                update(Account)
+                .where(Account.id == account_id)
+                .values(last_balance=func.coalesce(Account.last_balance, 0.0) + delta),
+                execution_options=options,
+            )
+    for (account_id, day), delta in days.items():
+        if delta:
+            db.execute(
+                update(AccountBalanceSnapshot)
+                .where(
+                    AccountBalanceSnapshot.account_id == account_id,
+                    AccountBalanceSnapshot.snapshot_date >= day,
+                )
+                .values(balance=AccountBalanceSnapshot.balance + delta),
+                execution_options=options,
+            )
+
+
+def get_balance_at(db: Session, account_id: int, at: datetime) -> BalanceAt:
+    """Balance including every transaction dated up to ``at``."""
+    at = _naive_utc(at)
+    return _balance_until(
+        db,
+        account_id,
+        Transaction.transaction_date <= at,
+        latest_snapshot=(at - timedelta(days=1)).date(),
+    )
+
+
+def take_balance_snapshots(db: Session, day: date, user_id: int | None = None) -> int:
+    """Store every account's end-of-``day`` balance; returns the count.
+
+    Meant to run daily (see ``app.modules.accounts.cli``). Re-running a day
+    replaces its snapshots. The caller owns the commit.
+    """
+    query = db.query(Account.id, Account.user_id)
+    if user_id is not None:
+        query = query.filter(Account.user_id == user_id)
+    accounts = query.all()
+    if not accounts:
+        return 0
+
+    end = datetime.combine(day + timedelta(days=1), time.min)
+    rows = [
+        {
+            "user_id": owner_id,
+            "account_id": account_id,
+            "snapshot_date": day,
+            "balance": _balance_until(
+                db,
+                account_id,
+                Transaction.transaction_date < end,
+                latest_snapshot=day - timedelta(days=1),
+            ).balance,
+        }
+        for account_id, owner_id in accounts
+    ]
+    db.execute(
+        delete(AccountBalanceSnapshot).where(
+            AccountBalanceSnapshot.snapshot_date == day,
+            AccountBalanceSnapshot.account_id.in_([row["account_id"] for row in rows]),
+        )
+    )
+    db.execute(insert(AccountBalanceSnapshot), rows)
+    return len(rows)
+
+
+def get_net_worth_series(
+    db: Session, user_id: int, start: date, end: date
+) -> list[tuple[date, float]]:
+    """Sum of account balances on each snapshot day between start and end.
+
+    Accounts without a snapshot that day carry their previous one forward;
+    the series opens at ``start`` with the balances carried into the range.
+    """
+    latest = (
+        select(
+            AccountBalanceSnapshot.account_id,
+            func.max(AccountBalanceSnapshot.snapshot_date).label("snapshot_date"),
+        )
+        .where(
+            AccountBalanceSnapshot.user_id == user_id,
+            AccountBalanceSnapshot.snapshot_date < start,
+        )
+        .group_by(AccountBalanceSnapshot.account_id)
+        .subquery()
+    )
+    balances = dict(
+        db.execute(
+            select(
+                AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.balance
+            ).join(
+                latest,
+                (AccountBalanceSnapshot.account_id == latest.c.account_id)
+                & (AccountBalanceSnapshot.snapshot_date == latest.c.snapshot_date),
+            )
+        ).all()
+    )
+
+    points: list[tuple[date, float]] = []
+    if balances:
+        points.append((start, sum(balances.values())))
+    rows = db.execute(
+        select(
+            AccountBalanceSnapshot.snapshot_date,
+            AccountBalanceSnapshot.account_id,
+            AccountBalanceSnapshot.balance,
+        )
+        .where(
+            AccountBalanceSnapshot.user_id == user_id,
+            AccountBalanceSnapshot.snapshot_date >= start,
+            AccountBalanceSnapshot.snapshot_date <= end,
+        )
+        .order_by(AccountBalanceSnapshot.snapshot_date)
+    )
+    for snapshot_date, account_id, balance in rows:
+        balances[account_id] = balance
+        if points and points[-1][0] == snapshot_date:
+            points[-1] = (snapshot_date, sum(balances.values()))
+        else:
+            points.append((snapshot_date, sum(balances.values())))
+    return points
+
+
+def rebuild_balances(db: Session, user_id: int | None = None) -> int:
+    """Recompute ``last_balance`` and stored snapshots from ``transactions``.
+
+    Returns the number of accounts. The caller owns the commit.
+    """
+    total = select(func.coalesce(func.sum(signed_amount_expression()), 0.0))
+    accounts = update(Account).values(
+        last_balance=total.where(Transaction.account_id == Account.id).scalar_subquery()
+    )
+    snapshots = update(AccountBalanceSnapshot).values(
+        balance=total.where(
+            Transaction.account_id == AccountBalanceSnapshot.account_id,
+            func.date(Transaction.transaction_date)
+            <= AccountBalanceSnapshot.snapshot_date,
+        ).scalar_subquery()
+    )
+    if user_id is not None:
+        accounts = accounts.where(Account.user_id == user_id)
+        snapshots = snapshots.where(AccountBalanceSnapshot.user_id == user_id)
+    options = {"synchronize_session": False}
+    db.execute(snapshots, execution_options=options)
+    rebuilt = db.execute(accounts, execution_options=options).rowcount
+    owners = db.query(Account.user_id).distinct()
+    if user_id is not None:
+        owners = owners.filter(Account.user_id == user_id)
+    for (owner_id,) in owners:
+        touch(db, owner_id, ACCOUNTS)
+    return rebuilt
+
+
+def _balance_until(
+    db: Session, account_id: int, upper_bound, latest_snapshot: date
+) -> BalanceAt:
+    snapshot = (
+        db.query(AccountBalanceSnapshot.snapshot_date, AccountBalanceSnapshot.balance)
+        .filter(
+            AccountBalanceSnapshot.account_id == account_id,
+            AccountBalanceSnapshot.snapshot_date <= latest_snapshot,
+        )
+        .order_by(AccountBalanceSnapshot.snapshot_date.desc())
+        .first()
+    )
+    conditions = [Transaction.account_id == account_id, upper_bound]
+    base = 0.0
+    snapshot_date = None
+    if snapshot is not None:
+        snapshot_date, base = snapshot
+        conditions.append(
+            Transaction.transaction_date
+            >= datetime.combine(snapshot_date + timedelta(days=1), time.min)
+        )
+    delta = db.scalar(
+        select(func.coalesce(func.sum(signed_amount_expression()), 0.0)).where(
+            *conditions
+        )
+    )
+    return BalanceAt(balance=base + delta, snapshot_date=snapshot_date)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
@@ -0,0 +1,51 @@
+"""Take daily balance snapshots or rebuild account balances.
+
+Usage:
+    python -m app.modules.accounts.cli snapshot [--date 2026-10-18] [--user-id 1]
+    python -m app.modules.accounts.cli rebuild [--user-id 1]
+
+Schedule ``snapshot`` once a day (e.g. from cron, shortly after midnight);
+it defaults to yesterday's closing balances.
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from app.core.database import SessionLocal
+from app.modules.accounts.balances import rebuild_balances, take_balance_snapshots
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain account balances.")
+    parser.add_argument("command", choices=["snapshot", "rebuild"])
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=None,
+        help="Snapshot day (YYYY-MM-DD), defaults to yesterday",
+    )
+    parser.add_argument(
+        "--user-id", type=int, default=None, help="Only this user's accounts"
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "snapshot":
+            day = args.date or date.today() - timedelta(days=1)
+            count = take_balance_snapshots(db, day, user_id=args.user_id)
+            message = f"Stored {count} balance snapshots for {day.isoformat()}."
+        else:
+            count = rebuild_balances(db, user_id=args.user_id)
+            message = f"Rebuilt balances of {count} accounts."
+        db.commit()
+    finally:
+        db.close()
+
+    print(message)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.etag import ACCOUNTS, conditional_get
+from app.core.fields import sparse_fields
 from app.core.pagination import PaginationParams, get_pagination_params
 from app.models import User
 from app.modules.accounts.schemas import (
+    AccountBalance,
     AccountCreate,
     AccountListResponse,
     AccountRead,
     AccountUpdate,
+    NetWorthResponse,
 )
 from app.modules.accounts.service import (
+    ACCOUNT_READ_FIELDS,
     create_account,
     delete_account,
     get_account,
+    get_account_balance,
+    get_net_worth,
     list_accounts,
     update_account,
 )
@@ -31,27 +41,72 @@ def create(
     return create_account(db, user_id=current_user.id, payload=payload)
 
 
-@router.get("/", response_model=AccountListResponse)
+@router.get(
+    "/",
+    response_model=AccountListResponse,
+    dependencies=[Depends(conditional_get(ACCOUNTS))],
+)
 def list_all(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     pagination: PaginationParams = Depends(get_pagination_params),
+    fields: tuple[str, ...] = Depends(sparse_fields(ACCOUNT_READ_FIELDS)),
 ):
     items, total = list_accounts(
         db,
         user_id=current_user.id,
         skip=pagination.skip,
         limit=pagination.limit,
+        fields=fields,
+    )
+    # Same projected-dict path as GET /transactions.
+    return ORJSONResponse(
+        {
+            "items": items,
+            "total": total,
+            "skip": pagination.skip,
+            "limit": pagination.limit,
+        },
+        headers=dict(response.headers),
     )
-    return {
-        "items": items,
-        "total": total,
-        "skip": pagination.skip,
-        "limit": pagination.limit,
-    }
 
 
-@router.get("/{account_id}", response_model=AccountRead)
+@router.get("/net-worth", response_model=NetWorthResponse)
+def net_worth(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        return get_net_worth(
+            db, user_id=current_user.id, start_date=start_date, end_date=end_date
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/{account_id}/balance", response_model=AccountBalance)
+def balance(
+    account_id: int,
+    at: datetime | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = get_account_balance(
+        db, user_id=current_user.id, account_id=account_id, at=at
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return result
+
+
+@router.get(
+    "/{account_id}",
+    response_model=AccountRead,
+    dependencies=[Depends(conditional_get(ACCOUNTS))],
+)
 def get_by_id(
     account_id: int,
     db: Session = Depends(get_db),
@@ -1,3 +1,5 @@
+from datetime import date, datetime
+
 from pydantic import BaseModel
 
 from app.models import AccountType
@@ -14,6 +16,7 @@ class AccountRead(BaseModel):
     bank_name: str
     account_type: AccountType
     nickname: str | None = None
+    last_balance: float | None = None
 
     class Config:
         from_attributes = True
@@ -30,3 +33,22 @@ class AccountListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+
+
+class AccountBalance(BaseModel):
+    account_id: int
+    at: datetime | None = None
+    balance: float
+    snapshot_date: date | None = None
+
+
+class NetWorthPoint(BaseModel):
+    day: date
+    net_worth: float
+
+
+class NetWorthResponse(BaseModel):
+    start_date: date
+    end_date: date
+    current_net_worth: float
+    points: list[NetWorthPoint]
@@ -1,8 +1,37 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.etag import ACCOUNTS, touch
 from app.core.pagination import paginate_query
-from app.models import Account, AccountType
-from app.modules.accounts.schemas import AccountCreate, AccountUpdate
+from app.models import (
+    Account,
+    AccountBalanceSnapshot,
+    AccountType,
+    InstallmentPlan,
+    RecurringSeries,
+    SpendingRollup,
+)
+from app.modules.accounts.balances import get_balance_at, get_net_worth_series
+from app.modules.accounts.schemas import (
+    AccountBalance,
+    AccountCreate,
+    AccountRead,
+    AccountUpdate,
+    NetWorthPoint,
+    NetWorthResponse,
+)
+
+ACCOUNT_READ_FIELDS = tuple(AccountRead.model_fields)
+# Rows derived from an account's transactions, removed along with it.
+ACCOUNT_DERIVED_MODELS = (
+    AccountBalanceSnapshot,
+    InstallmentPlan,
+    RecurringSeries,
+    SpendingRollup,
+)
+DEFAULT_NET_WORTH_DAYS = 365
 
 
 def create_account(db: Session, user_id: int, payload: AccountCreate) -> Account:
@@ -13,16 +42,26 @@ def create_account(db: Session, user_id: int, payload: AccountCreate) -> Account
         nickname=payload.nickname,
     )
     db.add(account)
+    touch(db, user_id, ACCOUNTS)
     db.commit()
     db.refresh(account)
     return account
 
 
 def list_accounts(
-    db: Session, user_id: int, skip: int, limit: int
-) -> tuple[list[Account], int]:
-    query = db.query(Account).filter(Account.user_id == user_id)
-    return paginate_query(query, skip=skip, limit=limit)
+    db: Session,
+    user_id: int,
+    skip: int,
+    limit: int,
+    fields: tuple[str, ...] = ACCOUNT_READ_FIELDS,
+) -> tuple[list[dict], int]:
+    """One page of the user's accounts as dicts holding only ``fields``."""
+    columns = [getattr(Account, field) for field in fields]
+    query = db.query(*columns).filter(Account.user_id == user_id)
+    rows, total = paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(ACCOUNTS,)
+    )
+    return [dict(zip(fields, row)) for row in rows], total
 
 
 def get_account(db: Session, user_id: int, account_id: int) -> Account | None:
@@ -50,6 +89,7 @@ def update_account(
     if payload.nickname is not None:
         account.nickname = payload.nickname
 
+    touch(db, user_id, ACCOUNTS)
     db.commit()
     db.refresh(account)
     return account
@@ -59,6 +99,56 @@ def delete_account(db: Session, user_id: int, account_id: int) -> bool:
     account = get_account(db, user_id=user_id, account_id=account_id)
     if not account:
         return False
+    for model in ACCOUNT_DERIVED_MODELS:
+        db.query(model).filter(model.account_id == account.id).delete(
+            synchronize_session=False
+        )
     db.delete(account)
+    touch(db, user_id, ACCOUNTS)
     db.commit()
     return True
+
+
+def get_account_balance(
+    db: Session, user_id: int, account_id: int, at: datetime | None = None
+) -> AccountBalance | None:
+    """Current balance, or the balance at ``at`` from the nearest snapshot."""
+    account = get_account(db, user_id=user_id, account_id=account_id)
+    if not account:
+        return None
+    if at is None:
+        return AccountBalance(
+            account_id=account.id, balance=account.last_balance or 0.0
+        )
+    balance, snapshot_date = get_balance_at(db, account.id, at)
+    return AccountBalance(
+        account_id=account.id,
+        at=at,
+        balance=balance,
+        snapshot_date=snapshot_date,
+    )
+
+
+def get_net_worth(
+    db: Session,
+    user_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> NetWorthResponse:
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_NET_WORTH_DAYS)
+    if start_date > end_date:
+        raise ValueError("start_date must be on or before end_date")
+
+    current = (
+        db.query(func.coalesce(func.sum(Account.last_balance), 0.0))
+        .filter(Account.user_id == user_id)
+        .scalar()
+    )
+    points = get_net_worth_series(db, user_id, start_date, end_date)
+    return NetWorthResponse(
+        start_date=start_date,
+        end_date=end_date,
+        current_net_worth=current,
+        points=[NetWorthPoint(day=day, net_worth=value) for day, value in points],
+    )
@@ -1,22 +1,34 @@
 from sqlalchemy.orm import Session
 
+from app.core.etag import CATEGORIES, touch
 from app.models import Category
 from app.modules.ai_agent.rules import RULES, normalize
 from app.modules.ai_agent.schemas import CategorizationRequest, CategorizationResponse
+from app.modules.categories.index import (
+    CategoryIndex,
+    get_category_index,
+    invalidate_category_index,
+)
+
+# Keywords are normalized once at import instead of on every categorization.
+_NORMALIZED_KEYWORDS = [
+    (rule, keyword, normalize(keyword))
+    for rule in RULES
+    for keyword in rule.keywords
+    if normalize(keyword)
+]
 
 
 def categorize_transaction(payload: CategorizationRequest) -> CategorizationResponse:
     text = normalize(f"{payload.merchant or ''} {payload.description or ''}")
-    for rule in RULES:
-        for keyword in rule.keywords:
-            normalized_keyword = normalize(keyword)
-            if normalized_keyword and normalized_keyword in text:
-                return CategorizationResponse(
-                    category_id=None,
-                    category_name=rule.category,
-                    subcategory_name=rule.subcategory,
-                    reason=f"Regra por palavra-chave: {keyword}",
-                )
+    for rule, keyword, normalized_keyword in _NORMALIZED_KEYWORDS:
+        if normalized_keyword in text:
+            return CategorizationResponse(
+                category_id=None,
+                category_name=rule.category,
+                subcategory_name=rule.subcategory,
+                reason=f"Regra por palavra-chave: {keyword}",
+            )
     return CategorizationResponse(
         category_id=None,
         category_name="Outros",
@@ -25,59 +37,82 @@ def categorize_transaction(payload: CategorizationRequest) -> CategorizationResp
     )
 
 
-def _find_category(
-    categories: list[Category],
-    name: str,
-    parent_id: int | None = None,
-) -> Category | None:
-    target = normalize(name)
-    for category in categories:
-        if parent_id is None:
-            if category.parent_id is not None:
-                continue
-        else:
-            if category.parent_id != parent_id:
-                continue
-        if normalize(category.name) == target:
-            return category
-    return None
-
-
 def categorize_with_db(
     db: Session,
     user_id: int,
     merchant: str | None,
     description: str | None,
 ) -> CategorizationResponse:
-    response = categorize_transaction(
-        CategorizationRequest(merchant=merchant, description=description)
-    )
-    if not response.category_name:
-        return response
+    return categorize_many_with_db(db, user_id, [(merchant, description)])[0]
+
+
+def categorize_many_with_db(
+    db: Session,
+    user_id: int,
+    entries: list[tuple[str | None, str | None]],
+) -> list[CategorizationResponse]:
+    """Categorize many (merchant, description) pairs.
 
-    categories = db.query(Category).filter(Category.user_id == user_id).all()
-    parent = _find_category(categories, response.category_name, parent_id=None)
+    Rule matches resolve against the user's cached ``CategoryIndex``, so a
+    call makes no category queries unless it has to create an "Outros"
+    category. Identical texts and rule matches are resolved once per call.
+    """
+    index: CategoryIndex | None = None
+    by_text: dict[tuple[str | None, str | None], CategorizationResponse] = {}
+    by_rule: dict[tuple[str, str | None], int | None] = {}
+    results: list[CategorizationResponse] = []
+
+    for merchant, description in entries:
+        key = (merchant, description)
+        response = by_text.get(key)
+        if response is None:
+            response = categorize_transaction(
+                CategorizationRequest(merchant=merchant, description=description)
+            )
+            if response.category_name:
+                rule_key = (response.category_name, response.subcategory_name)
+                if rule_key not in by_rule:
+                    if index is None:
+                        index = get_category_index(db, user_id)
+                    by_rule[rule_key], index = _resolve_category_id(
+                        db, user_id, index, response
+                    )
+                response.category_id = by_rule[rule_key]
+            by_text[key] = response
+        results.append(response.model_copy())
+    return results
+
+
+def _resolve_category_id(
+    db: Session,
+    user_id: int,
+    index: CategoryIndex,
+    response: CategorizationResponse,
+) -> tuple[int | None, CategoryIndex]:
+    """The category id for ``response`` and the index, reloaded if it grew."""
+    parent = index.find(response.category_name)
 
     if not parent and response.category_name == "Outros":
-        parent = Category(user_id=user_id, name="Outros")
-        db.add(parent)
-        db.commit()
-        db.refresh(parent)
-        categories.append(parent)
+        index = _create_category(db, user_id, "Outros")
+        parent = index.find("Outros")
 
     selected = parent
     if response.subcategory_name and parent:
-        child = _find_category(
-            categories, response.subcategory_name, parent_id=parent.id
-        )
+        child = index.find(response.subcategory_name, parent_id=parent.id)
         if not child and response.subcategory_name == "Outros":
-            child = Category(user_id=user_id, name="Outros", parent_id=parent.id)
-            db.add(child)
-            db.commit()
-            db.refresh(child)
-            categories.append(child)
+            index = _create_category(db, user_id, "Outros", parent_id=parent.id)
+            child = index.find("Outros", parent_id=parent.id)
         if child:
             selected = child
 
-    response.category_id = selected.id if selected else None
-    return response
+    return (selected.id if selected else None), index
+
+
+def _create_category(
+    db: Session, user_id: int, name: str, parent_id: int | None = None
+) -> CategoryIndex:
+    db.add(Category(user_id=user_id, name=name, parent_id=parent_id))
+    touch(db, user_id, CATEGORIES)
+    db.commit()
+    invalidate_category_index(user_id)
+    return get_category_index(db, user_id)
@@ -0,0 +1,35 @@
+"""Rebuild spending rollups from the transactions table.
+
+Usage:
+    python -m app.modules.analytics.cli [--user-id 1]
+"""
+
+import argparse
+import sys
+
+from app.core.database import SessionLocal
+from app.modules.analytics.rollups import rebuild_spending_rollups
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Recompute spending_rollups to repair drift."
+    )
+    parser.add_argument(
+        "--user-id", type=int, default=None, help="Only rebuild this user's rollups"
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        buckets = rebuild_spending_rollups(db, user_id=args.user_id)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Rebuilt {buckets} rollup buckets.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
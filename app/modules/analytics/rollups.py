@@ -0,0 +1,299 @@
+"""Incrementally maintained monthly spending rollups.
+
+``spending_rollups`` keeps one row per (user, account, category, month) with
+the sum, count, min and max of spending amounts. Every transaction write
+reports the buckets it leaves and enters through ``apply_rollup_changes``
+inside the same database transaction, so monthly and category reports read a
+few hundred rollup rows instead of scanning the whole history.
+``rebuild_spending_rollups`` recomputes everything from ``transactions`` to
+repair drift.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import SpendingRollup, Transaction
+from app.modules.transactions.schemas import INFLOW_TRANSACTION_TYPES
+
+UNCATEGORIZED = 0
+
+
+@dataclass(frozen=True)
+class RollupEntry:
+    user_id: int
+    account_id: int
+    category_id: int
+    month: str
+    amount: float
+
+    @property
+    def bucket(self) -> tuple[int, int, int, str]:
+        return self.user_id, self.account_id, self.category_id, self.month
+
+
+def month_key(value: datetime) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def rollup_entry(
+    user_id: int,
+    account_id: int,
+    category_id: int | None,
+    transaction_date: datetime | None,
+    transaction_type: str | None,
+    amount: float,
+) -> RollupEntry | None:
+    """The rollup contribution of one transaction, or None if it isn't spending."""
+    if transaction_date is None or transaction_type in INFLOW_TRANSACTION_TYPES:
+        return None
+    return RollupEntry(
+        user_id=user_id,
+        account_id=account_id,
+        category_id=category_id or UNCATEGORIZED,
+        month=month_key(transaction_date),
+        amount=amount,
+    )
+
+
+def spending_condition():
+    """SQL counterpart of the inflow check in ``rollup_entry``."""
+    return or_(
+        Transaction.transaction_type.is_(None),
+        Transaction.transaction_type.not_in(INFLOW_TRANSACTION_TYPES),
+    )
+
+
+def entry_for_transaction(transaction: Transaction) -> RollupEntry | None:
+    return rollup_entry(
+        transaction.user_id,
+        transaction.account_id,
+        transaction.category_id,
+        transaction.transaction_date,
+        transaction.transaction_type,
+        transaction.amount,
+    )
+
+
+def entry_for_row(row: dict) -> RollupEntry | None:
+    return rollup_entry(
+        row["user_id"],
+        row["account_id"],
+        row["category_id"],
+        row["transaction_date"],
+        row["transaction_type"],
+        row["amount"],
+    )
+
+
+def apply_rollup_changes(
+    db: Session,
+    added: Iterable[RollupEntry | None] = (),
+    removed: Iterable[RollupEntry | None] = (),
+) -> None:
+    """Fold transaction writes into their rollup buckets.
+
+    Additions are merged with one upsert per batch. Removals subtract sum and
+    count in place; only when a removed amount was the bucket's min or max
+    (or the bucket empties) is that single bucket recomputed from source.
+    The caller owns the commit, and must have flushed the transaction
+    changes so a recomputation sees them.
+    """
+    additions = _aggregate(entry for entry in added if entry is not None)
+    removals = _aggregate(entry for entry in removed if entry is not None)
+    if additions:
+        db.execute(
+            _upsert_statement(db),
+            [
+                {
+                    "user_id": user_id,
+                    "account_id": account_id,
+                    "category_id": category_id,
+                    "month": month,
+                    "total_amount": total,
+                    "transaction_count": count,
+                    "min_amount": low,
+                    "max_amount": high,
+                }
+                for (user_id, account_id, category_id, month), (
+                    total,
+                    count,
+                    low,
+                    high,
+                ) in additions.items()
+            ],
+        )
+    for bucket, (total, count, low, high) in removals.items():
+        condition = _bucket_condition(bucket)
+        db.execute(
+            update(SpendingRollup)
+            .where(condition)
+            .values(
+                total_amount=SpendingRollup.total_amount - total,
+                transaction_count=SpendingRollup.transaction_count - count,
+            )
+        )
+        current = db.execute(
+            select(
+                SpendingRollup.transaction_count,
+                SpendingRollup.min_amount,
+                SpendingRollup.max_amount,
+            ).where(condition)
+        ).first()
+        if (
+            current is None
+            or current.transaction_count <= 0
+            or low <= current.min_amount
+            or high >= current.max_amount
+        ):
+            _recompute_bucket(db, bucket)
+
+
+def rebuild_spending_rollups(db: Session, user_id: int | None = None) -> int:
+    """Recompute rollups from ``transactions``; returns the number of buckets.
+
+    The caller owns the commit.
+    """
+    clear = delete(SpendingRollup)
+    if user_id is not None:
+        clear = clear.where(SpendingRollup.user_id == user_id)
+    db.execute(clear)
+
+    month = _month_expression(db)
+    category = func.coalesce(Transaction.category_id, UNCATEGORIZED)
+    source = select(
+        Transaction.user_id,
+        Transaction.account_id,
+        category,
+        month,
+        func.sum(Transaction.amount),
+        func.count(),
+        func.min(Transaction.amount),
+        func.max(Transaction.amount),
+    ).where(spending_condition(), Transaction.transaction_date.is_not(None))
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+    source = source.group_by(
+        Transaction.user_id, Transaction.account_id, category, month
+    )
+    result = db.execute(
+        insert(SpendingRollup).from_select(
+            [
+                "user_id",
+                "account_id",
+                "category_id",
+                "month",
+                "total_amount",
+                "transaction_count",
+                "min_amount",
+                "max_amount",
+            ],
+            source,
+        )
+    )
+    return result.rowcount
+
+
+def _aggregate(
+    entries: Iterable[RollupEntry],
+) -> dict[tuple[int, int, int, str], list]:
+    buckets: dict[tuple[int, int, int, str], list] = defaultdict(
+        lambda: [0.0, 0, float("inf"), float("-inf")]
+    )
+    for entry in entries:
+        values = buckets[entry.bucket]
+        values[0] += entry.amount
+        values[1] += 1
+        values[2] = min(values[2], entry.amount)
+        values[3] = max(values[3], entry.amount)
+    return dict(buckets)
+
+
+def _recompute_bucket(db: Session, bucket: tuple[int, int, int, str]) -> None:
+    user_id, account_id, category_id, month = bucket
+    year, month_number = (int(part) for part in month.split("-"))
+    start = datetime(year, month_number, 1)
+    end = datetime(year + month_number // 12, month_number % 12 + 1, 1)
+    category_condition = (
+        Transaction.category_id.is_(None)
+        if category_id == UNCATEGORIZED
+        else Transaction.category_id == category_id
+    )
+    total, count, low, high = db.execute(
+        select(
+            func.sum(Transaction.amount),
+            func.count(),
+            func.min(Transaction.amount),
+            func.max(Transaction.amount),
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.account_id == account_id,
+            category_condition,
+            Transaction.transaction_date >= start,
+            Transaction.transaction_date < end,
+            spending_condition(),
+        )
+    ).one()
+
+    condition = _bucket_condition(bucket)
+    if not count:
+        db.execute(delete(SpendingRollup).where(condition))
+        return
+    values = {
+        "total_amount": total,
+        "transaction_count": count,
+        "min_amount": low,
+        "max_amount": high,
+    }
+    updated = db.execute(update(SpendingRollup).where(condition).values(**values))
+    if not updated.rowcount:
+        db.execute(
+            insert(SpendingRollup).values(
+                user_id=user_id,
+                account_id=account_id,
+                category_id=category_id,
+                month=month,
+                **values,
+            )
+        )
+
+
+def _bucket_condition(bucket: tuple[int, int, int, str]):
+    user_id, account_id, category_id, month = bucket
+    return (
+        (SpendingRollup.user_id == user_id)
+        & (SpendingRollup.account_id == account_id)
+        & (SpendingRollup.category_id == category_id)
+        & (SpendingRollup.month == month)
+    )
+
+
+def _upsert_statement(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        statement = postgresql.insert(SpendingRollup)
+        lower, upper = func.least, func.greatest
+    else:
+        statement = sqlite.insert(SpendingRollup)
+        lower, upper = func.min, func.max
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=["user_id", "account_id", "category_id", "month"],
+        set_={
+            "total_amount": SpendingRollup.total_amount + excluded.total_amount,
+            "transaction_count": SpendingRollup.transaction_count
+            + excluded.transaction_count,
+            "min_amount": lower(SpendingRollup.min_amount, excluded.min_amount),
+            "max_amount": upper(SpendingRollup.max_amount, excluded.max_amount),
+        },
+    )
+
+
+def _month_expression(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(Transaction.transaction_date, "YYYY-MM")
+    return func.strftime("%Y-%m", Transaction.transaction_date)
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.models import User
+from app.modules.analytics.schemas import (
+    MONTH_PATTERN,
+    MonthlySpendingResponse,
+    SpendingAnalytics,
+    SpendingPeriod,
+)
+from app.modules.analytics.service import (
+    get_monthly_spending,
+    get_spending_analytics,
+)
+from app.modules.auth.router import get_current_user
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/monthly", response_model=MonthlySpendingResponse)
+def monthly(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    start_month: str | None = Query(None, pattern=MONTH_PATTERN),
+    end_month: str | None = Query(None, pattern=MONTH_PATTERN),
+    account_id: int | None = None,
+    by_category: bool = True,
+    category_id: int | None = None,
+    include_subcategories: bool = True,
+):
+    items = get_monthly_spending(
+        db,
+        user_id=current_user.id,
+        start_month=start_month,
+        end_month=end_month,
+        account_id=account_id,
+        by_category=by_category,
+        category_id=category_id,
+        include_subcategories=include_subcategories,
+    )
+    return {"items": items}
+
+
+@router.get("/spending", response_model=SpendingAnalytics)
+def spending(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    period: SpendingPeriod = "month",
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    account_id: int | None = None,
+    top_merchants: int = Query(10, ge=1, le=50),
+    category_id: int | None = None,
+    include_subcategories: bool = True,
+):
+    return get_spending_analytics(
+        db,
+        user_id=current_user.id,
+        period=period,
+        start_date=start_date,
+        end_date=end_date,
+        account_id=account_id,
+        top_merchants=top_merchants,
+        category_id=category_id,
+        include_subcategories=include_subcategories,
+    )
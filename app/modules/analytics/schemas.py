@@ -0,0 +1,52 @@
+from datetime import date
+from typing import Literal
+
+from pydantic import BaseModel
+
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+SpendingPeriod = Literal["day", "week", "month"]
+
+
+class MonthlySpending(BaseModel):
+    month: str
+    category_id: int | None = None
+    total_amount: float
+    transaction_count: int
+    min_amount: float
+    max_amount: float
+
+
+class MonthlySpendingResponse(BaseModel):
+    items: list[MonthlySpending]
+
+
+class SpendingBucket(BaseModel):
+    period_start: date
+    category_id: int | None = None
+    total_amount: float
+    transaction_count: int
+
+
+class MonthOverMonth(BaseModel):
+    current_month: str
+    current_total: float
+    previous_month: str
+    previous_total: float
+    delta: float
+    delta_percent: float | None = None
+
+
+class MerchantSpending(BaseModel):
+    merchant: str
+    total_amount: float
+    transaction_count: int
+
+
+class SpendingAnalytics(BaseModel):
+    period: SpendingPeriod
+    total_amount: float
+    transaction_count: int
+    buckets: list[SpendingBucket]
+    month_over_month: MonthOverMonth
+    top_merchants: list[MerchantSpending]
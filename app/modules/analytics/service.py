@@ -0,0 +1,228 @@
+from datetime import UTC, datetime
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import SpendingRollup, Transaction
+from app.modules.analytics.rollups import UNCATEGORIZED, spending_condition
+from app.modules.analytics.schemas import (
+    MerchantSpending,
+    MonthlySpending,
+    MonthOverMonth,
+    SpendingAnalytics,
+    SpendingBucket,
+    SpendingPeriod,
+)
+from app.modules.categories.tree import subtree_select
+from app.modules.installments.plans import merchant_key
+from app.modules.transactions.service import apply_transaction_filters
+
+
+def get_monthly_spending(
+    db: Session,
+    user_id: int,
+    start_month: str | None = None,
+    end_month: str | None = None,
+    account_id: int | None = None,
+    by_category: bool = True,
+    category_id: int | None = None,
+    include_subcategories: bool = True,
+) -> list[MonthlySpending]:
+    """Spending per month (and category) read from ``spending_rollups``."""
+    group_columns = [SpendingRollup.month]
+    if by_category:
+        group_columns.append(SpendingRollup.category_id)
+    query = db.query(
+        *group_columns,
+        func.sum(SpendingRollup.total_amount),
+        func.sum(SpendingRollup.transaction_count),
+        func.min(SpendingRollup.min_amount),
+        func.max(SpendingRollup.max_amount),
+    ).filter(SpendingRollup.user_id == user_id)
+    if start_month is not None:
+        query = query.filter(SpendingRollup.month >= start_month)
+    if end_month is not None:
+        query = query.filter(SpendingRollup.month <= end_month)
+    if account_id is not None:
+        query = query.filter(SpendingRollup.account_id == account_id)
+    if category_id is not None and include_subcategories:
+        query = query.filter(
+            SpendingRollup.category_id.in_(subtree_select(category_id, user_id))
+        )
+    elif category_id is not None:
+        query = query.filter(SpendingRollup.category_id == category_id)
+    query = query.group_by(*group_columns).order_by(*group_columns)
+
+    items = []
+    for row in query:
+        if by_category:
+            month, category_id, total, count, low, high = row
+        else:
+            month, total, count, low, high = row
+            category_id = None
+        items.append(
+            MonthlySpending(
+                month=month,
+                category_id=None if category_id == UNCATEGORIZED else category_id,
+                total_amount=total,
+                transaction_count=count,
+                min_amount=low,
+                max_amount=high,
+            )
+        )
+    return items
+
+
+def get_spending_analytics(
+    db: Session,
+    user_id: int,
+    period: SpendingPeriod = "month",
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    account_id: int | None = None,
+    top_merchants: int = 10,
+    category_id: int | None = None,
+    include_subcategories: bool = True,
+) -> SpendingAnalytics:
+    """Spending by category x period, month-over-month delta and top merchants.
+
+    The four needed columns come back from one projection query and are
+    aggregated as NumPy arrays (``np.unique`` + ``bincount``), so the Python
+    work per transaction is a single tuple unpack; merchants are normalized
+    once per distinct spelling.
+    """
+    query = db.query(
+        Transaction.transaction_date,
+        Transaction.amount,
+        Transaction.category_id,
+        func.coalesce(Transaction.merchant, ""),
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.transaction_date.is_not(None),
+        spending_condition(),
+    )
+    query = apply_transaction_filters(
+        query,
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        category_id=category_id,
+        include_subcategories=include_subcategories,
+    )
+    rows = query.all()
+    count = len(rows)
+    dates_column, amounts_column, categories_column, merchants_column = (
+        zip(*rows) if rows else ((), (), (), ())
+    )
+    dates = np.array(dates_column, dtype="datetime64[us]")
+    amounts = np.fromiter(amounts_column, dtype=np.float64, count=count)
+    categories = np.fromiter(
+        (UNCATEGORIZED if value is None else value for value in categories_column),
+        dtype=np.int64,
+        count=count,
+    )
+    merchants = np.array(merchants_column, dtype=str)
+
+    reference = end_date or datetime.now(UTC)
+    return SpendingAnalytics(
+        period=period,
+        total_amount=float(amounts.sum()),
+        transaction_count=count,
+        buckets=_spending_buckets(dates, amounts, categories, period),
+        month_over_month=_month_over_month(dates, amounts, reference),
+        top_merchants=_top_merchants(merchants, amounts, top_merchants),
+    )
+
+
+def _period_starts(dates: np.ndarray, period: SpendingPeriod) -> np.ndarray:
+    """First day of each row's period, as days since the epoch."""
+    if period == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    if period == "week":
+        # Day 4 (1970-01-05) was a Monday; weeks start on Monday.
+        return (days - 4) // 7 * 7 + 4
+    return days
+
+
+def _spending_buckets(
+    dates: np.ndarray,
+    amounts: np.ndarray,
+    categories: np.ndarray,
+    period: SpendingPeriod,
+) -> list[SpendingBucket]:
+    if not len(amounts):
+        return []
+    # Unique (period, category) rows, sorted by period, then category.
+    keys = np.column_stack((_period_starts(dates, period), categories))
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    totals = np.bincount(inverse, weights=amounts, minlength=len(unique_keys))
+    counts = np.bincount(inverse, minlength=len(unique_keys))
+    starts = unique_keys[:, 0].astype("datetime64[D]").tolist()
+    category_ids = unique_keys[:, 1].tolist()
+    return [
+        SpendingBucket(
+            period_start=period_start,
+            category_id=None if category_id == UNCATEGORIZED else category_id,
+            total_amount=total,
+            transaction_count=transaction_count,
+        )
+        for period_start, category_id, total, transaction_count in zip(
+            starts, category_ids, totals.tolist(), counts.tolist()
+        )
+    ]
+
+
+def _month_over_month(
+    dates: np.ndarray, amounts: np.ndarray, reference: datetime
+) -> MonthOverMonth:
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    current = (reference.year - 1970) * 12 + reference.month - 1
+    current_total = float(amounts[months == current].sum())
+    previous_total = float(amounts[months == current - 1].sum())
+    delta = current_total - previous_total
+    return MonthOverMonth(
+        current_month=_month_label(current),
+        current_total=current_total,
+        previous_month=_month_label(current - 1),
+        previous_total=previous_total,
+        delta=delta,
+        delta_percent=delta / previous_total * 100 if previous_total else None,
+    )
+
+
+def _top_merchants(
+    merchants: np.ndarray, amounts: np.ndarray, limit: int
+) -> list[MerchantSpending]:
+    if not len(amounts):
+        return []
+    # Spellings of one merchant ("iFood", "IFOOD") share a ``merchant_key``;
+    # each group is shown under the spelling that sorts first.
+    names, inverse = np.unique(merchants, return_inverse=True)
+    keys = np.array([merchant_key(name) for name in names.tolist()], dtype=str)
+    unique_keys, first, key_inverse = np.unique(
+        keys, return_index=True, return_inverse=True
+    )
+    groups = key_inverse.reshape(-1)[inverse.reshape(-1)]
+    totals = np.bincount(groups, weights=amounts, minlength=len(unique_keys))
+    counts = np.bincount(groups, minlength=len(unique_keys))
+    results = []
+    for index in np.argsort(-totals, kind="stable"):
+        if not unique_keys[index]:
+            continue
+        results.append(
+            MerchantSpending(
+                merchant=str(names[first[index]]),
+                total_amount=float(totals[index]),
+                transaction_count=int(counts[index]),
+            )
+        )
+        if len(results) == limit:
+            break
+    return results
+
+
+def _month_label(month_index: int) -> str:
+    return f"{1970 + month_index // 12:04d}-{month_index % 12 + 1:02d}"
@@ -0,0 +1,391 @@
+"""Spend counters for the current window of each budget, kept in Redis.
+
+A counter holds what a budget has spent in its current window, either in its
+own category or in the whole subtree (``include_subcategories``). Summaries
+read counters with one MGET; a missing counter (first read, a new window,
+eviction, TTL) is summed from SQL once and stored.
+
+Every counter update also bumps the counter's ``:writes`` stamp, whether
+the counter exists or not. A rebuild reads the stamp before summing and
+stores its sum with ``WATCH`` only if the stamp hasn't moved, so an
+update landing between the SQL read and the store fails the store instead
+of being lost or counted twice; the rebuild then sums again (or leaves the
+counter to the next read).
+
+Transaction writes report the (category, date, amount) they add and remove
+through ``apply_spend_changes`` inside the same database transaction. The
+budgets on each category and its ancestors are found with one query, and the
+deltas are added to the counters once the transaction commits, so a rolled
+back write changes nothing. A moved subtree counter missing from Redis is
+summed from SQL in the transaction and set on commit, and the new totals go
+to the budget alert engine. Keys embed the user's budget and category ETag
+versions: editing a budget or moving a category starts fresh counters
+instead of patching old ones.
+"""
+
+import hashlib
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Callable, Iterable
+
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis
+from app.core.etag import BUDGETS, CATEGORIES, resource_versions
+from app.models import Budget, Transaction
+from app.modules.budgets.windows import resolve_period_window
+from app.modules.categories.tree import ancestor_cte
+from app.modules.notifications.alerts import BudgetSpend, evaluate_budget_alerts
+
+COUNTER_RESOURCES = (BUDGETS, CATEGORIES)
+# Bounds how long a delta lost to a Redis outage, or one committed just
+# before a rebuild's SQL read but applied after its store, can skew a counter.
+COUNTER_TTL_SECONDS = 60 * 60
+# Sums from SQL tried by a read before it gives up storing the counters.
+REBUILD_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+_PENDING = "budget_counter_deltas"
+
+# (budget_id, include_subcategories, window start)
+CounterScope = tuple[int, bool, datetime]
+
+
+@dataclass(frozen=True)
+class SpendEntry:
+    user_id: int
+    category_id: int
+    transaction_date: datetime
+    amount: float
+
+
+@dataclass
+class _Pending:
+    # Amounts to add to counters that exist.
+    deltas: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    # Subtree counters summed from SQL during the transaction, set on commit.
+    rebuilt: dict[str, float] = field(default_factory=dict)
+    # Budget and window behind each moved subtree counter, for alerts.
+    budgets: dict[str, BudgetSpend] = field(default_factory=dict)
+    # ``:writes`` stamps read before summing ``rebuilt`` from SQL.
+    writes: dict[str, str | None] = field(default_factory=dict)
+
+
+def spend_entry(
+    user_id: int,
+    category_id: int | None,
+    transaction_date: datetime | None,
+    amount: float,
+) -> SpendEntry | None:
+    """What one transaction counts towards budgets, or None if nothing."""
+    if category_id is None or transaction_date is None:
+        return None
+    if transaction_date.tzinfo is not None:
+        transaction_date = transaction_date.astimezone(UTC).replace(tzinfo=None)
+    return SpendEntry(user_id, category_id, transaction_date, amount)
+
+
+def spend_entry_for_transaction(transaction: Transaction) -> SpendEntry | None:
+    return spend_entry(
+        transaction.user_id,
+        transaction.category_id,
+        transaction.transaction_date,
+        transaction.amount,
+    )
+
+
+def spend_entry_for_row(row: dict) -> SpendEntry | None:
+    return spend_entry(
+        row["user_id"], row["category_id"], row["transaction_date"], row["amount"]
+    )
+
+
+def apply_spend_changes(
+    db: Session,
+    added: Iterable[SpendEntry | None] = (),
+    removed: Iterable[SpendEntry | None] = (),
+) -> None:
+    """Queue the counter deltas of transaction writes until ``db`` commits.
+
+    Only entries dated inside a budget's current window move its counters.
+    The caller owns the commit, and must have flushed the transaction
+    changes so a counter summed from SQL includes them.
+    """
+    changes: dict[int, list[tuple[SpendEntry, float]]] = defaultdict(list)
+    for entry in added:
+        if entry is not None:
+            changes[entry.user_id].append((entry, entry.amount))
+    for entry in removed:
+        if entry is not None:
+            changes[entry.user_id].append((entry, -entry.amount))
+    if not changes:
+        return
+
+    pending = db.info.setdefault(_PENDING, _Pending())
+    now = datetime.now(UTC).replace(tzinfo=None)
+    for user_id, user_changes in changes.items():
+        covering = _covering_budgets(
+            db, user_id, {entry.category_id for entry, _ in user_changes}
+        )
+        digest = _versions_digest(user_id) if covering else None
+        if digest is None:
+            continue
+        moved: dict[str, Budget] = {}
+        for budget, category_id in covering:
+            window_start, window_end = resolve_period_window(
+                budget.start_date, budget.period, now
+            )
+            tree_key = _counter_key(user_id, digest, (budget.id, True, window_start))
+            for entry, amount in user_changes:
+                if entry.category_id != category_id or not (
+                    window_start <= entry.transaction_date < window_end
+                ):
+                    continue
+                moved[tree_key] = budget
+                pending.budgets[tree_key] = BudgetSpend(
+                    user_id,
+                    budget.id,
+                    budget.category_id,
+                    budget.amount_limit,
+                    window_start,
+                    window_end,
+                )
+                keys = [tree_key]
+                if category_id == budget.category_id:
+                    keys.append(
+                        _counter_key(user_id, digest, (budget.id, False, window_start))
+                    )
+                for key in keys:
+                    if key in pending.rebuilt:
+                        pending.rebuilt[key] += amount
+                    else:
+                        pending.deltas[key] += amount
+        _rebuild_missing(db, user_id, pending, moved)
+
+
+def cached_spent(
+    user_id: int,
+    scopes: list[CounterScope],
+    compute: Callable[[list[CounterScope]], dict[CounterScope, float]],
+) -> dict[CounterScope, float]:
+    """Amount spent per scope, read from the counters.
+
+    Scopes without a counter are handed to ``compute`` in one call and the
+    results stored; if a write races the store, they are computed again, up
+    to ``REBUILD_ATTEMPTS`` times. Without Redis everything is computed.
+    """
+    digest = _versions_digest(user_id)
+    keys = {}
+    if digest is not None:
+        keys = {scope: _counter_key(user_id, digest, scope) for scope in scopes}
+    spent = {}
+    if keys:
+        try:
+            values = get_redis().mget(list(keys.values()))
+        except RedisError:
+            values = [None] * len(keys)
+        spent = {
+            scope: float(value)
+            for scope, value in zip(keys, values)
+            if value is not None
+        }
+
+    missing = [scope for scope in scopes if scope not in spent]
+    if not missing:
+        return spent
+    for _ in range(REBUILD_ATTEMPTS):
+        writes = None
+        if keys:
+            try:
+                writes = _read_writes([keys[scope] for scope in missing])
+            except RedisError:
+                pass
+        computed = compute(missing)
+        rebuilt = {scope: computed.get(scope, 0.0) for scope in missing}
+        if writes is None:
+            break
+        try:
+            stored = _store_rebuilt(
+                {keys[scope]: amount for scope, amount in rebuilt.items()}, writes
+            )
+        except RedisError:
+            logger.warning("Could not store budget counters for user %s", user_id)
+            break
+        if stored is not None:
+            rebuilt = {scope: stored[keys[scope]] for scope in missing}
+            break
+    spent.update(rebuilt)
+    return spent
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending is not None:
+        _write_pending(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def _rebuild_missing(
+    db: Session, user_id: int, pending: _Pending, moved: dict[str, Budget]
+) -> None:
+    """Sum moved subtree counters that Redis lacks, so alerts see totals."""
+    keys = [key for key in moved if key not in pending.rebuilt]
+    if not keys:
+        return
+    try:
+        # Stamps first: a write after this MGET makes the store on commit fail.
+        writes = _read_writes(keys)
+        values = get_redis().mget(keys)
+    except RedisError:
+        return
+    missing = {key: moved[key] for key, value in zip(keys, values) if value is None}
+    if not missing:
+        return
+    # Imported here: the budgets service reads these counters.
+    from app.modules.budgets.service import current_window_spent
+
+    spends = [pending.budgets[key] for key in missing]
+    totals = current_window_spent(
+        db,
+        user_id,
+        list(missing.values()),
+        windows={
+            spend.budget_id: (spend.period_start, spend.period_end) for spend in spends
+        },
+    )
+    for key, budget in missing.items():
+        # The sum already includes this transaction's flushed changes.
+        pending.rebuilt[key] = totals.get(budget.id, 0.0)
+        pending.writes[key] = writes[key]
+        pending.deltas.pop(key, None)
+
+
+def _write_pending(pending: _Pending) -> None:
+    totals = _add_to_counters(pending.deltas)
+    if pending.rebuilt:
+        # Losing the race leaves the counters to the next read; the session
+        # that summed them is gone, so it can't sum again here.
+        stored = None
+        try:
+            stored = _store_rebuilt(pending.rebuilt, pending.writes)
+        except RedisError:
+            logger.warning("Could not store budget counters %s", list(pending.rebuilt))
+        totals.update(pending.rebuilt if stored is None else stored)
+    evaluate_budget_alerts(
+        pending.budgets[key]._replace(amount_spent=amount)
+        for key, amount in totals.items()
+        if key in pending.budgets
+    )
+
+
+def _add_to_counters(deltas: dict[str, float]) -> dict[str, float]:
+    """Add ``deltas`` to the counters that exist; returns their new values.
+
+    Missing counters stay missing, since the next read sums them from SQL
+    anyway. Either way their ``:writes`` stamps are bumped, so a rebuild
+    in flight knows it raced this write. If a counter changes between the
+    check and the update, the counters involved are dropped instead.
+    """
+    keys = sorted(key for key, amount in deltas.items() if amount)
+    if not keys:
+        return {}
+    try:
+        with get_redis().pipeline() as pipeline:
+            try:
+                pipeline.watch(*keys)
+                present = [
+                    key
+                    for key, value in zip(keys, pipeline.mget(keys))
+                    if value is not None
+                ]
+                pipeline.multi()
+                _bump_writes(pipeline, keys)
+                for key in present:
+                    pipeline.incrbyfloat(key, deltas[key])
+                results = pipeline.execute()[2 * len(keys) :]
+                return dict(zip(present, map(float, results)))
+            except WatchError:
+                reset = get_redis().pipeline()
+                reset.delete(*keys)
+                _bump_writes(reset, keys)
+                reset.execute()
+    except RedisError:
+        logger.warning("Could not update budget counters %s", keys)
+    return {}
+
+
+def _read_writes(keys: list[str]) -> dict[str, str | None]:
+    stamps = get_redis().mget([_writes_key(key) for key in keys])
+    return dict(zip(keys, stamps))
+
+
+def _bump_writes(pipeline, keys: list[str]) -> None:
+    for key in keys:
+        pipeline.incr(_writes_key(key))
+        pipeline.expire(_writes_key(key), COUNTER_TTL_SECONDS)
+
+
+def _store_rebuilt(
+    amounts: dict[str, float], writes: dict[str, str | None]
+) -> dict[str, float] | None:
+    """Set counters summed from SQL and return the values they hold.
+
+    A counter another rebuild stored first is kept. Returns None, storing
+    nothing, if a write bumped a stamp since ``writes`` was read.
+    """
+    keys = sorted(amounts)
+    stamps = [_writes_key(key) for key in keys]
+    with get_redis().pipeline() as pipeline:
+        try:
+            pipeline.watch(*stamps)
+            if pipeline.mget(stamps) != [writes.get(key) for key in keys]:
+                return None
+            pipeline.multi()
+            for key in keys:
+                pipeline.set(key, amounts[key], nx=True, ex=COUNTER_TTL_SECONDS)
+                pipeline.get(key)
+            results = pipeline.execute()
+        except WatchError:
+            return None
+    return dict(zip(keys, map(float, results[1::2])))
+
+
+def _covering_budgets(
+    db: Session, user_id: int, category_ids: set[int]
+) -> list[tuple[Budget, int]]:
+    """``(budget, category_id)`` for each budget on a category or an ancestor."""
+    ancestors = ancestor_cte(category_ids)
+    return (
+        db.query(Budget, ancestors.c.leaf_id)
+        .join(ancestors, Budget.category_id == ancestors.c.id)
+        .filter(Budget.user_id == user_id)
+        .all()
+    )
+
+
+def _versions_digest(user_id: int) -> str | None:
+    versions = resource_versions(user_id, COUNTER_RESOURCES)
+    if versions is None:
+        return None
+    return hashlib.sha1("|".join(versions).encode("utf-8")).hexdigest()[:12]
+
+
+def _writes_key(key: str) -> str:
+    return f"{key}:writes"
+
+
+def _counter_key(user_id: int, digest: str, scope: CounterScope) -> str:
+    budget_id, include_subcategories, window_start = scope
+    return (
+        f"budget_spent:{user_id}:{digest}:{budget_id}:"
+        f"{int(include_subcategories)}:{window_start.isoformat()}"
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -7,14 +7,18 @@ from app.models import User
 from app.modules.auth.router import get_current_user
 from app.modules.budgets.schemas import (
     BudgetCreate,
+    BudgetHistory,
     BudgetListResponse,
     BudgetRead,
     BudgetSummary,
+    BudgetSummaryListResponse,
     BudgetUpdate,
 )
 from app.modules.budgets.service import (
     create_budget,
     delete_budget,
+    get_budget_history,
+    get_budget_summaries,
     get_budget_summary,
     list_budgets,
     update_budget,
@@ -52,6 +56,20 @@ def list_all(
     }
 
 
+@router.get("/summary", response_model=BudgetSummaryListResponse)
+def summary_all(
+    include_subcategories: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    items = get_budget_summaries(
+        db,
+        user_id=current_user.id,
+        include_subcategories=include_subcategories,
+    )
+    return {"items": items}
+
+
 @router.get("/{budget_id}/summary", response_model=BudgetSummary)
 def summary(
     budget_id: int,
@@ -70,6 +88,26 @@ def summary(
     return result
 
 
+@router.get("/{budget_id}/history", response_model=BudgetHistory)
+def history(
+    budget_id: int,
+    periods: int = Query(6, ge=1, le=120),
+    include_subcategories: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    result = get_budget_history(
+        db,
+        user_id=current_user.id,
+        budget_id=budget_id,
+        periods=periods,
+        include_subcategories=include_subcategories,
+    )
+    if not result:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return result
+
+
 @router.put("/{budget_id}", response_model=BudgetRead)
 def update(
     budget_id: int,
@@ -40,6 +40,26 @@ class BudgetSummary(BaseModel):
     include_subcategories: bool
 
 
+class BudgetSummaryListResponse(BaseModel):
+    items: list[BudgetSummary]
+
+
+class BudgetPeriodSpending(BaseModel):
+    period_start: datetime
+    period_end: datetime
+    amount_limit: float
+    amount_spent: float
+    amount_remaining: float
+
+
+class BudgetHistory(BaseModel):
+    budget_id: int
+    category_id: int
+    period: BudgetPeriod
+    include_subcategories: bool
+    items: list[BudgetPeriodSpending]
+
+
 class BudgetListResponse(BaseModel):
     items: list[BudgetRead]
     total: int
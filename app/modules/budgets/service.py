@@ -1,11 +1,29 @@
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime
 
-from sqlalchemy import func
+from sqlalchemy import and_, func, literal, select, union_all
 from sqlalchemy.orm import Session
 
+from app.core.etag import BUDGETS, touch
 from app.core.pagination import paginate_query
-from app.models import Budget, BudgetPeriod, Category, Transaction
-from app.modules.budgets.schemas import BudgetCreate, BudgetSummary, BudgetUpdate
+from app.models import Budget, BudgetPeriod, Transaction
+from app.modules.budgets.counters import CounterScope, cached_spent
+from app.modules.budgets.schemas import (
+    BudgetCreate,
+    BudgetHistory,
+    BudgetPeriodSpending,
+    BudgetSummary,
+    BudgetUpdate,
+)
+from app.modules.budgets.windows import (
+    period_index,
+    period_window,
+    resolve_period_window,
+)
+from app.modules.categories.tree import (
+    category_subtree_ids,
+    category_subtrees,
+    subtree_select,
+)
 
 
 def _to_naive(value: datetime) -> datetime:
@@ -27,6 +45,7 @@ def create_budget(db: Session, user_id: int, payload: BudgetCreate) -> Budget:
         ),
     )
     db.add(budget)
+    touch(db, user_id, BUDGETS)
     db.commit()
     db.refresh(budget)
     return budget
@@ -36,7 +55,9 @@ def list_budgets(
     db: Session, user_id: int, skip: int, limit: int
 ) -> tuple[list[Budget], int]:
     query = db.query(Budget).filter(Budget.user_id == user_id)
-    return paginate_query(query, skip=skip, limit=limit)
+    return paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(BUDGETS,)
+    )
 
 
 def get_budget(db: Session, user_id: int, budget_id: int) -> Budget | None:
@@ -66,6 +87,7 @@ def update_budget(
             _to_naive(payload.start_date) if payload.start_date else None
         )
 
+    touch(db, user_id, BUDGETS)
     db.commit()
     db.refresh(budget)
     return budget
@@ -76,6 +98,7 @@ def delete_budget(db: Session, user_id: int, budget_id: int) -> bool:
     if not budget:
         return False
     db.delete(budget)
+    touch(db, user_id, BUDGETS)
     db.commit()
     return True
 
@@ -90,16 +113,27 @@ def get_budget_summary(
     if not budget:
         return None
 
-    period_start, period_end = _resolve_period_window(budget.start_date, budget.period)
-    category_ids = _collect_category_ids(db, budget.category_id, include_subcategories)
+    period_start, period_end = resolve_period_window(budget.start_date, budget.period)
+    if include_subcategories:
+        category_ids = subtree_select(budget.category_id, user_id)
+    else:
+        category_ids = [budget.category_id]
+
+    def spent_in_window(missing: list[CounterScope]) -> dict[CounterScope, float]:
+        # A half-open range on the bare column: with transactions partitioned
+        # by date only the partitions overlapping the period are scanned.
+        amount = (
+            db.query(func.coalesce(func.sum(Transaction.amount), 0.0))
+            .filter(Transaction.user_id == user_id)
+            .filter(Transaction.category_id.in_(category_ids))
+            .filter(Transaction.transaction_date >= period_start)
+            .filter(Transaction.transaction_date < period_end)
+            .scalar()
+        )
+        return {scope: amount for scope in missing}
 
-    amount_spent = (
-        db.query(func.coalesce(func.sum(Transaction.amount), 0.0))
-        .filter(Transaction.category_id.in_(category_ids))
-        .filter(Transaction.transaction_date >= period_start)
-        .filter(Transaction.transaction_date < period_end)
-        .scalar()
-    )
+    scope = (budget.id, include_subcategories, period_start)
+    amount_spent = cached_spent(user_id, [scope], spent_in_window)[scope]
     amount_remaining = budget.amount_limit - amount_spent
 
     return BudgetSummary(
@@ -114,85 +148,183 @@ def get_budget_summary(
     )
 
 
-def _resolve_period_window(
-    start_date: datetime, period: BudgetPeriod
-) -> tuple[datetime, datetime]:
+def get_budget_summaries(
+    db: Session, user_id: int, include_subcategories: bool = True
+) -> list[BudgetSummary]:
+    """Summaries of every budget of ``user_id`` with a fixed number of queries.
+
+    Budgets are loaded with one query and windows resolved in Python. Amounts
+    come from the spend counters; budgets without one have their category
+    subtrees loaded with one query and are summed by one grouped statement.
+    """
+    budgets = (
+        db.query(Budget).filter(Budget.user_id == user_id).order_by(Budget.id).all()
+    )
+    if not budgets:
+        return []
+
+    windows = {
+        budget.id: resolve_period_window(budget.start_date, budget.period)
+        for budget in budgets
+    }
+    by_id = {budget.id: budget for budget in budgets}
+
+    def spent_by_budget(missing: list[CounterScope]) -> dict[CounterScope, float]:
+        totals = current_window_spent(
+            db,
+            user_id,
+            [by_id[budget_id] for budget_id, _, _ in missing],
+            include_subcategories,
+            windows,
+        )
+        return {scope: totals.get(scope[0], 0.0) for scope in missing}
+
+    spent = cached_spent(
+        user_id,
+        [
+            (budget.id, include_subcategories, windows[budget.id][0])
+            for budget in budgets
+        ],
+        spent_by_budget,
+    )
+
+    summaries = []
+    for budget in budgets:
+        period_start, period_end = windows[budget.id]
+        amount_spent = spent[(budget.id, include_subcategories, period_start)]
+        summaries.append(
+            BudgetSummary(
+                budget_id=budget.id,
+                category_id=budget.category_id,
+                amount_limit=budget.amount_limit,
+                amount_spent=amount_spent,
+                amount_remaining=budget.amount_limit - amount_spent,
+                period_start=period_start,
+                period_end=period_end,
+                include_subcategories=include_subcategories,
+            )
+        )
+    return summaries
+
+
+def current_window_spent(
+    db: Session,
+    user_id: int,
+    budgets: list[Budget],
+    include_subcategories: bool = True,
+    windows: dict[int, tuple[datetime, datetime]] | None = None,
+) -> dict[int, float]:
+    """Amount spent in each budget's current window, summed from SQL.
+
+    One query loads the category subtrees and one grouped statement sums
+    every window. ``windows`` reuses bounds the caller already resolved.
+    """
+    windows = windows or {
+        budget.id: resolve_period_window(budget.start_date, budget.period)
+        for budget in budgets
+    }
+    subtrees = {}
+    if include_subcategories:
+        subtrees = category_subtrees(
+            db, {budget.category_id for budget in budgets}, user_id
+        )
+    return _spent_by_window(
+        db,
+        user_id,
+        [
+            (
+                budget.id,
+                *windows[budget.id],
+                subtrees.get(budget.category_id) or [budget.category_id],
+            )
+            for budget in budgets
+        ],
+    )
+
+
+def get_budget_history(
+    db: Session,
+    user_id: int,
+    budget_id: int,
+    periods: int,
+    include_subcategories: bool = True,
+) -> BudgetHistory | None:
+    """Spent vs. limit of the last ``periods`` windows, oldest first.
+
+    Windows before the budget's start date are left out, so a young budget
+    returns fewer items. All windows are summed by one grouped statement.
+    """
+    budget = get_budget(db, user_id=user_id, budget_id=budget_id)
+    if not budget:
+        return None
+
     now = datetime.now(UTC).replace(tzinfo=None)
-    if period == BudgetPeriod.weekly:
-        return _rolling_window(start_date, now, days=7)
-    if period == BudgetPeriod.monthly:
-        return _rolling_window_months(start_date, now, months=1)
-    return _rolling_window_years(start_date, now, years=1)
-
-
-def _rolling_window(
-    start_date: datetime, now: datetime, days: int
-) -> tuple[datetime, datetime]:
-    delta_days = (now - start_date).days
-    if delta_days < 0:
-        return start_date, start_date + timedelta(days=days)
-    periods = delta_days // days
-    window_start = start_date + timedelta(days=periods * days)
-    window_end = window_start + timedelta(days=days)
-    return window_start, window_end
-
-
-def _rolling_window_months(
-    start_date: datetime, now: datetime, months: int
-) -> tuple[datetime, datetime]:
-    window_start = start_date
-    window_end = _add_months(window_start, months)
-    while window_end <= now:
-        window_start = window_end
-        window_end = _add_months(window_start, months)
-    return window_start, window_end
-
-
-def _rolling_window_years(
-    start_date: datetime, now: datetime, years: int
-) -> tuple[datetime, datetime]:
-    window_start = start_date
-    window_end = _add_years(window_start, years)
-    while window_end <= now:
-        window_start = window_end
-        window_end = _add_years(window_start, years)
-    return window_start, window_end
-
-
-def _add_months(value: datetime, months: int) -> datetime:
-    month = value.month - 1 + months
-    year = value.year + month // 12
-    month = month % 12 + 1
-    day = min(value.day, _days_in_month(year, month))
-    return value.replace(year=year, month=month, day=day)
-
-
-def _add_years(value: datetime, years: int) -> datetime:
-    year = value.year + years
-    day = min(value.day, _days_in_month(year, value.month))
-    return value.replace(year=year, day=day)
-
-
-def _days_in_month(year: int, month: int) -> int:
-    if month == 12:
-        next_month = datetime(year + 1, 1, 1)
+    current = period_index(budget.start_date, budget.period, now)
+    indexes = range(max(current - periods + 1, 0), current + 1)
+    windows = [
+        (index, *period_window(budget.start_date, budget.period, index))
+        for index in indexes
+    ]
+    if include_subcategories:
+        category_ids = category_subtree_ids(db, budget.category_id, user_id)
     else:
-        next_month = datetime(year, month + 1, 1)
-    return (next_month - timedelta(days=1)).day
-
-
-def _collect_category_ids(
-    db: Session, category_id: int, include_subcategories: bool
-) -> list[int]:
-    if not include_subcategories:
-        return [category_id]
-    ids = [category_id]
-    queue = [category_id]
-    while queue:
-        current = queue.pop(0)
-        children = db.query(Category.id).filter(Category.parent_id == current).all()
-        for (child_id,) in children:
-            if child_id not in ids:
-                ids.append(child_id)
-                queue.append(child_id)
-    return ids
+        category_ids = [budget.category_id]
+    spent = _spent_by_window(
+        db,
+        user_id,
+        [(index, start, end, category_ids) for index, start, end in windows],
+    )
+
+    return BudgetHistory(
+        budget_id=budget.id,
+        category_id=budget.category_id,
+        period=budget.period,
+        include_subcategories=include_subcategories,
+        items=[
+            BudgetPeriodSpending(
+                period_start=start,
+                period_end=end,
+                amount_limit=budget.amount_limit,
+                amount_spent=spent.get(index, 0.0),
+                amount_remaining=budget.amount_limit - spent.get(index, 0.0),
+            )
+            for index, start, end in windows
+        ],
+    )
+
+
+def _spent_by_window(
+    db: Session,
+    user_id: int,
+    scopes: list[tuple[int, datetime, datetime, list[int]]],
+) -> dict[int, float]:
+    """Amount spent per ``(key, start, end, category_ids)`` scope."""
+    # One (key, category, window) row per category a scope covers, joined
+    # to the user's transactions and summed per key.
+    windows = union_all(
+        *[
+            select(
+                literal(key).label("key"),
+                literal(category_id).label("category_id"),
+                literal(period_start).label("period_start"),
+                literal(period_end).label("period_end"),
+            )
+            for key, period_start, period_end, category_ids in scopes
+            for category_id in category_ids
+        ]
+    ).subquery("windows")
+    statement = (
+        select(windows.c.key, func.sum(Transaction.amount))
+        .select_from(windows)
+        .join(
+            Transaction,
+            and_(
+                Transaction.category_id == windows.c.category_id,
+                Transaction.transaction_date >= windows.c.period_start,
+                Transaction.transaction_date < windows.c.period_end,
+            ),
+        )
+        .where(Transaction.user_id == user_id)
+        .group_by(windows.c.key)
+    )
+    return {key: amount for key, amount in db.execute(statement)}
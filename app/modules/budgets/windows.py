@@ -0,0 +1,76 @@
+"""Budget windows in closed form.
+
+Window ``index`` of a budget runs from ``start_date`` plus ``index`` periods
+to ``start_date`` plus ``index + 1`` periods, so finding the current window
+or the last N ones never steps through the elapsed periods.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from app.models import BudgetPeriod
+
+
+def resolve_period_window(
+    start_date: datetime, period: BudgetPeriod, now: datetime | None = None
+) -> tuple[datetime, datetime]:
+    now = now or datetime.now(UTC).replace(tzinfo=None)
+    return period_window(start_date, period, period_index(start_date, period, now))
+
+
+def period_index(start_date: datetime, period: BudgetPeriod, now: datetime) -> int:
+    """Index of the window containing ``now``, counted from ``start_date``.
+
+    Computed directly from the elapsed days, months or years; a budget that
+    hasn't started yet is in its first window.
+    """
+    if now < start_date:
+        return 0
+    if period == BudgetPeriod.weekly:
+        return (now - start_date).days // 7
+    if period == BudgetPeriod.monthly:
+        index = (now.year - start_date.year) * 12 + now.month - start_date.month
+    else:
+        index = now.year - start_date.year
+    # ``now`` is in the index-th month/year but may fall before the window's day.
+    if period_window(start_date, period, index)[0] > now:
+        index -= 1
+    return index
+
+
+def period_window(
+    start_date: datetime, period: BudgetPeriod, index: int
+) -> tuple[datetime, datetime]:
+    """Bounds of the ``index``-th window, always offset from ``start_date``.
+
+    Offsetting from the start rather than from the previous window keeps a
+    budget started on the 31st on the last day of short months without
+    drifting to the 28th for good.
+    """
+    if period == BudgetPeriod.weekly:
+        window_start = start_date + timedelta(days=7 * index)
+        return window_start, window_start + timedelta(days=7)
+    if period == BudgetPeriod.monthly:
+        return _add_months(start_date, index), _add_months(start_date, index + 1)
+    return _add_years(start_date, index), _add_years(start_date, index + 1)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    day = min(value.day, _days_in_month(year, month))
+    return value.replace(year=year, month=month, day=day)
+
+
+def _add_years(value: datetime, years: int) -> datetime:
+    year = value.year + years
+    day = min(value.day, _days_in_month(year, value.month))
+    return value.replace(year=year, day=day)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1)
+    else:
+        next_month = datetime(year, month + 1, 1)
+    return (next_month - timedelta(days=1)).day
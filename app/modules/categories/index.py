@@ -0,0 +1,82 @@
+"""Per-user category index cached in-process.
+
+``CategoryIndex`` holds one user's categories by id, by (parent, normalized
+name) and as children lists, so categorization and tree checks run without
+queries. Each process keeps up to ``MAX_CACHED_INDEXES`` of them tagged with
+the user's ``categories`` ETag version. Category writes ``touch`` that
+version, so every process reloads on its next lookup, and the writing
+process drops its own copy at once with ``invalidate_category_index``.
+Without Redis the version can't be checked and the index is loaded per call.
+"""
+
+from collections import OrderedDict, defaultdict
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.core.etag import CATEGORIES, resource_versions
+from app.models import Category
+from app.modules.ai_agent.rules import normalize
+
+MAX_CACHED_INDEXES = 256
+
+_indexes: "OrderedDict[int, tuple[str, CategoryIndex]]" = OrderedDict()
+
+
+class CategoryNode(NamedTuple):
+    id: int
+    name: str
+    parent_id: int | None
+
+
+class CategoryIndex:
+    """One user's categories, keyed for lookups by id, name and parent."""
+
+    def __init__(self, rows):
+        self.by_id: dict[int, CategoryNode] = {}
+        self.by_name: dict[tuple[int | None, str], CategoryNode] = {}
+        self.children: dict[int | None, list[int]] = defaultdict(list)
+        for category_id, name, parent_id in rows:
+            node = CategoryNode(category_id, name, parent_id)
+            self.by_id[category_id] = node
+            # Rows come in id order; the oldest of same-named siblings wins.
+            self.by_name.setdefault((parent_id, normalize(name)), node)
+            self.children[parent_id].append(category_id)
+
+    def find(self, name: str, parent_id: int | None = None) -> CategoryNode | None:
+        """Category named ``name`` (normalized) under ``parent_id``, or a root."""
+        return self.by_name.get((parent_id, normalize(name)))
+
+    def has_children(self, category_id: int) -> bool:
+        return bool(self.children.get(category_id))
+
+
+def get_category_index(db: Session, user_id: int) -> CategoryIndex:
+    versions = resource_versions(user_id, (CATEGORIES,))
+    version = versions[0] if versions else None
+    cached = _indexes.get(user_id)
+    if cached is not None and version is not None and cached[0] == version:
+        _indexes.move_to_end(user_id)
+        return cached[1]
+
+    # The version is read first, so a write racing this load at worst makes
+    # the next lookup reload again.
+    rows = (
+        db.query(Category.id, Category.name, Category.parent_id)
+        .filter(Category.user_id == user_id)
+        .order_by(Category.id)
+    )
+    index = CategoryIndex(rows)
+    if version is not None:
+        _indexes[user_id] = (version, index)
+        if len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def invalidate_category_index(user_id: int) -> None:
+    _indexes.pop(user_id, None)
+
+
+def clear_category_indexes() -> None:
+    _indexes.clear()
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.etag import CATEGORIES, conditional_get
 from app.core.pagination import PaginationParams, get_pagination_params
 from app.models import User
 from app.modules.auth.router import get_current_user
@@ -32,7 +33,11 @@ def create(
     return create_category(db, user_id=current_user.id, payload=payload)
 
 
-@router.get("/", response_model=CategoryListResponse)
+@router.get(
+    "/",
+    response_model=CategoryListResponse,
+    dependencies=[Depends(conditional_get(CATEGORIES))],
+)
 def list_all(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -60,7 +65,11 @@ def seed(
     return seed_default_categories(db, user_id=current_user.id)
 
 
-@router.get("/{category_id}", response_model=CategoryRead)
+@router.get(
+    "/{category_id}",
+    response_model=CategoryRead,
+    dependencies=[Depends(conditional_get(CATEGORIES))],
+)
 def get_by_id(
     category_id: int,
     db: Session = Depends(get_db),
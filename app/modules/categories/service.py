@@ -1,7 +1,12 @@
 from sqlalchemy.orm import Session
 
+from app.core.etag import CATEGORIES, touch
 from app.core.pagination import paginate_query
 from app.models import Budget, Category, Transaction
+from app.modules.categories.index import (
+    get_category_index,
+    invalidate_category_index,
+)
 from app.modules.categories.schemas import CategoryCreate, CategoryUpdate
 from app.seeds.categories import DEFAULT_CATEGORIES
 
@@ -15,7 +20,9 @@ def create_category(db: Session, user_id: int, payload: CategoryCreate) -> Categ
         color=payload.color,
     )
     db.add(category)
+    touch(db, user_id, CATEGORIES)
     db.commit()
+    invalidate_category_index(user_id)
     db.refresh(category)
     return category
 
@@ -24,7 +31,9 @@ def list_categories(
     db: Session, user_id: int, skip: int, limit: int
 ) -> tuple[list[Category], int]:
     query = db.query(Category).filter(Category.user_id == user_id)
-    return paginate_query(query, skip=skip, limit=limit)
+    return paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(CATEGORIES,)
+    )
 
 
 def get_category(db: Session, user_id: int, category_id: int) -> Category | None:
@@ -54,7 +63,9 @@ def update_category(
     if "color" in payload.model_fields_set:
         category.color = payload.color
 
+    touch(db, user_id, CATEGORIES)
     db.commit()
+    invalidate_category_index(user_id)
     db.refresh(category)
     return category
 
@@ -64,13 +75,7 @@ def delete_category(db: Session, user_id: int, category_id: int) -> bool | None:
     if not category:
         return None
 
-    has_children = (
-        db.query(Category)
-        .filter(Category.user_id == user_id, Category.parent_id == category_id)
-        .first()
-        is not None
-    )
-    if has_children:
+    if get_category_index(db, user_id).has_children(category_id):
         raise ValueError("Category has subcategories")
 
     in_transactions = (
@@ -85,7 +90,9 @@ def delete_category(db: Session, user_id: int, category_id: int) -> bool | None:
         raise ValueError("Category in use")
 
     db.delete(category)
+    touch(db, user_id, CATEGORIES)
     db.commit()
+    invalidate_category_index(user_id)
     return True
 
 
@@ -103,5 +110,7 @@ def seed_default_categories(db: Session, user_id: int) -> list[Category]:
             sub = Category(user_id=user_id, name=sub_name, parent_id=parent.id)
             db.add(sub)
             created.append(sub)
+    touch(db, user_id, CATEGORIES)
     db.commit()
+    invalidate_category_index(user_id)
     return created
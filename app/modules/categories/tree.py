@@ -0,0 +1,73 @@
+"""Category subtree lookups in one round trip.
+
+``subtree_cte`` walks ``parent_id`` down from one or more root categories
+with a recursive CTE (Postgres and SQLite both support ``WITH RECURSIVE``).
+``UNION`` rather than ``UNION ALL`` keeps the walk finite even if a bad
+update ever creates a cycle. Pass ``user_id`` to only descend into that
+user's and global categories. ``ancestor_cte`` walks the other way, from
+categories up to their roots.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import CTE, Select, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models import Category
+
+
+def subtree_cte(root_ids: Iterable[int], user_id: int | None = None) -> CTE:
+    """``(root_id, id)`` for every root and each of its descendants."""
+    tree = (
+        select(Category.id.label("root_id"), Category.id.label("id"))
+        .where(Category.id.in_(list(root_ids)))
+        .cte("category_subtree", recursive=True)
+    )
+    child = aliased(Category, name="child")
+    step = select(tree.c.root_id, child.id).where(child.parent_id == tree.c.id)
+    if user_id is not None:
+        step = step.where(or_(child.user_id == user_id, child.user_id.is_(None)))
+    return tree.union(step)
+
+
+def ancestor_cte(category_ids: Iterable[int]) -> CTE:
+    """``(leaf_id, id)`` for every category and each of its ancestors."""
+    tree = (
+        select(
+            Category.id.label("leaf_id"),
+            Category.id.label("id"),
+            Category.parent_id.label("parent_id"),
+        )
+        .where(Category.id.in_(list(category_ids)))
+        .cte("category_ancestors", recursive=True)
+    )
+    parent = aliased(Category, name="parent")
+    step = select(tree.c.leaf_id, parent.id, parent.parent_id).where(
+        parent.id == tree.c.parent_id
+    )
+    return tree.union(step)
+
+
+def subtree_select(category_id: int, user_id: int | None = None) -> Select:
+    """Ids of ``category_id`` and its descendants, for use in ``in_()``."""
+    return select(subtree_cte([category_id], user_id).c.id)
+
+
+def category_subtree_ids(
+    db: Session, category_id: int, user_id: int | None = None
+) -> list[int]:
+    return list(db.scalars(subtree_select(category_id, user_id)))
+
+
+def category_subtrees(
+    db: Session, root_ids: Iterable[int], user_id: int | None = None
+) -> dict[int, list[int]]:
+    """Subtree of each root, all fetched with one statement."""
+    root_ids = set(root_ids)
+    if not root_ids:
+        return {}
+    tree = subtree_cte(root_ids, user_id)
+    subtrees: dict[int, list[int]] = {root_id: [] for root_id in root_ids}
+    for root_id, category_id in db.execute(select(tree.c.root_id, tree.c.id)):
+        subtrees[root_id].append(category_id)
+    return subtrees
@@ -17,6 +17,7 @@ from app.modules.email_parser.service import (
     build_transaction_draft,
     ingest_email,
 )
+from app.modules.transactions.dedup import DuplicateTransactionError
 from app.modules.transactions.service import create_transaction
 
 router = APIRouter(prefix="/email", tags=["email_parser"])
@@ -65,6 +66,8 @@ def parse_and_create(
         transaction = create_transaction(
             db, user_id=current_user.id, payload=create_payload
         )
+    except DuplicateTransactionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
     return ParseAndCreateResponse(parsed=parsed, transaction=transaction)
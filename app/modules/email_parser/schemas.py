@@ -68,6 +68,7 @@ class TransactionCreated(BaseModel):
     installments_current: int | None = None
     category_id: int | None = None
     raw_email_id: int | None = None
+    possible_duplicate_of: int | None = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.models import User
+from app.modules.auth.router import get_current_user
+from app.modules.forecast.schemas import ForecastResponse
+from app.modules.forecast.service import get_forecast
+
+router = APIRouter(prefix="/forecast", tags=["forecast"])
+
+
+@router.get("/", response_model=ForecastResponse)
+def forecast(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    days: int = Query(30, ge=1, le=365),
+):
+    return get_forecast(db, user_id=current_user.id, days=days)
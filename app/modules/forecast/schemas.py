@@ -0,0 +1,38 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class ForecastPoint(BaseModel):
+    day: date
+    balance: float
+
+
+class AccountForecast(BaseModel):
+    account_id: int
+    bank_name: str
+    starting_balance: float
+    ending_balance: float
+    lowest_balance: float
+    lowest_balance_day: date
+    points: list[ForecastPoint]
+
+
+class ForecastDay(BaseModel):
+    day: date
+    # Installments and recurring charges due that day (negative).
+    scheduled_amount: float
+    # Spending still allowed by budgets, spread over their periods.
+    budgeted_amount: float
+    balance: float
+
+
+class ForecastResponse(BaseModel):
+    start_date: date
+    days: int
+    starting_balance: float
+    ending_balance: float
+    lowest_balance: float
+    lowest_balance_day: date
+    accounts: list[AccountForecast]
+    points: list[ForecastDay]
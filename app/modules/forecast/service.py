@@ -0,0 +1,338 @@
+"""Day-by-day balance projection per account.
+
+Each account starts from ``accounts.last_balance``; the remaining parcels of
+open installment plans and the upcoming charges of active recurring series
+are bucketed into a (account x day) array and accumulated with ``cumsum``.
+Budgets are category-wide rather than tied to an account, so the spending
+they still allow only lowers the combined balance. Only budgets not nested
+under another budget's category count, and scheduled charges in a budget's
+categories come out of what it allows instead of being spent twice.
+
+Results are cached in Redis per user, horizon and day, keyed on the ETag
+version counters of everything the projection reads, so any write to
+accounts, transactions, categories, budgets or recurring series invalidates
+them.
+"""
+
+import calendar
+import hashlib
+import logging
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis
+from app.core.etag import (
+    ACCOUNTS,
+    BUDGETS,
+    CATEGORIES,
+    RECURRING,
+    TRANSACTIONS,
+    resource_versions,
+)
+from app.models import Account, Budget, InstallmentPlan, RecurringSeries, Transaction
+from app.modules.budgets.schemas import BudgetSummary
+from app.modules.budgets.service import get_budget_summaries
+from app.modules.budgets.windows import period_index, period_window
+from app.modules.categories.tree import category_subtrees
+from app.modules.forecast.schemas import (
+    AccountForecast,
+    ForecastDay,
+    ForecastPoint,
+    ForecastResponse,
+)
+from app.modules.installments.plans import month_index
+from app.modules.recurring.detection import advance
+from app.modules.recurring.service import ACTIVE_GRACE_DAYS
+
+FORECAST_RESOURCES = (ACCOUNTS, TRANSACTIONS, CATEGORIES, BUDGETS, RECURRING)
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+# (account_id, day, signed amount, category_id)
+Event = tuple[int, date, float, int | None]
+
+
+def get_forecast(
+    db: Session, user_id: int, days: int = 30, today: date | None = None
+) -> ForecastResponse:
+    today = today or datetime.now(UTC).date()
+    key = _cache_key(user_id, days, today)
+    if key is not None:
+        try:
+            cached = get_redis().get(key)
+        except RedisError:
+            cached = None
+        if cached:
+            return ForecastResponse.model_validate_json(cached)
+
+    forecast = build_forecast(db, user_id, days, today)
+    if key is not None:
+        try:
+            get_redis().set(key, forecast.model_dump_json(), ex=CACHE_TTL_SECONDS)
+        except RedisError:
+            logger.warning("Could not cache forecast for user %s", user_id)
+    return forecast
+
+
+def build_forecast(
+    db: Session, user_id: int, days: int, today: date
+) -> ForecastResponse:
+    accounts = (
+        db.query(Account.id, Account.bank_name, Account.last_balance)
+        .filter(Account.user_id == user_id)
+        .order_by(Account.id)
+        .all()
+    )
+    rows = {account_id: row for row, (account_id, _, _) in enumerate(accounts)}
+    end = today + timedelta(days=days)
+    events = [
+        event
+        for event in (
+            *_installment_events(db, user_id, today, end),
+            *_recurring_events(db, user_id, today, end),
+        )
+        if event[0] in rows
+    ]
+
+    flows = np.zeros((len(accounts), days))
+    if events:
+        np.add.at(
+            flows,
+            (
+                np.fromiter((rows[event[0]] for event in events), dtype=np.int64),
+                np.fromiter(
+                    ((event[1] - today).days for event in events), dtype=np.int64
+                ),
+            ),
+            np.fromiter((event[2] for event in events), dtype=np.float64),
+        )
+    starting = np.fromiter(
+        (balance or 0.0 for _, _, balance in accounts),
+        dtype=np.float64,
+        count=len(accounts),
+    )
+    balances = starting[:, None] + np.cumsum(flows, axis=1)
+    budgeted = _budgeted_spending(db, user_id, today, days, events)
+    totals = balances.sum(axis=0) - np.cumsum(budgeted)
+
+    day_labels = [today + timedelta(days=offset) for offset in range(days)]
+    return ForecastResponse(
+        start_date=today,
+        days=days,
+        starting_balance=round(float(starting.sum()), 2),
+        **_extremes(totals, day_labels),
+        accounts=[
+            AccountForecast(
+                account_id=account_id,
+                bank_name=bank_name,
+                starting_balance=round(float(starting[row]), 2),
+                **_extremes(balances[row], day_labels),
+                points=[
+                    ForecastPoint(day=day, balance=balance)
+                    for day, balance in zip(
+                        day_labels, np.round(balances[row], 2).tolist()
+                    )
+                ],
+            )
+            for row, (account_id, bank_name, _) in enumerate(accounts)
+        ],
+        points=[
+            ForecastDay(
+                day=day,
+                scheduled_amount=scheduled,
+                budgeted_amount=budget,
+                balance=balance,
+            )
+            for day, scheduled, budget, balance in zip(
+                day_labels,
+                np.round(flows.sum(axis=0), 2).tolist(),
+                np.round(budgeted, 2).tolist(),
+                np.round(totals, 2).tolist(),
+            )
+        ],
+    )
+
+
+def _installment_events(
+    db: Session, user_id: int, today: date, end: date
+) -> list[Event]:
+    """Unseen parcels from this month on, on the day the last one posted."""
+    plans = db.query(InstallmentPlan).filter(
+        InstallmentPlan.user_id == user_id,
+        InstallmentPlan.last_installment_seen < InstallmentPlan.installments_total,
+    )
+    plans = plans.all()
+    categories = _latest_categories(
+        db,
+        Transaction.installment_plan_id,
+        [plan.id for plan in plans],
+        Transaction.user_id == user_id,
+    )
+    current_month = month_index(today)
+    events = []
+    for plan in plans:
+        start = month_index(datetime.strptime(plan.start_month, "%Y-%m"))
+        day_of_month = plan.last_seen_at.day if plan.last_seen_at else 1
+        for number in range(
+            plan.last_installment_seen + 1, plan.installments_total + 1
+        ):
+            month = start + number - 1
+            if month < current_month:
+                continue
+            year, month = divmod(month, 12)
+            due = date(
+                year,
+                month + 1,
+                min(day_of_month, calendar.monthrange(year, month + 1)[1]),
+            )
+            if due >= end:
+                break
+            events.append(
+                (
+                    plan.account_id,
+                    max(due, today),
+                    -plan.installment_amount,
+                    categories.get(plan.id),
+                )
+            )
+    return events
+
+
+def _recurring_events(db: Session, user_id: int, today: date, end: date) -> list[Event]:
+    series = (
+        db.query(RecurringSeries)
+        .filter(
+            RecurringSeries.user_id == user_id,
+            RecurringSeries.cadence.is_not(None),
+            RecurringSeries.next_expected_date
+            >= today - timedelta(days=ACTIVE_GRACE_DAYS),
+        )
+        .all()
+    )
+    # The series' merchant is its last charge's, so that charge's category.
+    categories = _latest_categories(
+        db,
+        Transaction.merchant,
+        [item.merchant for item in series if item.merchant],
+        Transaction.user_id == user_id,
+    )
+    events = []
+    for item in series:
+        due = item.next_expected_date
+        while due < end:
+            # A charge that is late but within the grace period is due today.
+            events.append(
+                (
+                    item.account_id,
+                    max(due, today),
+                    -item.last_amount,
+                    categories.get(item.merchant),
+                )
+            )
+            due = advance(due, item.cadence)
+    return events
+
+
+def _latest_categories(db: Session, column, values: list, *conditions) -> dict:
+    """Category of the newest transaction for each value of ``column``."""
+    if not values:
+        return {}
+    return {
+        value: category_id
+        for value, category_id in db.query(column, Transaction.category_id)
+        .filter(column.in_(set(values)), *conditions)
+        .order_by(Transaction.id)
+    }
+
+
+def _budgeted_spending(
+    db: Session, user_id: int, today: date, days: int, events: list[Event]
+) -> np.ndarray:
+    """Spending that budgets still allow, per day.
+
+    Each window of a top-level budget allows its limit (the remainder, for
+    the current one) less the scheduled charges due in its categories
+    within the horizon, spread evenly over the window's days.
+    """
+    spending = np.zeros(days)
+    summaries = get_budget_summaries(db, user_id, include_subcategories=True)
+    if not summaries:
+        return spending
+    budgets = {
+        budget_id: (start_date, period)
+        for budget_id, start_date, period in db.query(
+            Budget.id, Budget.start_date, Budget.period
+        ).filter(Budget.user_id == user_id)
+    }
+    subtrees = category_subtrees(
+        db, {summary.category_id for summary in summaries}, user_id
+    )
+    now = datetime.combine(today, datetime.min.time())
+    end = today + timedelta(days=days)
+    for summary in _top_level(summaries, subtrees):
+        categories = set(subtrees.get(summary.category_id) or [summary.category_id])
+        scheduled = [
+            (day, -amount)
+            for _, day, amount, category_id in events
+            if category_id in categories
+        ]
+        start_date, period = budgets[summary.budget_id]
+        index = period_index(start_date, period, now)
+        _, window_end = period_window(start_date, period, index)
+        allowed = max(summary.amount_remaining, 0.0)
+        first = today
+        while first < end:
+            last = window_end.date()
+            due = sum(amount for day, amount in scheduled if first <= day < last)
+            offset = (first - today).days
+            window_days = max((last - first).days, 1)
+            spending[offset : offset + window_days] += (
+                max(allowed - due, 0.0) / window_days
+            )
+            index += 1
+            window_start, window_end = period_window(start_date, period, index)
+            first = window_start.date()
+            allowed = summary.amount_limit
+    return spending
+
+
+def _top_level(
+    summaries: list[BudgetSummary], subtrees: dict[int, list[int]]
+) -> list[BudgetSummary]:
+    """Summaries whose category no other budget's subtree already covers.
+
+    Of several budgets on one category, the oldest is kept.
+    """
+    kept = []
+    seen_categories = set()
+    for summary in summaries:
+        nested = any(
+            other.category_id != summary.category_id
+            and summary.category_id in subtrees.get(other.category_id, ())
+            for other in summaries
+        )
+        if not nested and summary.category_id not in seen_categories:
+            seen_categories.add(summary.category_id)
+            kept.append(summary)
+    return kept
+
+
+def _extremes(balances: np.ndarray, day_labels: list[date]) -> dict:
+    lowest = int(np.argmin(balances))
+    return {
+        "ending_balance": round(float(balances[-1]), 2),
+        "lowest_balance": round(float(balances[lowest]), 2),
+        "lowest_balance_day": day_labels[lowest],
+    }
+
+
+def _cache_key(user_id: int, days: int, today: date) -> str | None:
+    versions = resource_versions(user_id, FORECAST_RESOURCES)
+    if versions is None:
+        return None
+    digest = hashlib.sha1("|".join(versions).encode("utf-8")).hexdigest()[:20]
+    return f"forecast:{user_id}:{today.isoformat()}:{days}:{digest}"
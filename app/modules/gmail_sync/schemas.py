@@ -31,6 +31,8 @@ class SyncResult(BaseModel):
     messages_found: int
     messages_parsed: int
     transactions_created: int
+    duplicates_skipped: int = 0
+    possible_duplicates: int = 0
     errors: List[str]
 
 
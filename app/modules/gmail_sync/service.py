@@ -18,6 +18,7 @@ from app.modules.email_parser.parser import detect_bank, parse_email
 from app.modules.email_parser.schemas import RawEmailIngest
 from app.modules.email_parser.service import build_transaction_create, ingest_email
 from app.modules.gmail_sync.schemas import GmailMessage, GmailSyncConfig, SyncResult
+from app.modules.transactions.dedup import DuplicateTransactionError
 from app.modules.transactions.service import create_transaction
 
 # OAuth 2.0 scopes for Gmail
@@ -288,6 +289,8 @@ def sync_gmail_emails(
     messages_found = 0
     messages_parsed = 0
     transactions_created = 0
+    duplicates_skipped = 0
+    possible_duplicates = 0
 
     try:
         # Search for bank emails
@@ -335,8 +338,14 @@ def sync_gmail_emails(
 
             if create_payload:
                 try:
-                    create_transaction(db, user_id=user_id, payload=create_payload)
+                    transaction = create_transaction(
+                        db, user_id=user_id, payload=create_payload
+                    )
                     transactions_created += 1
+                    if transaction.possible_duplicate_of is not None:
+                        possible_duplicates += 1
+                except DuplicateTransactionError:
+                    duplicates_skipped += 1
                 except ValueError as exc:
                     errors.append(str(exc))
 
@@ -347,5 +356,7 @@ def sync_gmail_emails(
         messages_found=messages_found,
         messages_parsed=messages_parsed,
         transactions_created=transactions_created,
+        duplicates_skipped=duplicates_skipped,
+        possible_duplicates=possible_duplicates,
         errors=errors,
     )
@@ -0,0 +1,35 @@
+"""Regroup installment parcels into plans.
+
+Usage:
+    python -m app.modules.installments.cli [--user-id 1]
+"""
+
+import argparse
+import sys
+
+from app.core.database import SessionLocal
+from app.modules.installments.plans import rebuild_installment_plans
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Rebuild installment_plans from transactions."
+    )
+    parser.add_argument(
+        "--user-id", type=int, default=None, help="Only rebuild this user's plans"
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        plans = rebuild_installment_plans(db, user_id=args.user_id)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Rebuilt {plans} installment plans.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Group installment parcels into ``installment_plans`` at ingest time.
+
+Each parcel ("3/10") is linked to the plan identified by account, card,
+normalized merchant, per-parcel amount, number of installments and the
+month of the first parcel. The transaction service calls
+``link_installment_rows`` before inserting and ``refresh_installment_plans``
+after a parcel changes or disappears, so commitment queries read plan rows
+instead of regrouping transactions.
+"""
+
+import re
+from datetime import datetime
+from typing import Iterable, Mapping
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import InstallmentPlan, Transaction
+from app.modules.ai_agent.rules import normalize
+from app.modules.transactions.schemas import INFLOW_TRANSACTION_TYPES
+
+REBUILD_BATCH_SIZE = 1000
+# Fields of a transaction that decide which plan its parcel belongs to.
+PLAN_FIELDS = (
+    "user_id",
+    "account_id",
+    "card_last4",
+    "merchant",
+    "amount",
+    "transaction_date",
+    "transaction_type",
+    "installments_current",
+    "installments_total",
+)
+
+_PARCEL_MARK = re.compile(r"\b(parc(ela)?\s*)?\d{1,2}\s*(/|de)\s*\d{1,2}\b")
+_SPACES = re.compile(r"\s+")
+
+PlanKey = tuple[int, int, str, str, int, int, str]
+
+
+def merchant_key(merchant: str | None) -> str:
+    """Normalized merchant without parcel markers such as "PARC 02/10"."""
+    cleaned = _PARCEL_MARK.sub(" ", normalize(merchant or ""))
+    return _SPACES.sub(" ", cleaned).strip()
+
+
+def month_index(value: datetime) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def month_label(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def plan_key(row: Mapping) -> PlanKey | None:
+    total = row.get("installments_total")
+    if not total or total < 2 or row.get("transaction_date") is None:
+        return None
+    if row.get("transaction_type") in INFLOW_TRANSACTION_TYPES:
+        return None
+    current = row.get("installments_current") or 1
+    start = month_index(row["transaction_date"]) - (current - 1)
+    return (
+        row["user_id"],
+        row["account_id"],
+        row.get("card_last4") or "",
+        merchant_key(row.get("merchant")),
+        round(row["amount"] * 100),
+        total,
+        month_label(start),
+    )
+
+
+def plan_fields(transaction: Transaction) -> dict:
+    return {field: getattr(transaction, field) for field in PLAN_FIELDS}
+
+
+def link_installment_rows(db: Session, rows: list[dict]) -> None:
+    """Set ``installment_plan_id`` on parcel rows, creating plans as needed.
+
+    Rows are transaction dicts about to be inserted (or re-linked); plans
+    are looked up with one query per batch. The caller owns the commit.
+    """
+    keyed = [(row, plan_key(row)) for row in rows]
+    keyed = [(row, key) for row, key in keyed if key is not None]
+    for row in rows:
+        row.setdefault("installment_plan_id", None)
+    if not keyed:
+        return
+
+    plans = _load_plans(db, {key for _, key in keyed})
+    for row, key in keyed:
+        plan = plans.get(key)
+        if plan is None:
+            plan = InstallmentPlan(
+                user_id=key[0],
+                account_id=key[1],
+                card_last4=key[2],
+                merchant=row.get("merchant"),
+                merchant_key=key[3],
+                installment_amount=row["amount"],
+                amount_cents=key[4],
+                installments_total=key[5],
+                start_month=key[6],
+                last_installment_seen=0,
+                parcel_count=0,
+            )
+            db.add(plan)
+            plans[key] = plan
+        plan.last_installment_seen = max(
+            plan.last_installment_seen, row.get("installments_current") or 1
+        )
+        plan.parcel_count += 1
+        seen_at = row["transaction_date"].replace(tzinfo=None)
+        if plan.last_seen_at is None or seen_at > plan.last_seen_at:
+            plan.last_seen_at = seen_at
+    db.flush()
+    for row, key in keyed:
+        row["installment_plan_id"] = plans[key].id
+
+
+def refresh_installment_plans(db: Session, plan_ids: Iterable[int | None]) -> None:
+    """Recompute plans from their linked parcels; drop plans left empty."""
+    plan_ids = {plan_id for plan_id in plan_ids if plan_id is not None}
+    if not plan_ids:
+        return
+    db.flush()
+    stats = {
+        plan_id: (count, last_installment, last_seen)
+        for plan_id, count, last_installment, last_seen in db.query(
+            Transaction.installment_plan_id,
+            func.count(),
+            func.max(func.coalesce(Transaction.installments_current, 1)),
+            func.max(Transaction.transaction_date),
+        )
+        .filter(Transaction.installment_plan_id.in_(plan_ids))
+        .group_by(Transaction.installment_plan_id)
+    }
+    for plan in db.query(InstallmentPlan).filter(InstallmentPlan.id.in_(plan_ids)):
+        if plan.id not in stats:
+            db.delete(plan)
+            continue
+        count, last_installment, last_seen = stats[plan.id]
+        plan.parcel_count = count
+        plan.last_installment_seen = last_installment
+        plan.last_seen_at = last_seen
+    db.flush()
+
+
+def link_transaction(db: Session, transaction: Transaction) -> None:
+    row = plan_fields(transaction)
+    link_installment_rows(db, [row])
+    transaction.installment_plan_id = row["installment_plan_id"]
+
+
+def relink_transaction(db: Session, transaction: Transaction) -> None:
+    """Move an edited parcel to the plan its current fields point to."""
+    previous_plan_id = transaction.installment_plan_id
+    link_transaction(db, transaction)
+    # Recounting the old plan also corrects it when the parcel stayed put.
+    refresh_installment_plans(db, [previous_plan_id])
+
+
+def relink_transactions(db: Session, transaction_ids: list[int]) -> None:
+    """Set-based ``relink_transaction`` for rows changed by a bulk UPDATE.
+
+    The rows still point at their old plans; both old and new plans are
+    recounted afterwards. The caller owns the commit.
+    """
+    columns = [getattr(Transaction, field) for field in PLAN_FIELDS]
+    touched: set[int | None] = set()
+    for offset in range(0, len(transaction_ids), REBUILD_BATCH_SIZE):
+        batch_ids = transaction_ids[offset : offset + REBUILD_BATCH_SIZE]
+        rows = [
+            row._asdict()
+            for row in db.execute(
+                select(Transaction.id, Transaction.installment_plan_id, *columns).where(
+                    Transaction.id.in_(batch_ids),
+                    or_(
+                        Transaction.installments_total > 1,
+                        Transaction.installment_plan_id.is_not(None),
+                    ),
+                )
+            )
+        ]
+        previous = {row["id"]: row.pop("installment_plan_id") for row in rows}
+        link_installment_rows(db, rows)
+        moved = [
+            {"id": row["id"], "installment_plan_id": row["installment_plan_id"]}
+            for row in rows
+            if row["installment_plan_id"] != previous[row["id"]]
+        ]
+        if moved:
+            db.execute(update(Transaction), moved)
+        touched.update(previous.values())
+        touched.update(row["installment_plan_id"] for row in rows)
+    refresh_installment_plans(db, touched)
+
+
+def rebuild_installment_plans(db: Session, user_id: int | None = None) -> int:
+    """Regroup every parcel from scratch; returns the number of plans.
+
+    The caller owns the commit.
+    """
+    unlink = update(Transaction).values(installment_plan_id=None)
+    plans = db.query(InstallmentPlan)
+    parcels = select(Transaction.id, *[getattr(Transaction, f) for f in PLAN_FIELDS])
+    parcels = parcels.where(Transaction.installments_total > 1)
+    if user_id is not None:
+        unlink = unlink.where(Transaction.user_id == user_id)
+        plans = plans.filter(InstallmentPlan.user_id == user_id)
+        parcels = parcels.where(Transaction.user_id == user_id)
+    db.execute(unlink, execution_options={"synchronize_session": False})
+    plans.delete(synchronize_session=False)
+
+    rows = [row._asdict() for row in db.execute(parcels)]
+    for offset in range(0, len(rows), REBUILD_BATCH_SIZE):
+        batch = rows[offset : offset + REBUILD_BATCH_SIZE]
+        link_installment_rows(db, batch)
+        linked = [
+            {"id": row["id"], "installment_plan_id": row["installment_plan_id"]}
+            for row in batch
+            if row["installment_plan_id"] is not None
+        ]
+        if linked:
+            db.execute(update(Transaction), linked)
+    return plans.count()
+
+
+def _load_plans(db: Session, keys: set[PlanKey]) -> dict[PlanKey, InstallmentPlan]:
+    user_ids = {key[0] for key in keys}
+    merchant_keys = {key[3] for key in keys}
+    candidates = db.query(InstallmentPlan).filter(
+        InstallmentPlan.user_id.in_(user_ids),
+        InstallmentPlan.merchant_key.in_(merchant_keys),
+    )
+    plans = {}
+    for plan in candidates:
+        key = (
+            plan.user_id,
+            plan.account_id,
+            plan.card_last4,
+            plan.merchant_key,
+            plan.amount_cents,
+            plan.installments_total,
+            plan.start_month,
+        )
+        if key in keys:
+            plans[key] = plan
+    return plans
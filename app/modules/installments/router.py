@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.pagination import PaginationParams, get_pagination_params
+from app.models import User
+from app.modules.auth.router import get_current_user
+from app.modules.installments.schemas import (
+    CommitmentsResponse,
+    InstallmentPlanListResponse,
+)
+from app.modules.installments.service import (
+    get_future_commitments,
+    list_installment_plans,
+)
+
+router = APIRouter(prefix="/installments", tags=["installments"])
+
+
+@router.get("/plans", response_model=InstallmentPlanListResponse)
+def list_plans(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    active_only: bool = True,
+    pagination: PaginationParams = Depends(get_pagination_params),
+):
+    items, total = list_installment_plans(
+        db,
+        user_id=current_user.id,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        active_only=active_only,
+    )
+    return {
+        "items": items,
+        "total": total,
+        "skip": pagination.skip,
+        "limit": pagination.limit,
+    }
+
+
+@router.get("/commitments", response_model=CommitmentsResponse)
+def commitments(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    months: int = Query(12, ge=1, le=60),
+    account_id: int | None = None,
+):
+    return get_future_commitments(
+        db, user_id=current_user.id, months=months, account_id=account_id
+    )
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class InstallmentPlanRead(BaseModel):
+    id: int
+    account_id: int
+    card_last4: str
+    merchant: str | None = None
+    installment_amount: float
+    installments_total: int
+    start_month: str
+    last_installment_seen: int
+    parcel_count: int
+    last_seen_at: datetime | None = None
+    remaining_installments: int
+    remaining_amount: float
+
+    class Config:
+        from_attributes = True
+
+
+class InstallmentPlanListResponse(BaseModel):
+    items: list[InstallmentPlanRead]
+    total: int
+    skip: int
+    limit: int
+
+
+class ProjectedInstallment(BaseModel):
+    plan_id: int
+    merchant: str | None = None
+    card_last4: str
+    installment_number: int
+    installments_total: int
+    amount: float
+
+
+class MonthlyCommitment(BaseModel):
+    month: str
+    total_amount: float
+    installments: list[ProjectedInstallment]
+
+
+class CommitmentsResponse(BaseModel):
+    total_amount: float
+    months: list[MonthlyCommitment]
@@ -0,0 +1,106 @@
+from collections import defaultdict
+from datetime import UTC, datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.etag import TRANSACTIONS
+from app.core.pagination import paginate_query
+from app.models import InstallmentPlan
+from app.modules.installments.plans import month_index, month_label
+from app.modules.installments.schemas import (
+    CommitmentsResponse,
+    InstallmentPlanRead,
+    MonthlyCommitment,
+    ProjectedInstallment,
+)
+
+
+def list_installment_plans(
+    db: Session, user_id: int, skip: int, limit: int, active_only: bool = True
+) -> tuple[list[InstallmentPlanRead], int]:
+    query = db.query(InstallmentPlan).filter(InstallmentPlan.user_id == user_id)
+    if active_only:
+        query = query.filter(
+            InstallmentPlan.last_installment_seen < InstallmentPlan.installments_total
+        )
+    query = query.order_by(InstallmentPlan.start_month.desc(), InstallmentPlan.id)
+    plans, total = paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(TRANSACTIONS,)
+    )
+    return [_to_read(plan) for plan in plans], total
+
+
+def get_future_commitments(
+    db: Session,
+    user_id: int,
+    months: int = 12,
+    account_id: int | None = None,
+    now: datetime | None = None,
+) -> CommitmentsResponse:
+    """Remaining parcels of every open plan, grouped by the month they fall in.
+
+    Parcel n of a plan falls ``n - 1`` months after its first parcel. Only
+    parcels not yet seen, from the current month up to ``months`` ahead,
+    are projected.
+    """
+    query = db.query(InstallmentPlan).filter(
+        InstallmentPlan.user_id == user_id,
+        InstallmentPlan.last_installment_seen < InstallmentPlan.installments_total,
+    )
+    if account_id is not None:
+        query = query.filter(InstallmentPlan.account_id == account_id)
+
+    first_month = month_index(now or datetime.now(UTC))
+    last_month = first_month + months - 1
+    by_month: dict[int, list[ProjectedInstallment]] = defaultdict(list)
+    for plan in query:
+        start = month_index(datetime.strptime(plan.start_month, "%Y-%m"))
+        for number in range(
+            plan.last_installment_seen + 1, plan.installments_total + 1
+        ):
+            due = start + number - 1
+            if due < first_month:
+                continue
+            if due > last_month:
+                break
+            by_month[due].append(
+                ProjectedInstallment(
+                    plan_id=plan.id,
+                    merchant=plan.merchant,
+                    card_last4=plan.card_last4,
+                    installment_number=number,
+                    installments_total=plan.installments_total,
+                    amount=plan.installment_amount,
+                )
+            )
+
+    commitments = [
+        MonthlyCommitment(
+            month=month_label(index),
+            total_amount=round(sum(item.amount for item in items), 2),
+            installments=items,
+        )
+        for index, items in sorted(by_month.items())
+    ]
+    return CommitmentsResponse(
+        total_amount=round(sum(month.total_amount for month in commitments), 2),
+        months=commitments,
+    )
+
+
+def _to_read(plan: InstallmentPlan) -> InstallmentPlanRead:
+    remaining = plan.installments_total - plan.last_installment_seen
+    return InstallmentPlanRead(
+        id=plan.id,
+        account_id=plan.account_id,
+        card_last4=plan.card_last4,
+        merchant=plan.merchant,
+        installment_amount=plan.installment_amount,
+        installments_total=plan.installments_total,
+        start_month=plan.start_month,
+        last_installment_seen=plan.last_installment_seen,
+        parcel_count=plan.parcel_count,
+        last_seen_at=plan.last_seen_at,
+        remaining_installments=remaining,
+        remaining_amount=round(remaining * plan.installment_amount, 2),
+    )
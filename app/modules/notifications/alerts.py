@@ -0,0 +1,122 @@
+"""Budget threshold alerts.
+
+After a transaction write commits, the budget spend counters it moved (see
+``app.modules.budgets.counters``) are handed to ``evaluate_budget_alerts``
+with their new totals, so only the budgets on the written categories and
+their ancestors are looked at, and no SQL runs. A budget reaching one of
+``settings.budget_alert_thresholds`` percent of its limit queues one
+notification per threshold, window and limit: a ``SET NX`` marker that
+expires after the window dedupes repeated writes and concurrent workers.
+Keying it on the limit too means a budget whose limit is changed alerts
+again against the new one. Markers of alerts that can't be queued are
+removed again, so the next write retries.
+"""
+
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import Iterable, NamedTuple
+
+from redis.exceptions import RedisError
+
+from app.core.cache import get_redis
+from app.core.config import settings
+from app.modules.notifications.schemas import QueuedNotification
+from app.modules.notifications.service import enqueue_notifications
+
+ALERT_CHANNEL = "in_app"
+ALERT_KIND = "budget_threshold"
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetSpend(NamedTuple):
+    user_id: int
+    budget_id: int
+    category_id: int
+    amount_limit: float
+    period_start: datetime
+    period_end: datetime
+    amount_spent: float = 0.0
+
+
+def evaluate_budget_alerts(
+    spends: Iterable[BudgetSpend], now: datetime | None = None
+) -> list[QueuedNotification]:
+    """Queue and return alerts for thresholds reached for the first time.
+
+    When a write jumps several thresholds at once only the highest is
+    reported; the lower ones are marked as sent all the same.
+    """
+    thresholds = sorted(settings.budget_alert_thresholds)
+    candidates = []
+    for spend in spends:
+        if spend.amount_limit <= 0:
+            continue
+        percent = spend.amount_spent / spend.amount_limit * 100
+        reached = [threshold for threshold in thresholds if percent >= threshold]
+        if reached:
+            candidates.append((spend, reached))
+    if not candidates:
+        return []
+
+    now = now or datetime.now(UTC).replace(tzinfo=None)
+    try:
+        pipeline = get_redis().pipeline()
+        for spend, reached in candidates:
+            # Markers outlive their window by a day, then expire on their own.
+            expires = spend.period_end + timedelta(days=1) - now
+            for threshold in reached:
+                pipeline.set(
+                    _marker_key(spend, threshold),
+                    1,
+                    nx=True,
+                    ex=max(int(expires.total_seconds()), 1),
+                )
+        results = iter(pipeline.execute())
+    except RedisError:
+        logger.warning("Could not evaluate budget alerts")
+        return []
+
+    alerts = []
+    markers = []
+    for spend, reached in candidates:
+        new = [threshold for threshold in reached if next(results)]
+        if new:
+            alerts.append(_alert(spend, max(new), now))
+            markers.extend(_marker_key(spend, threshold) for threshold in new)
+    if not enqueue_notifications(alerts):
+        try:
+            get_redis().delete(*markers)
+        except RedisError:
+            logger.warning("Could not clear budget alert markers %s", markers)
+        return []
+    return alerts
+
+
+def _alert(spend: BudgetSpend, threshold: int, now: datetime) -> QueuedNotification:
+    return QueuedNotification(
+        user_id=spend.user_id,
+        channel=ALERT_CHANNEL,
+        kind=ALERT_KIND,
+        message=(
+            f"Budget {spend.budget_id} reached {threshold}% of its limit "
+            f"({spend.amount_spent:.2f} of {spend.amount_limit:.2f})."
+        ),
+        data={
+            "budget_id": spend.budget_id,
+            "category_id": spend.category_id,
+            "threshold": threshold,
+            "amount_spent": spend.amount_spent,
+            "amount_limit": spend.amount_limit,
+            "period_start": spend.period_start.isoformat(),
+            "period_end": spend.period_end.isoformat(),
+        },
+        created_at=now,
+    )
+
+
+def _marker_key(spend: BudgetSpend, threshold: int) -> str:
+    return (
+        f"budget_alert:{spend.budget_id}:{spend.period_start.isoformat()}:"
+        f"{spend.amount_limit!r}:{threshold}"
+    )
@@ -13,4 +13,4 @@ def send(
     payload: NotificationRequest,
     current_user: User = Depends(get_current_user),
 ):
-    return send_notification(payload)
+    return send_notification(current_user.id, payload)
@@ -1,6 +1,18 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
 class NotificationRequest(BaseModel):
     channel: str
     message: str
+
+
+class QueuedNotification(BaseModel):
+    user_id: int
+    channel: str
+    message: str
+    kind: str = "message"
+    data: dict = {}
+    # Naive UTC, like every stored timestamp.
+    created_at: datetime
@@ -1,5 +1,51 @@
-from app.modules.notifications.schemas import NotificationRequest
+"""Outgoing notifications, queued in Redis for a delivery worker.
 
+Producers push onto the ``notifications:queue`` list and a worker pops from
+the other end with ``pop_notifications``, so enqueuing costs one round trip
+on the request that caused it.
+"""
 
-def send_notification(payload: NotificationRequest) -> dict:
+import logging
+from datetime import UTC, datetime
+
+from redis.exceptions import RedisError
+
+from app.core.cache import get_redis
+from app.modules.notifications.schemas import NotificationRequest, QueuedNotification
+
+NOTIFICATION_QUEUE = "notifications:queue"
+
+logger = logging.getLogger(__name__)
+
+
+def send_notification(user_id: int, payload: NotificationRequest) -> dict:
+    notification = QueuedNotification(
+        user_id=user_id,
+        channel=payload.channel,
+        message=payload.message,
+        created_at=datetime.now(UTC).replace(tzinfo=None),
+    )
+    if not enqueue_notifications([notification]):
+        return {"status": "failed", "channel": payload.channel}
     return {"status": "queued", "channel": payload.channel}
+
+
+def enqueue_notifications(notifications: list[QueuedNotification]) -> bool:
+    """Push ``notifications`` in order; returns False if Redis is unavailable."""
+    if not notifications:
+        return True
+    try:
+        get_redis().lpush(
+            NOTIFICATION_QUEUE,
+            *[notification.model_dump_json() for notification in notifications],
+        )
+    except RedisError:
+        logger.warning("Could not queue %s notifications", len(notifications))
+        return False
+    return True
+
+
+def pop_notifications(count: int = 100) -> list[QueuedNotification]:
+    """Oldest queued notifications, removed from the queue."""
+    items = get_redis().rpop(NOTIFICATION_QUEUE, count) or []
+    return [QueuedNotification.model_validate_json(item) for item in items]
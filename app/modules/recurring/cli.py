@@ -0,0 +1,40 @@
+"""Detect recurring charges; meant to run nightly.
+
+Usage:
+    python -m app.modules.recurring.cli [--full] [--batch-size 5000]
+
+Each run only reads transactions inserted since the previous one, plus a
+short overlap for late commits. Use ``--full`` after bulk edits or
+deletions to recompute every series.
+"""
+
+import argparse
+import sys
+
+from app.core.database import SessionLocal
+from app.modules.recurring.detection import BATCH_SIZE, detect_recurring
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Detect recurring charges.")
+    parser.add_argument(
+        "--full", action="store_true", help="Recompute every series from scratch"
+    )
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        result = detect_recurring(db, full=args.full, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(
+        f"Scanned {result.transactions_scanned} transactions, updated "
+        f"{result.series_updated} series; {result.recurring_series} recurring."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+"""Detect recurring charges such as subscriptions and phone bills.
+
+Spending transactions are grouped per user by ``recurring_key``, which is the
+normalized merchant without reference numbers, so "NETFLIX.COM 8871" and
+"Netflix.com 9120" land together. Each group keeps running sums in
+``recurring_series``: count, amount and interval sums and their squares. A
+run therefore only reads transactions inserted since the previous run, in
+``(created_at, id)`` order from the ``recurring`` row of ``job_watermarks``,
+and folds them in. A group becomes recurring once it has
+``MIN_OCCURRENCES`` charges whose mean interval matches a cadence and whose
+intervals and amounts barely vary.
+
+``created_at`` is stamped at insert, before the commit, so a slow
+transaction can become visible behind the watermark. Each run re-reads the
+last ``WATERMARK_OVERLAP`` before it; those rows may have been folded in
+already, so their series are recomputed rather than appended to. So is a
+series that gets a charge dated before its last one (a backdated import).
+A recount reads only the user's transactions from that merchant. Edits and
+deletions are reconciled by a ``full`` run.
+"""
+
+import calendar
+import math
+import re
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from typing import NamedTuple, Sequence
+
+import numpy as np
+from sqlalchemy import and_, func, not_, or_
+from sqlalchemy.orm import Session
+
+from app.core.etag import RECURRING, touch
+from app.models import JobWatermark, RecurringSeries, Transaction
+from app.modules.analytics.rollups import spending_condition
+from app.modules.installments.plans import merchant_key
+
+WATERMARK = "recurring"
+# Longest an insert may take to commit after stamping ``created_at``.
+WATERMARK_OVERLAP = timedelta(minutes=10)
+BATCH_SIZE = 5000
+MIN_OCCURRENCES = 3
+# Nominal days between charges.
+CADENCES = {"weekly": 7.0, "monthly": 30.44, "yearly": 365.25}
+# Allowed deviation of the mean interval, and the interval standard
+# deviation, as a fraction of the cadence.
+INTERVAL_TOLERANCE = 0.15
+# Allowed amount standard deviation as a fraction of the mean amount.
+AMOUNT_TOLERANCE = 0.2
+
+_WORD = re.compile(r"[a-z0-9]+")
+_DIGIT = re.compile(r"\d")
+
+SeriesKey = tuple[int, str]
+# A transaction's place in insert order: (created_at, id).
+Position = tuple[datetime, int]
+
+
+@dataclass
+class GroupStats:
+    user_id: int
+    merchant_key: str
+    merchant: str | None
+    account_id: int
+    count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+    last_amount: float
+    amount_sum: float
+    amount_sq_sum: float
+    interval_sum: float
+    interval_sq_sum: float
+
+
+class DetectionResult(NamedTuple):
+    transactions_scanned: int
+    series_updated: int
+    recurring_series: int
+
+
+def recurring_key(merchant: str | None) -> str:
+    words = _WORD.findall(merchant_key(merchant))
+    return " ".join(word for word in words if not _DIGIT.search(word))
+
+
+def group_stats(rows: Sequence) -> list[GroupStats]:
+    """Stats per (user, merchant key) of transaction rows.
+
+    Rows need ``user_id``, ``account_id``, ``merchant``, ``amount`` and
+    ``transaction_date``. They are sorted once by (group, date); sums then
+    come from ``bincount`` and intervals from one ``diff`` masked at group
+    boundaries.
+    """
+    keys = [(row.user_id, recurring_key(row.merchant)) for row in rows]
+    kept = [index for index, key in enumerate(keys) if key[1]]
+    if not kept:
+        return []
+    labels: dict[SeriesKey, int] = {}
+    groups = np.fromiter(
+        (labels.setdefault(keys[index], len(labels)) for index in kept),
+        dtype=np.int64,
+        count=len(kept),
+    )
+    days = (
+        np.array(
+            [rows[index].transaction_date for index in kept], dtype="datetime64[s]"
+        ).astype(np.int64)
+        / 86400.0
+    )
+    amounts = np.fromiter(
+        (rows[index].amount for index in kept), dtype=np.float64, count=len(kept)
+    )
+    order = np.lexsort((days, groups))
+    groups, days, amounts = groups[order], days[order], amounts[order]
+    positions = np.asarray(kept)[order]
+
+    size = len(labels)
+    counts = np.bincount(groups, minlength=size)
+    amount_sums = np.bincount(groups, weights=amounts, minlength=size)
+    amount_sq_sums = np.bincount(groups, weights=amounts * amounts, minlength=size)
+    same_group = groups[1:] == groups[:-1]
+    intervals = np.diff(days)[same_group]
+    interval_groups = groups[1:][same_group]
+    interval_sums = np.bincount(interval_groups, weights=intervals, minlength=size)
+    interval_sq_sums = np.bincount(
+        interval_groups, weights=intervals * intervals, minlength=size
+    )
+    firsts = np.searchsorted(groups, np.arange(size))
+    lasts = firsts + counts - 1
+
+    stats = []
+    for (user_id, key), label in labels.items():
+        first = rows[positions[firsts[label]]]
+        last = rows[positions[lasts[label]]]
+        stats.append(
+            GroupStats(
+                user_id=user_id,
+                merchant_key=key,
+                merchant=last.merchant,
+                account_id=last.account_id,
+                count=int(counts[label]),
+                first_seen_at=first.transaction_date,
+                last_seen_at=last.transaction_date,
+                last_amount=last.amount,
+                amount_sum=float(amount_sums[label]),
+                amount_sq_sum=float(amount_sq_sums[label]),
+                interval_sum=float(interval_sums[label]),
+                interval_sq_sum=float(interval_sq_sums[label]),
+            )
+        )
+    return stats
+
+
+def classify(series: RecurringSeries) -> str | None:
+    """The cadence the series' charges follow, or None if not periodic."""
+    count = series.occurrence_count
+    if count < MIN_OCCURRENCES:
+        return None
+    mean_amount = series.amount_sum / count
+    if mean_amount <= 0:
+        return None
+    if _std(series.amount_sum, series.amount_sq_sum, count) > (
+        AMOUNT_TOLERANCE * mean_amount
+    ):
+        return None
+    mean_interval = series.interval_sum / (count - 1)
+    interval_std = _std(series.interval_sum, series.interval_sq_sum, count - 1)
+    for cadence, days in CADENCES.items():
+        tolerance = INTERVAL_TOLERANCE * days
+        if abs(mean_interval - days) <= tolerance and interval_std <= tolerance:
+            return cadence
+    return None
+
+
+def advance(day: date, cadence: str) -> date:
+    """The charge after one on ``day``."""
+    if cadence == "weekly":
+        return day + timedelta(days=7)
+    return _add_months(day, 1 if cadence == "monthly" else 12)
+
+
+def next_expected_date(last_seen: datetime, cadence: str) -> date:
+    return advance(last_seen.date(), cadence)
+
+
+def detect_recurring(
+    db: Session, full: bool = False, batch_size: int = BATCH_SIZE
+) -> DetectionResult:
+    """Fold transactions inserted since the last run into their series.
+
+    ``full`` drops every series and starts over from the first transaction.
+    Commits after each batch, so an interrupted run resumes where it
+    stopped. Rows re-read from the overlap aren't counted as scanned.
+    """
+    watermark = db.get(JobWatermark, WATERMARK)
+    if watermark is None:
+        watermark = JobWatermark(name=WATERMARK, last_transaction_id=0)
+        db.add(watermark)
+    if full:
+        db.query(RecurringSeries).delete(synchronize_session=False)
+        watermark.last_created_at = None
+        watermark.last_transaction_id = 0
+
+    seen: Position | None = None
+    cursor: Position | None = None
+    if watermark.last_created_at is not None:
+        seen = (watermark.last_created_at, watermark.last_transaction_id)
+        cursor = (watermark.last_created_at - WATERMARK_OVERLAP, 0)
+    scanned = updated = 0
+    while True:
+        query = _candidates(db)
+        if cursor is not None:
+            query = query.filter(_after(cursor))
+        rows = (
+            query.order_by(Transaction.created_at, Transaction.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        # Rows come in position order, so the re-read ones lead the batch.
+        replayed = [row for row in rows if seen and _position(row) <= seen]
+        fresh = rows[len(replayed) :]
+        updated += _apply_batch(db, fresh, replayed, up_to=_position(rows[-1]))
+        scanned += len(fresh)
+        cursor = _position(rows[-1])
+        if seen is None or cursor > seen:
+            watermark.last_created_at, watermark.last_transaction_id = cursor
+        watermark.updated_at = datetime.now(UTC).replace(tzinfo=None)
+        db.commit()
+    db.commit()
+
+    recurring = (
+        db.query(func.count(RecurringSeries.id))
+        .filter(RecurringSeries.cadence.is_not(None))
+        .scalar()
+    )
+    return DetectionResult(scanned, updated, recurring)
+
+
+def _candidates(db: Session):
+    # Installment parcels are grouped by app.modules.installments instead.
+    return db.query(
+        Transaction.id,
+        Transaction.user_id,
+        Transaction.account_id,
+        Transaction.merchant,
+        Transaction.amount,
+        Transaction.transaction_date,
+        Transaction.created_at,
+    ).filter(
+        spending_condition(),
+        Transaction.transaction_date.is_not(None),
+        func.coalesce(Transaction.installments_total, 1) <= 1,
+    )
+
+
+def _position(row) -> Position:
+    return (row.created_at, row.id)
+
+
+def _after(position: Position):
+    created_at, transaction_id = position
+    return or_(
+        Transaction.created_at > created_at,
+        and_(Transaction.created_at == created_at, Transaction.id > transaction_id),
+    )
+
+
+def _apply_batch(db: Session, fresh: list, replayed: list, up_to: Position) -> int:
+    """Fold ``fresh`` rows in and recount the series ``replayed`` rows touch."""
+    recount: dict[int, set[str]] = {}
+    for row in replayed:
+        key = recurring_key(row.merchant)
+        if key:
+            recount.setdefault(row.user_id, set()).add(key)
+    stats = group_stats(fresh)
+    updated = {(item.user_id, item.merchant_key) for item in stats}
+    updated |= {(user_id, key) for user_id, keys in recount.items() for key in keys}
+    series_by_key = _load_series(db, updated)
+    for item in stats:
+        if item.merchant_key in recount.get(item.user_id, ()):
+            continue
+        key = (item.user_id, item.merchant_key)
+        series = series_by_key.get(key)
+        if series is None:
+            series = RecurringSeries(
+                user_id=item.user_id, merchant_key=item.merchant_key
+            )
+            _overwrite(series, item)
+            db.add(series)
+            series_by_key[key] = series
+        elif item.first_seen_at < series.last_seen_at:
+            recount.setdefault(item.user_id, set()).add(item.merchant_key)
+            continue
+        else:
+            _append(series, item)
+        _classify(series)
+
+    # Recount up to this batch; later positions come with later batches.
+    for user_id, keys in recount.items():
+        for item in group_stats(_history(db, user_id, keys, up_to)):
+            if item.merchant_key not in keys:
+                continue
+            key = (user_id, item.merchant_key)
+            series = series_by_key.get(key)
+            if series is None:
+                series = RecurringSeries(user_id=user_id, merchant_key=key[1])
+                db.add(series)
+                series_by_key[key] = series
+            _overwrite(series, item)
+            _classify(series)
+    for user_id in {user_id for user_id, _ in updated}:
+        touch(db, user_id, RECURRING)
+    db.flush()
+    return len(updated)
+
+
+def _history(db: Session, user_id: int, keys: set[str], up_to: Position) -> list:
+    """The user's candidate rows up to ``up_to`` whose merchant maps to ``keys``.
+
+    Merchant keys aren't stored, so the user's distinct merchant spellings
+    are matched here and only their rows are loaded.
+    """
+    merchants = [
+        merchant
+        for (merchant,) in db.query(Transaction.merchant)
+        .filter(Transaction.user_id == user_id, Transaction.merchant.is_not(None))
+        .distinct()
+        if recurring_key(merchant) in keys
+    ]
+    if not merchants:
+        return []
+    return (
+        _candidates(db)
+        .filter(
+            Transaction.user_id == user_id,
+            Transaction.merchant.in_(merchants),
+            not_(_after(up_to)),
+        )
+        .all()
+    )
+
+
+def _load_series(db: Session, keys: set[SeriesKey]) -> dict[SeriesKey, RecurringSeries]:
+    if not keys:
+        return {}
+    candidates = db.query(RecurringSeries).filter(
+        RecurringSeries.user_id.in_({key[0] for key in keys}),
+        RecurringSeries.merchant_key.in_({key[1] for key in keys}),
+    )
+    return {
+        (series.user_id, series.merchant_key): series
+        for series in candidates
+        if (series.user_id, series.merchant_key) in keys
+    }
+
+
+def _overwrite(series: RecurringSeries, item: GroupStats) -> None:
+    series.merchant = item.merchant
+    series.account_id = item.account_id
+    series.occurrence_count = item.count
+    series.first_seen_at = item.first_seen_at
+    series.last_seen_at = item.last_seen_at
+    series.last_amount = item.last_amount
+    series.amount_sum = item.amount_sum
+    series.amount_sq_sum = item.amount_sq_sum
+    series.interval_sum = item.interval_sum
+    series.interval_sq_sum = item.interval_sq_sum
+
+
+def _append(series: RecurringSeries, item: GroupStats) -> None:
+    gap = (item.first_seen_at - series.last_seen_at).total_seconds() / 86400.0
+    series.merchant = item.merchant
+    series.account_id = item.account_id
+    series.occurrence_count += item.count
+    series.last_seen_at = item.last_seen_at
+    series.last_amount = item.last_amount
+    series.amount_sum += item.amount_sum
+    series.amount_sq_sum += item.amount_sq_sum
+    series.interval_sum += item.interval_sum + gap
+    series.interval_sq_sum += item.interval_sq_sum + gap * gap
+
+
+def _classify(series: RecurringSeries) -> None:
+    series.cadence = classify(series)
+    series.next_expected_date = (
+        next_expected_date(series.last_seen_at, series.cadence)
+        if series.cadence
+        else None
+    )
+
+
+def _std(total: float, sq_total: float, count: int) -> float:
+    mean = total / count
+    return math.sqrt(max(sq_total / count - mean * mean, 0.0))
+
+
+def _add_months(value: date, months: int) -> date:
+    month = value.month - 1 + months
+    year = value.year + month // 12
+    month = month % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
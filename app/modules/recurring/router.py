@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.pagination import PaginationParams, get_pagination_params
+from app.models import User
+from app.modules.auth.router import get_current_user
+from app.modules.recurring.schemas import RecurringSeriesListResponse
+from app.modules.recurring.service import list_recurring_series
+
+router = APIRouter(prefix="/recurring", tags=["recurring"])
+
+
+@router.get("/", response_model=RecurringSeriesListResponse)
+def list_all(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    active_only: bool = True,
+    pagination: PaginationParams = Depends(get_pagination_params),
+):
+    items, total = list_recurring_series(
+        db,
+        user_id=current_user.id,
+        skip=pagination.skip,
+        limit=pagination.limit,
+        active_only=active_only,
+    )
+    return {
+        "items": items,
+        "total": total,
+        "skip": pagination.skip,
+        "limit": pagination.limit,
+    }
@@ -0,0 +1,26 @@
+from datetime import date, datetime
+
+from pydantic import BaseModel
+
+
+class RecurringSeriesRead(BaseModel):
+    id: int
+    account_id: int
+    merchant: str | None = None
+    cadence: str
+    occurrence_count: int
+    average_amount: float
+    last_amount: float
+    first_seen_at: datetime
+    last_seen_at: datetime
+    next_expected_date: date
+
+    class Config:
+        from_attributes = True
+
+
+class RecurringSeriesListResponse(BaseModel):
+    items: list[RecurringSeriesRead]
+    total: int
+    skip: int
+    limit: int
@@ -0,0 +1,50 @@
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.etag import RECURRING
+from app.core.pagination import paginate_query
+from app.models import RecurringSeries
+from app.modules.recurring.schemas import RecurringSeriesRead
+
+# A series stays active this many days past its expected charge.
+ACTIVE_GRACE_DAYS = 7
+
+
+def list_recurring_series(
+    db: Session,
+    user_id: int,
+    skip: int,
+    limit: int,
+    active_only: bool = True,
+    today: date | None = None,
+) -> tuple[list[RecurringSeriesRead], int]:
+    query = db.query(RecurringSeries).filter(
+        RecurringSeries.user_id == user_id, RecurringSeries.cadence.is_not(None)
+    )
+    if active_only:
+        today = today or datetime.now(UTC).date()
+        query = query.filter(
+            RecurringSeries.next_expected_date
+            >= today - timedelta(days=ACTIVE_GRACE_DAYS)
+        )
+    query = query.order_by(RecurringSeries.next_expected_date, RecurringSeries.id)
+    items, total = paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(RECURRING,)
+    )
+    return [_to_read(series) for series in items], total
+
+
+def _to_read(series: RecurringSeries) -> RecurringSeriesRead:
+    return RecurringSeriesRead(
+        id=series.id,
+        account_id=series.account_id,
+        merchant=series.merchant,
+        cadence=series.cadence,
+        occurrence_count=series.occurrence_count,
+        average_amount=round(series.amount_sum / series.occurrence_count, 2),
+        last_amount=series.last_amount,
+        first_seen_at=series.first_seen_at,
+        last_seen_at=series.last_seen_at,
+        next_expected_date=series.next_expected_date,
+    )
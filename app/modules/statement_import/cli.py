@@ -0,0 +1,58 @@
+"""Import a bank statement file from the command line.
+
+Usage:
+    python -m app.modules.statement_import.cli --user-id 1 --account-id 2 extrato.csv
+"""
+
+import argparse
+import sys
+
+from app.core.database import SessionLocal
+from app.modules.statement_import.service import DEFAULT_CHUNK_SIZE, import_statement
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import a CSV/OFX bank statement.")
+    parser.add_argument("path")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--account-id", type=int, required=True)
+    parser.add_argument("--format", choices=["csv", "ofx"], default=None)
+    parser.add_argument("--encoding", default="utf-8-sig")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--map",
+        action="append",
+        default=[],
+        metavar="FIELD=COLUMN",
+        help="Map a transaction field to a CSV header, e.g. merchant=Estabelecimento",
+    )
+    args = parser.parse_args(argv)
+
+    column_map = dict(item.split("=", 1) for item in args.map)
+    db = SessionLocal()
+    try:
+        with open(
+            args.path, encoding=args.encoding, errors="replace", newline=""
+        ) as handle:
+            result = import_statement(
+                db,
+                user_id=args.user_id,
+                account_id=args.account_id,
+                lines=handle,
+                statement_format=args.format,
+                filename=args.path,
+                column_map=column_map or None,
+                chunk_size=args.chunk_size,
+            )
+    except ValueError as exc:
+        print(f"Import failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    print(result.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""Streaming parsers for bank statement exports (CSV and OFX).
+
+Both parsers consume an iterable of text lines and yield one
+``StatementLine`` at a time, so files of any size are read with constant
+memory.
+"""
+
+from __future__ import annotations
+
+import csv
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+from app.modules.ai_agent.rules import normalize
+
+# Normalized header names accepted for each field, in priority order.
+CSV_COLUMN_ALIASES: dict[str, list[str]] = {
+    "transaction_date": [
+        "data",
+        "date",
+        "data lancamento",
+        "data de lancamento",
+        "data da transacao",
+        "data compra",
+        "dt",
+    ],
+    "amount": ["valor", "amount", "value", "valor (r$)", "valor r$", "quantia"],
+    "merchant": [
+        "estabelecimento",
+        "merchant",
+        "favorecido",
+        "payee",
+        "title",
+        "titulo",
+        "nome",
+    ],
+    "description": [
+        "descricao",
+        "description",
+        "historico",
+        "memo",
+        "lancamento",
+        "detalhes",
+    ],
+    "card_last4": ["cartao", "final cartao", "final do cartao", "card"],
+    "installments": ["parcela", "parcelas", "installment"],
+    "external_id": ["id", "identificador", "fitid", "codigo"],
+}
+
+CSV_DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y", "%Y/%m/%d"]
+
+
+class StatementParseError(ValueError):
+    pass
+
+
+@dataclass
+class StatementLine:
+    line_number: int
+    transaction_date: datetime
+    amount: float
+    merchant: str | None = None
+    description: str | None = None
+    card_last4: str | None = None
+    installments_current: int | None = None
+    installments_total: int | None = None
+    external_id: str | None = None
+
+    @property
+    def is_credit(self) -> bool:
+        return self.amount > 0
+
+
+def detect_format(filename: str | None, first_line: str) -> str:
+    if filename and filename.lower().endswith((".ofx", ".qfx")):
+        return "ofx"
+    stripped = first_line.lstrip("\ufeff").strip().upper()
+    if stripped.startswith(("OFXHEADER", "<?XML", "<OFX")):
+        return "ofx"
+    return "csv"
+
+
+def iter_csv_lines(
+    lines: Iterable[str], column_map: dict[str, str] | None = None
+) -> Iterator[StatementLine | StatementParseError]:
+    """Yield parsed CSV rows; malformed rows are yielded as errors, not raised."""
+    iterator = iter(lines)
+    header_line = next(iterator, None)
+    if header_line is None:
+        return
+    header_line = header_line.lstrip("\ufeff")
+    delimiter = _sniff_delimiter(header_line)
+    header = next(csv.reader([header_line], delimiter=delimiter))
+    positions = _resolve_columns(header, column_map or {})
+    if "transaction_date" not in positions or "amount" not in positions:
+        raise StatementParseError(
+            "CSV header must include date and amount columns, "
+            f"found: {', '.join(header)}"
+        )
+
+    reader = csv.reader(iterator, delimiter=delimiter)
+    for row in reader:
+        line_number = reader.line_num + 1
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            yield _build_csv_line(row, positions, line_number)
+        except (ValueError, IndexError) as exc:
+            yield StatementParseError(f"Line {line_number}: {exc}")
+
+
+def iter_ofx_lines(
+    lines: Iterable[str],
+) -> Iterator[StatementLine | StatementParseError]:
+    """Yield <STMTTRN> entries from OFX 1.x (SGML) or 2.x (XML) files."""
+    fields: dict[str, str] | None = None
+    count = 0
+    for line in lines:
+        for token in _OFX_TOKEN.finditer(line):
+            tag = token.group(1).upper()
+            value = token.group(2).strip()
+            if tag == "STMTTRN":
+                fields = {}
+            elif tag == "/STMTTRN" and fields is not None:
+                count += 1
+                try:
+                    yield _build_ofx_line(fields, count)
+                except (KeyError, ValueError) as exc:
+                    yield StatementParseError(f"Transaction {count}: {exc}")
+                fields = None
+            elif fields is not None and not tag.startswith("/") and value:
+                fields[tag] = value
+
+
+_OFX_TOKEN = re.compile(r"<(/?[A-Za-z0-9.]+)>([^<]*)")
+_INSTALLMENTS = re.compile(r"(\d{1,2})\s*(?:/|de)\s*(\d{1,2})")
+
+
+def parse_statement_amount(value: str) -> float:
+    cleaned = value.strip().replace("R$", "").replace(" ", "")
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    cleaned = cleaned.strip("()")
+    if "," in cleaned and "." in cleaned:
+        if cleaned.rfind(",") > cleaned.rfind("."):
+            cleaned = cleaned.replace(".", "").replace(",", ".")
+        else:
+            cleaned = cleaned.replace(",", "")
+    elif "," in cleaned:
+        cleaned = cleaned.replace(",", ".")
+    amount = float(cleaned)
+    return -amount if negative else amount
+
+
+@lru_cache(maxsize=4096)
+def parse_statement_date(value: str) -> datetime:
+    cleaned = value.strip()
+    for fmt in CSV_DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned[:10], fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date '{value}'")
+
+
+def _sniff_delimiter(header_line: str) -> str:
+    candidates = [";", ",", "\t", "|"]
+    return max(candidates, key=header_line.count)
+
+
+def _resolve_columns(header: list[str], column_map: dict[str, str]) -> dict[str, int]:
+    normalized = [normalize(name).strip() for name in header]
+    positions: dict[str, int] = {}
+    for field, column in column_map.items():
+        target = normalize(column).strip()
+        if target in normalized:
+            positions[field] = normalized.index(target)
+    for field, aliases in CSV_COLUMN_ALIASES.items():
+        if field in positions:
+            continue
+        for alias in aliases:
+            if alias in normalized:
+                positions[field] = normalized.index(alias)
+                break
+    return positions
+
+
+def _build_csv_line(
+    row: list[str], positions: dict[str, int], line_number: int
+) -> StatementLine:
+    def cell(field: str) -> str | None:
+        index = positions.get(field)
+        if index is None or index >= len(row):
+            return None
+        value = row[index].strip()
+        return value or None
+
+    date_value = cell("transaction_date")
+    amount_value = cell("amount")
+    if not date_value or not amount_value:
+        raise ValueError("missing date or amount")
+
+    installments_current = installments_total = None
+    installments = cell("installments")
+    if installments:
+        match = _INSTALLMENTS.search(installments)
+        if match:
+            installments_current = int(match.group(1))
+            installments_total = int(match.group(2))
+
+    card_last4 = cell("card_last4")
+    if card_last4:
+        digits = re.sub(r"\D", "", card_last4)
+        card_last4 = digits[-4:] if len(digits) >= 4 else None
+
+    merchant = cell("merchant")
+    description = cell("description")
+    return StatementLine(
+        line_number=line_number,
+        transaction_date=parse_statement_date(date_value),
+        amount=parse_statement_amount(amount_value),
+        merchant=merchant or description,
+        description=description if merchant else None,
+        card_last4=card_last4,
+        installments_current=installments_current,
+        installments_total=installments_total,
+        external_id=cell("external_id"),
+    )
+
+
+def _build_ofx_line(fields: dict[str, str], count: int) -> StatementLine:
+    posted = fields["DTPOSTED"]
+    transaction_date = datetime.strptime(posted[:8], "%Y%m%d")
+    if len(posted) >= 14 and posted[8:14].isdigit():
+        transaction_date = datetime.strptime(posted[:14], "%Y%m%d%H%M%S")
+    amount = parse_statement_amount(fields["TRNAMT"])
+    if fields.get("TRNTYPE", "").upper() == "DEBIT" and amount > 0:
+        amount = -amount
+    name = fields.get("NAME") or fields.get("PAYEE")
+    memo = fields.get("MEMO")
+    return StatementLine(
+        line_number=count,
+        transaction_date=transaction_date,
+        amount=amount,
+        merchant=name or memo,
+        description=memo if name else None,
+        external_id=fields.get("FITID"),
+    )
@@ -0,0 +1,65 @@
+import codecs
+import io
+import json
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.models import User
+from app.modules.auth.router import get_current_user
+from app.modules.statement_import.parser import StatementParseError
+from app.modules.statement_import.schemas import StatementFormat, StatementImportResult
+from app.modules.statement_import.service import import_statement
+
+router = APIRouter(prefix="/imports", tags=["statement_import"])
+
+
+@router.post("/statement", response_model=StatementImportResult)
+def upload_statement(
+    account_id: int = Form(...),
+    file: UploadFile = File(...),
+    statement_format: StatementFormat | None = Form(None, alias="format"),
+    encoding: str = Form("utf-8-sig"),
+    column_map: str | None = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Import a CSV or OFX bank statement into an account.
+
+    ``column_map`` is an optional JSON object mapping transaction fields
+    (transaction_date, amount, merchant, description, card_last4,
+    installments) to CSV header names when the defaults do not match.
+    """
+    try:
+        mapping = json.loads(column_map) if column_map else None
+        codecs.lookup(encoding)
+    except (ValueError, LookupError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if mapping is not None and not (
+        isinstance(mapping, dict)
+        and all(
+            isinstance(key, str) and isinstance(value, str)
+            for key, value in mapping.items()
+        )
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="column_map must be a JSON object of field names to column names",
+        )
+
+    lines = io.TextIOWrapper(file.file, encoding=encoding, errors="replace", newline="")
+    try:
+        return import_statement(
+            db,
+            user_id=current_user.id,
+            account_id=account_id,
+            lines=lines,
+            statement_format=statement_format,
+            filename=file.filename,
+            column_map=mapping,
+        )
+    except StatementParseError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
@@ -0,0 +1,15 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+StatementFormat = Literal["csv", "ofx"]
+
+
+class StatementImportResult(BaseModel):
+    format: StatementFormat
+    lines_read: int
+    imported: int
+    duplicates: int
+    possible_duplicates: int
+    failed: int
+    errors: list[str]
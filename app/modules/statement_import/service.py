@@ -0,0 +1,269 @@
+import hashlib
+from datetime import UTC, date, datetime
+from itertools import chain
+from typing import Iterable, Iterator
+
+from sqlalchemy.orm import Session
+
+from app.models import Account, Transaction
+from app.modules.ai_agent.rules import normalize
+from app.modules.ai_agent.service import categorize_many_with_db
+from app.modules.statement_import.parser import (
+    StatementLine,
+    StatementParseError,
+    detect_format,
+    iter_csv_lines,
+    iter_ofx_lines,
+)
+from app.modules.statement_import.schemas import StatementImportResult
+from app.modules.transactions.dedup import find_duplicates
+from app.modules.transactions.schemas import TransactionCreate
+from app.modules.transactions.service import (
+    build_transaction_row,
+    insert_transaction_rows,
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+# Distinct lines whose repeats are counted at once; see ``_RepeatCounter``.
+MAX_TRACKED_LINES = 100_000
+
+
+def import_statement(
+    db: Session,
+    user_id: int,
+    account_id: int,
+    lines: Iterable[str],
+    statement_format: str | None = None,
+    filename: str | None = None,
+    column_map: dict[str, str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> StatementImportResult:
+    """Stream a CSV/OFX statement into ``account_id``.
+
+    Lines are parsed lazily and handled ``chunk_size`` at a time: each chunk
+    is checked against ``transactions.import_hash`` with one indexed lookup,
+    categorized in one batch and inserted with one executemany, so memory
+    stays bounded by the chunk size rather than the file size; the counter
+    numbering repeated lines is capped too (see ``_RepeatCounter``).
+    Re-importing the same file is a no-op, so an import stopped by a
+    ``StatementParseError`` can be re-run once the file is fixed.
+    """
+    account = (
+        db.query(Account)
+        .filter(Account.id == account_id, Account.user_id == user_id)
+        .first()
+    )
+    if not account:
+        raise ValueError("Account not found")
+
+    iterator = iter(lines)
+    first_line = next(iterator, "")
+    statement_format = statement_format or detect_format(filename, first_line)
+    source = chain([first_line], iterator)
+    if statement_format == "ofx":
+        parsed = iter_ofx_lines(source)
+    else:
+        parsed = iter_csv_lines(source, column_map)
+
+    counts = {
+        "lines_read": 0,
+        "imported": 0,
+        "duplicates": 0,
+        "possible_duplicates": 0,
+        "failed": 0,
+    }
+    errors: list[str] = []
+    chunk: list[tuple[str, StatementLine]] = []
+    for import_hash, item in _hash_lines(account_id, parsed, MAX_TRACKED_LINES):
+        counts["lines_read"] += 1
+        if isinstance(item, StatementParseError):
+            counts["failed"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(str(item))
+            continue
+        chunk.append((import_hash, item))
+        if len(chunk) >= chunk_size:
+            _import_chunk(db, user_id, account_id, chunk, counts)
+            chunk = []
+    if chunk:
+        _import_chunk(db, user_id, account_id, chunk, counts)
+    return StatementImportResult(format=statement_format, errors=errors, **counts)
+
+
+def statement_line_hash(account_id: int, line: StatementLine, occurrence: int) -> str:
+    if line.external_id:
+        basis = f"{account_id}|id|{line.external_id}"
+    else:
+        basis = "|".join(
+            [
+                str(account_id),
+                line.transaction_date.isoformat(),
+                f"{line.amount:.2f}",
+                normalize(line.merchant or ""),
+                normalize(line.description or ""),
+                str(occurrence),
+            ]
+        )
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+
+class _RepeatCounter:
+    """Numbers identical lines of one statement, in bounded memory.
+
+    Counts are kept per day. Once more than ``limit`` distinct lines are
+    tracked, a file that has been in date order so far (either direction)
+    can't return to the days behind it, so they are forgotten. An unsorted
+    file that big, a day with more than ``limit`` distinct lines, or a line
+    dated behind a forgotten day raises ``StatementParseError`` instead of
+    risking two purchases getting the same hash.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.by_day: dict[date, dict[str, int]] = {}
+        self.size = 0
+        self.last_day: date | None = None
+        self.direction = 0
+        self.in_order = True
+        # Days on the far side of this one were forgotten.
+        self.frontier: date | None = None
+
+    def next(self, day: date, key: str) -> int:
+        self._follow_order(day)
+        counts = self.by_day.setdefault(day, {})
+        occurrence = counts.get(key, 0)
+        counts[key] = occurrence + 1
+        if not occurrence:
+            self.size += 1
+            if self.size > self.limit:
+                self._forget_before(day)
+        return occurrence
+
+    def _follow_order(self, day: date) -> None:
+        if (
+            self.frontier is not None
+            and (day - self.frontier).days * self.direction < 0
+        ):
+            raise StatementParseError(
+                f"line dated {day} comes after lines dated {self.frontier}: "
+                "sort the statement by date or split it"
+            )
+        if self.last_day is not None and day != self.last_day:
+            step = 1 if day > self.last_day else -1
+            if self.direction == 0:
+                self.direction = step
+            elif step != self.direction:
+                self.in_order = False
+        self.last_day = day
+
+    def _forget_before(self, day: date) -> None:
+        if not self.in_order:
+            raise StatementParseError(
+                f"more than {self.limit} distinct lines out of date order: "
+                "sort the statement by date or split it"
+            )
+        for other in [other for other in self.by_day if other != day]:
+            self.size -= len(self.by_day.pop(other))
+        self.frontier = day
+        if self.size > self.limit:
+            raise StatementParseError(
+                f"more than {self.limit} distinct lines dated {day}: "
+                "split the statement"
+            )
+
+
+def _hash_lines(
+    account_id: int,
+    parsed: Iterator[StatementLine | StatementParseError],
+    limit: int,
+) -> Iterator[tuple[str | None, StatementLine | StatementParseError]]:
+    # Identical lines in one statement (two equal coffees on the same day) are
+    # distinct purchases, so the n-th repetition gets its own hash. Lines with
+    # an external id (OFX FITID) are unique already and skip the counter.
+    counter = _RepeatCounter(limit)
+    for item in parsed:
+        if isinstance(item, StatementParseError):
+            yield None, item
+            continue
+        base = statement_line_hash(account_id, item, 0)
+        if item.external_id:
+            yield base, item
+            continue
+        occurrence = counter.next(item.transaction_date.date(), base)
+        if occurrence:
+            yield statement_line_hash(account_id, item, occurrence), item
+        else:
+            yield base, item
+
+
+def _import_chunk(
+    db: Session,
+    user_id: int,
+    account_id: int,
+    chunk: list[tuple[str, StatementLine]],
+    counts: dict[str, int],
+) -> None:
+    hashes = [import_hash for import_hash, _ in chunk]
+    existing = {
+        import_hash
+        for (import_hash,) in db.query(Transaction.import_hash).filter(
+            Transaction.import_hash.in_(hashes)
+        )
+    }
+    fresh = []
+    for import_hash, line in chunk:
+        if import_hash not in existing:
+            existing.add(import_hash)
+            fresh.append((import_hash, line))
+    counts["duplicates"] += len(chunk) - len(fresh)
+    if not fresh:
+        return
+
+    # Lines already recorded by another source (manual entry, Gmail sync).
+    now = datetime.now(UTC)
+    rows = [
+        build_transaction_row(
+            user_id,
+            _to_transaction_create(account_id, line),
+            None,
+            now,
+            import_hash=import_hash,
+        )
+        for import_hash, line in fresh
+    ]
+    duplicates = find_duplicates(db, user_id, rows)
+    rows = [
+        row
+        for row, duplicate in zip(rows, duplicates)
+        if duplicate is None or not duplicate.blocking
+    ]
+    counts["duplicates"] += len(fresh) - len(rows)
+    counts["possible_duplicates"] += sum(
+        duplicate is not None and not duplicate.blocking for duplicate in duplicates
+    )
+    if not rows:
+        return
+
+    categorizations = categorize_many_with_db(
+        db, user_id, [(row["merchant"], row["description"]) for row in rows]
+    )
+    for row, categorization in zip(rows, categorizations):
+        row["category_id"] = categorization.category_id
+    insert_transaction_rows(db, rows)
+    db.commit()
+    counts["imported"] += len(rows)
+
+
+def _to_transaction_create(account_id: int, line: StatementLine) -> TransactionCreate:
+    return TransactionCreate(
+        account_id=account_id,
+        amount=abs(line.amount),
+        merchant=line.merchant,
+        description=line.description,
+        transaction_date=line.transaction_date,
+        transaction_type="deposit" if line.is_credit else "purchase",
+        card_last4=line.card_last4,
+        installments_total=line.installments_total,
+        installments_current=line.installments_current,
+    )
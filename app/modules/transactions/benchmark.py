@@ -0,0 +1,115 @@
+"""Compare list-page serialization: ORM + Pydantic vs projection + orjson.
+
+Runs against a throwaway in-memory SQLite database, so it needs no
+configured DATABASE_URL rows and leaves no data behind.
+
+Usage:
+    python -m app.modules.transactions.benchmark [--rows 5000] [--pages 200]
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.etag import TRANSACTIONS
+from app.core.pagination import clear_count_cache, paginate_query
+from app.models import Account, AccountType, Transaction, User
+from app.modules.transactions.schemas import TransactionListResponse
+from app.modules.transactions.service import list_transactions
+
+
+def seed(db: Session, rows: int) -> int:
+    user = User(email="benchmark@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    account = Account(
+        user_id=user.id, bank_name="Nubank", account_type=AccountType.checking
+    )
+    db.add(account)
+    db.flush()
+    start = datetime(2024, 1, 1)
+    db.execute(
+        Transaction.__table__.insert(),
+        [
+            {
+                "user_id": user.id,
+                "account_id": account.id,
+                "amount": float(index % 500) + 0.99,
+                "merchant": f"Loja {index % 97}",
+                "description": "Compra no cartão",
+                "transaction_date": start + timedelta(hours=index),
+                "transaction_type": "purchase",
+                "payment_method": "credit_card",
+                "card_last4": "1234",
+            }
+            for index in range(rows)
+        ],
+    )
+    db.commit()
+    return user.id
+
+
+def orm_pydantic_page(db: Session, user_id: int, skip: int, limit: int) -> bytes:
+    """The previous path: ORM objects validated by response_model, stdlib JSON."""
+    query = db.query(Transaction).filter(Transaction.user_id == user_id)
+    items, total = paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(TRANSACTIONS,)
+    )
+    payload = TransactionListResponse.model_validate(
+        {"items": items, "total": total, "skip": skip, "limit": limit}
+    ).model_dump(mode="json")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def projection_orjson_page(db: Session, user_id: int, skip: int, limit: int) -> bytes:
+    items, total = list_transactions(db, user_id, skip=skip, limit=limit)
+    response = ORJSONResponse(
+        {"items": items, "total": total, "skip": skip, "limit": limit}
+    )
+    return response.body
+
+
+def measure(render, db: Session, user_id: int, pages: int, page_size: int) -> float:
+    """Rows per second rendering ``pages`` list pages, cycling the first ten."""
+    clear_count_cache()
+    started = time.perf_counter()
+    for page in range(pages):
+        render(db, user_id, (page % 10) * page_size, page_size)
+        db.expunge_all()
+    return pages * page_size / (time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GET /transactions pages.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user_id = seed(db, args.rows)
+        for name, render in (
+            ("orm + pydantic + json", orm_pydantic_page),
+            ("projection + orjson", projection_orjson_page),
+        ):
+            best = max(
+                measure(render, db, user_id, args.pages, args.page_size)
+                for _ in range(args.repeat)
+            )
+            print(f"{name:>24}: {best:,.0f} rows/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Fingerprint old transactions and merge duplicates from the command line.
+
+Usage:
+    python -m app.modules.transactions.cli [--user-id 1] [--dry-run]
+"""
+
+import argparse
+import sys
+
+from app.core.database import SessionLocal
+from app.models import User
+from app.modules.transactions.dedup import backfill_fingerprints
+from app.modules.transactions.service import merge_duplicate_transactions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Backfill transaction fingerprints and merge duplicates."
+    )
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report duplicate groups only"
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        filled = backfill_fingerprints(db, user_id=args.user_id)
+        db.commit()
+        print(f"Fingerprinted {filled} transactions.")
+
+        if args.user_id is not None:
+            user_ids = [args.user_id]
+        else:
+            user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        for user_id in user_ids:
+            result = merge_duplicate_transactions(
+                db, user_id=user_id, dry_run=args.dry_run
+            )
+            if result.groups_found:
+                action = "would remove" if args.dry_run else "removed"
+                print(
+                    f"User {user_id}: {result.groups_found} duplicate groups, "
+                    f"{action} {result.transactions_removed} transactions."
+                )
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""Duplicate detection for transactions coming from different sources.
+
+The same purchase can arrive as a manual entry, a Gmail notification and a
+statement line. Each transaction stores a ``fingerprint`` (account, amount,
+day, installment number and normalized merchant) so ingest paths find exact
+repeats with one indexed ``IN`` lookup. Only an exact repeat coming from a
+different source is refused: the same coffee bought twice in a day arrives
+twice from the same source. Anything else that looks alike, an exact repeat
+from the same source or a near match within a few days (an e-mail and a
+statement often disagree on the date and on the merchant spelling), is only
+reported as a possible duplicate and left to the merge endpoint.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import Transaction
+from app.modules.installments.plans import merchant_key
+
+DUPLICATE_WINDOW_DAYS = 3
+# Share of the shorter merchant's words that must match: "posto shell" and
+# "posto ipiranga" share a word but are different stations.
+MIN_MERCHANT_OVERLAP = 0.6
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class DuplicateTransactionError(ValueError):
+    def __init__(self, existing_id: int):
+        super().__init__(f"Duplicate of transaction {existing_id}")
+        self.existing_id = existing_id
+
+
+class DuplicateMatch(NamedTuple):
+    transaction_id: int
+    # Exact repeat from another source: the row must not be stored.
+    blocking: bool
+
+
+class DuplicateCandidate(NamedTuple):
+    id: int
+    account_id: int
+    amount: float
+    transaction_date: datetime
+    merchant: str | None
+    source: str
+
+
+def transaction_fingerprint(
+    account_id: int,
+    amount: float,
+    transaction_date: datetime | None,
+    merchant: str | None,
+    installments_current: int | None = None,
+) -> str:
+    day = transaction_date.date().isoformat() if transaction_date else ""
+    basis = "|".join(
+        [
+            str(account_id),
+            str(round(amount * 100)),
+            day,
+            str(installments_current or 0),
+            merchant_key(merchant),
+        ]
+    )
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+
+def row_source(row: dict) -> str:
+    return transaction_source(row.get("raw_email_id"), row.get("import_hash"))
+
+
+def row_fingerprint(row: dict) -> str:
+    return transaction_fingerprint(
+        row["account_id"],
+        row["amount"],
+        row["transaction_date"],
+        row["merchant"],
+        row.get("installments_current"),
+    )
+
+
+def transaction_source(raw_email_id: int | None, import_hash: str | None) -> str:
+    if raw_email_id is not None:
+        return "email"
+    if import_hash is not None:
+        return "import"
+    return "manual"
+
+
+def merchants_match(left: str | None, right: str | None) -> bool:
+    """Token overlap of normalized merchants ("uber" matches "uber trip sp")."""
+    left_tokens = set(_WORD.findall(merchant_key(left)))
+    right_tokens = set(_WORD.findall(merchant_key(right)))
+    if not left_tokens or not right_tokens:
+        return False
+    shared = len(left_tokens & right_tokens)
+    return shared / min(len(left_tokens), len(right_tokens)) >= MIN_MERCHANT_OVERLAP
+
+
+def find_duplicates(
+    db: Session, user_id: int, rows: list[dict]
+) -> list[DuplicateMatch | None]:
+    """Existing transaction each prepared row may duplicate, or None.
+
+    A match is ``blocking`` only for an exact fingerprint stored by another
+    source. Every existing transaction is matched at most once, so two
+    identical coffees in a batch only collide with two stored coffees, not
+    one. Rows must carry ``fingerprint`` (see ``build_transaction_row``).
+    """
+    matches: list[DuplicateMatch | None] = [None] * len(rows)
+    if not rows:
+        return matches
+    used: set[int] = set()
+
+    exact: dict[str, list[tuple[int, str]]] = defaultdict(list)
+    for fingerprint, transaction_id, raw_email_id, import_hash in (
+        db.query(
+            Transaction.fingerprint,
+            Transaction.id,
+            Transaction.raw_email_id,
+            Transaction.import_hash,
+        )
+        .filter(
+            Transaction.user_id == user_id,
+            Transaction.fingerprint.in_({row["fingerprint"] for row in rows}),
+        )
+        .order_by(Transaction.id)
+    ):
+        exact[fingerprint].append(
+            (transaction_id, transaction_source(raw_email_id, import_hash))
+        )
+    for index, row in enumerate(rows):
+        candidates = exact.get(row["fingerprint"])
+        if not candidates:
+            continue
+        source = row_source(row)
+        # Prefer a copy from another source, the one that blocks the row.
+        position = next(
+            (
+                position
+                for position, (_, candidate_source) in enumerate(candidates)
+                if candidate_source != source
+            ),
+            0,
+        )
+        transaction_id, candidate_source = candidates.pop(position)
+        matches[index] = DuplicateMatch(transaction_id, candidate_source != source)
+        used.add(transaction_id)
+
+    pending = [index for index, match in enumerate(matches) if match is None]
+    if not pending:
+        return matches
+    window = timedelta(days=DUPLICATE_WINDOW_DAYS)
+    dates = [_naive(rows[index]["transaction_date"]) for index in pending]
+    nearby: dict[tuple[int, int], list[DuplicateCandidate]] = defaultdict(list)
+    for candidate in db.query(
+        Transaction.id,
+        Transaction.account_id,
+        Transaction.amount,
+        Transaction.transaction_date,
+        Transaction.merchant,
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.account_id.in_({rows[index]["account_id"] for index in pending}),
+        Transaction.amount.in_({rows[index]["amount"] for index in pending}),
+        Transaction.transaction_date >= min(dates) - window,
+        Transaction.transaction_date <= max(dates) + window,
+    ):
+        nearby[(candidate.account_id, round(candidate.amount * 100))].append(candidate)
+    for index, row_date in zip(pending, dates):
+        row = rows[index]
+        for candidate in nearby.get(
+            (row["account_id"], round(row["amount"] * 100)), ()
+        ):
+            if candidate.id in used:
+                continue
+            if _is_near_duplicate(
+                row_date,
+                row["merchant"],
+                candidate.transaction_date,
+                candidate.merchant,
+            ):
+                matches[index] = DuplicateMatch(candidate.id, False)
+                used.add(candidate.id)
+                break
+    return matches
+
+
+def iter_duplicate_groups(
+    candidates: Iterable[DuplicateCandidate],
+) -> Iterator[list[DuplicateCandidate]]:
+    """Cluster candidates sorted by (account, amount, date) into duplicates.
+
+    A cluster collects transactions of the same account and amount whose
+    dates fall within the window of its first member and whose merchants
+    match. Each group keeps the first transaction of every source in the
+    cluster and is yielded only when it spans more than one source: two
+    identical manual entries are more likely two real purchases.
+    """
+    cluster: list[DuplicateCandidate] = []
+    for candidate in candidates:
+        if cluster and _belongs_to(cluster, candidate):
+            cluster.append(candidate)
+            continue
+        group = _one_per_source(cluster)
+        if len(group) > 1:
+            yield group
+        cluster = [candidate]
+    group = _one_per_source(cluster)
+    if len(group) > 1:
+        yield group
+
+
+def _belongs_to(cluster: list[DuplicateCandidate], candidate: DuplicateCandidate):
+    first = cluster[0]
+    return (
+        candidate.account_id == first.account_id
+        and round(candidate.amount * 100) == round(first.amount * 100)
+        and _is_near_duplicate(
+            first.transaction_date,
+            first.merchant,
+            candidate.transaction_date,
+            candidate.merchant,
+        )
+    )
+
+
+def _one_per_source(cluster: list[DuplicateCandidate]) -> list[DuplicateCandidate]:
+    firsts: dict[str, DuplicateCandidate] = {}
+    for candidate in cluster:
+        firsts.setdefault(candidate.source, candidate)
+    return list(firsts.values())
+
+
+def _is_near_duplicate(
+    left_date: datetime,
+    left_merchant: str | None,
+    right_date: datetime,
+    right_merchant: str | None,
+) -> bool:
+    gap = abs(_naive(left_date) - _naive(right_date))
+    if gap > timedelta(days=DUPLICATE_WINDOW_DAYS):
+        return False
+    if not merchant_key(left_merchant) or not merchant_key(right_merchant):
+        # Without a merchant to compare, only trust the same day.
+        return _naive(left_date).date() == _naive(right_date).date()
+    return merchants_match(left_merchant, right_merchant)
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+def backfill_fingerprints(
+    db: Session, user_id: int | None = None, batch_size: int = 1000
+) -> int:
+    """Fingerprint rows written before the column existed; returns the count.
+
+    Rows are read ``batch_size`` at a time in id order (keyset, not offset)
+    and each batch is written before the next is read, so memory stays
+    bounded on large tables. The caller owns the commit.
+    """
+    query = db.query(
+        Transaction.id,
+        Transaction.account_id,
+        Transaction.amount,
+        Transaction.transaction_date,
+        Transaction.merchant,
+        Transaction.installments_current,
+    ).filter(Transaction.fingerprint.is_(None))
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+
+    filled = 0
+    last_id = 0
+    while True:
+        rows = (
+            query.filter(Transaction.id > last_id)
+            .order_by(Transaction.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return filled
+        db.execute(
+            update(Transaction),
+            [
+                {"id": row.id, "fingerprint": transaction_fingerprint(*row[1:])}
+                for row in rows
+            ],
+        )
+        filled += len(rows)
+        last_id = rows[-1].id
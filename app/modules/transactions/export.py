@@ -0,0 +1,116 @@
+"""Streaming transaction export (CSV / NDJSON).
+
+Rows are fetched through a server-side cursor (``yield_per``) and encoded
+in batches, so memory use is bounded by ``EXPORT_BATCH_SIZE`` no matter how
+many transactions the user has.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+from app.models import Transaction
+from app.modules.transactions.service import apply_transaction_filters
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = [
+    "id",
+    "account_id",
+    "amount",
+    "merchant",
+    "description",
+    "transaction_date",
+    "transaction_type",
+    "payment_method",
+    "card_last4",
+    "installments_total",
+    "installments_current",
+    "category_id",
+    "raw_email_id",
+]
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def iter_export_rows(
+    db: Session,
+    user_id: int,
+    account_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    category_id: int | None = None,
+    include_subcategories: bool = False,
+) -> Iterator[tuple]:
+    query = db.query(
+        *[getattr(Transaction, column) for column in EXPORT_COLUMNS]
+    ).filter(Transaction.user_id == user_id)
+    query = apply_transaction_filters(
+        query,
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        category_id=category_id,
+        include_subcategories=include_subcategories,
+    )
+    query = query.order_by(Transaction.transaction_date, Transaction.id)
+    yield from query.yield_per(EXPORT_BATCH_SIZE)
+
+
+def stream_export(
+    rows: Iterator[tuple], export_format: str, compress: bool = False
+) -> Iterator[bytes]:
+    encoder = _encode_csv if export_format == "csv" else _encode_ndjson
+    chunks = encoder(rows)
+    if compress:
+        chunks = _gzip(chunks)
+    yield from chunks
+
+
+def _encode_csv(rows: Iterator[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(_serialize(value) for value in row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def _encode_ndjson(rows: Iterator[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    for count, row in enumerate(rows, start=1):
+        record = {
+            column: _serialize(value) for column, value in zip(EXPORT_COLUMNS, row)
+        }
+        buffer.write(json.dumps(record, ensure_ascii=False))
+        buffer.write("\n")
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
@@ -0,0 +1,170 @@
+"""Optional range partitioning of ``transactions`` on ``transaction_date``.
+
+Postgres only. With ``TRANSACTIONS_PARTITION_INTERVAL`` set to ``month`` or
+``year``, migration ``0010_transaction_partitions`` turns ``transactions``
+into a declaratively partitioned table: one partition per interval plus a
+``transactions_default`` catch-all for dates no partition covers yet. Date
+bounded reads (filtered lists, budget summaries) then only touch the
+partitions their range overlaps.
+
+Partitions ahead of today are created by ``ensure_transaction_partitions``,
+which runs on application startup and from
+``python -m app.modules.transactions.partitions`` (schedule it monthly).
+"""
+
+import argparse
+import sys
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+PARTITION_INTERVALS = ("month", "year")
+DEFAULT_PARTITION = "transactions_default"
+# Intervals created ahead of the current one.
+PARTITIONS_AHEAD = 3
+
+
+def partition_start(day: date, interval: str) -> date:
+    if interval == "month":
+        return date(day.year, day.month, 1)
+    if interval == "year":
+        return date(day.year, 1, 1)
+    raise ValueError(f"Unknown partition interval: {interval}")
+
+
+def next_partition_start(start: date, interval: str) -> date:
+    if interval == "year":
+        return date(start.year + 1, 1, 1)
+    if start.month == 12:
+        return date(start.year + 1, 1, 1)
+    return date(start.year, start.month + 1, 1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    if interval == "year":
+        return f"transactions_p{start.year}"
+    return f"transactions_p{start.year}_{start.month:02d}"
+
+
+def partition_ranges(
+    first: date, last: date, interval: str
+) -> list[tuple[str, date, date]]:
+    """``(name, start, end)`` of every partition covering ``first``..``last``."""
+    ranges = []
+    start = partition_start(first, interval)
+    while start <= last:
+        end = next_partition_start(start, interval)
+        ranges.append((partition_name(start, interval), start, end))
+        start = end
+    return ranges
+
+
+def is_partitioned(connection: Connection | Session) -> bool:
+    if isinstance(connection, Session):
+        dialect = connection.get_bind().dialect
+    else:
+        dialect = connection.dialect
+    if dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass('transactions')"
+            )
+        ).scalar()
+    )
+
+
+def create_partition(
+    connection: Connection | Session, name: str, start: date, end: date
+) -> bool:
+    """Attach partition ``name`` for ``[start, end)`` unless it exists.
+
+    Rows that landed in the default partition for that range are moved into
+    the new table before it is attached, so a late ``ensure`` never fails on
+    data written ahead of it. Returns whether the partition was created.
+    """
+    exists = connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+    ).scalar()
+    if exists:
+        return False
+    bounds = {"start": start, "end": end}
+    connection.execute(
+        text(
+            f"CREATE TABLE {name} "
+            "(LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE transaction_date >= :start AND transaction_date < :end "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    connection.execute(
+        text(
+            f"ALTER TABLE transactions ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+    return True
+
+
+def ensure_transaction_partitions(
+    connection: Connection | Session,
+    interval: str | None = None,
+    ahead: int = PARTITIONS_AHEAD,
+    today: date | None = None,
+) -> list[str]:
+    """Create the current partition and ``ahead`` more; returns new names.
+
+    A no-op when ``transactions`` is not partitioned. The caller owns the
+    commit.
+    """
+    interval = interval or settings.transactions_partition_interval
+    if interval not in PARTITION_INTERVALS or not is_partitioned(connection):
+        return []
+    start = partition_start(today or datetime.now(UTC).date(), interval)
+    last = start
+    for _ in range(ahead):
+        last = next_partition_start(last, interval)
+    return [
+        name
+        for name, lower, upper in partition_ranges(start, last, interval)
+        if create_partition(connection, name, lower, upper)
+    ]
+
+
+def create_upcoming_partitions(ahead: int = PARTITIONS_AHEAD) -> list[str]:
+    db = SessionLocal()
+    try:
+        created = ensure_transaction_partitions(db, ahead=ahead)
+        db.commit()
+    finally:
+        db.close()
+    return created
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Create upcoming transactions partitions."
+    )
+    parser.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD)
+    args = parser.parse_args(argv)
+
+    created = create_upcoming_partitions(args.ahead)
+    print(f"Created {len(created)} partitions: {', '.join(created) or '-'}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
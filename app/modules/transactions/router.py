@@ -1,53 +1,156 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.etag import CATEGORIES, TRANSACTIONS, conditional_get
+from app.core.fields import sparse_fields
 from app.core.pagination import PaginationParams, get_pagination_params
 from app.models import User
 from app.modules.auth.router import get_current_user
+from app.modules.transactions.dedup import DuplicateTransactionError
+from app.modules.transactions.export import (
+    EXPORT_MEDIA_TYPES,
+    iter_export_rows,
+    stream_export,
+)
 from app.modules.transactions.schemas import (
+    DuplicateMergeResult,
+    ExportFormat,
+    TransactionBulkCreate,
+    TransactionBulkCreateResponse,
+    TransactionBulkUpdate,
+    TransactionBulkUpdateResponse,
     TransactionCreate,
+    TransactionCreateResult,
     TransactionListResponse,
     TransactionRead,
     TransactionUpdate,
 )
 from app.modules.transactions.service import (
+    TRANSACTION_READ_FIELDS,
     create_transaction,
+    create_transactions_bulk,
     delete_transaction,
     get_transaction,
     list_transactions,
     list_transactions_filtered,
+    merge_duplicate_transactions,
+    search_transactions,
     update_transaction,
+    update_transactions_bulk,
 )
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 
-@router.post("/", response_model=TransactionRead)
+@router.post("/", response_model=TransactionCreateResult)
 def create(
     payload: TransactionCreate,
+    allow_duplicate: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        return create_transaction(
+            db,
+            user_id=current_user.id,
+            payload=payload,
+            allow_duplicate=allow_duplicate,
+        )
+    except DuplicateTransactionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+
+@router.post("/bulk", response_model=TransactionBulkCreateResponse)
+def create_bulk(
+    payload: TransactionBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    results = create_transactions_bulk(
+        db,
+        user_id=current_user.id,
+        payloads=payload.items,
+        allow_duplicates=payload.allow_duplicates,
+    )
+    created = sum(1 for result in results if result.status == "created")
+    duplicates = sum(1 for result in results if result.status == "duplicate")
+    return {
+        "created": created,
+        "duplicates": duplicates,
+        "failed": len(results) - created - duplicates,
+        "results": results,
+    }
+
+
+@router.patch("/bulk", response_model=TransactionBulkUpdateResponse)
+def update_bulk(
+    payload: TransactionBulkUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    if not payload.filter.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="At least one filter is required")
     try:
-        return create_transaction(db, user_id=current_user.id, payload=payload)
+        updated = update_transactions_bulk(
+            db,
+            user_id=current_user.id,
+            filters=payload.filter,
+            changes=payload.changes,
+        )
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
+    return {"updated": updated}
+
 
+@router.post("/duplicates/merge", response_model=DuplicateMergeResult)
+def merge_duplicates(
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return merge_duplicate_transactions(db, user_id=current_user.id, dry_run=dry_run)
 
-@router.get("/", response_model=TransactionListResponse)
+
+@router.get(
+    "/",
+    response_model=TransactionListResponse,
+    # Subcategory filters read the category tree.
+    dependencies=[Depends(conditional_get(TRANSACTIONS, CATEGORIES))],
+)
 def list_all(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     account_id: int | None = None,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     category_id: int | None = None,
+    include_subcategories: bool = False,
+    q: str | None = Query(None, min_length=1, max_length=100),
     pagination: PaginationParams = Depends(get_pagination_params),
+    fields: tuple[str, ...] = Depends(sparse_fields(TRANSACTION_READ_FIELDS)),
 ):
-    if (
+    if q is not None and q.strip():
+        items, total = search_transactions(
+            db,
+            user_id=current_user.id,
+            q=q.strip(),
+            skip=pagination.skip,
+            limit=pagination.limit,
+            account_id=account_id,
+            start_date=start_date,
+            end_date=end_date,
+            category_id=category_id,
+            include_subcategories=include_subcategories,
+            fields=fields,
+        )
+    elif (
         account_id is not None
         or start_date is not None
         or end_date is not None
@@ -62,6 +165,8 @@ def list_all(
             start_date=start_date,
             end_date=end_date,
             category_id=category_id,
+            include_subcategories=include_subcategories,
+            fields=fields,
         )
     else:
         items, total = list_transactions(
@@ -69,16 +174,70 @@ def list_all(
             user_id=current_user.id,
             skip=pagination.skip,
             limit=pagination.limit,
+            fields=fields,
         )
-    return {
-        "items": items,
-        "total": total,
-        "skip": pagination.skip,
-        "limit": pagination.limit,
-    }
+    # Items are already projected dicts: encode them with orjson instead of
+    # validating each row through response_model. Dependency headers (ETag)
+    # set on ``response`` are carried over.
+    return ORJSONResponse(
+        {
+            "items": items,
+            "total": total,
+            "skip": pagination.skip,
+            "limit": pagination.limit,
+        },
+        headers=dict(response.headers),
+    )
 
 
-@router.get("/{transaction_id}", response_model=TransactionRead)
+@router.get("/export")
+def export(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    export_format: ExportFormat = Query("csv", alias="format"),
+    gzip: bool = False,
+    account_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    category_id: int | None = None,
+    include_subcategories: bool = False,
+):
+    user_id = current_user.id
+
+    def content():
+        # The session is owned by the stream so it stays open until the last
+        # row is sent, however the dependency teardown is scheduled.
+        try:
+            rows = iter_export_rows(
+                db,
+                user_id=user_id,
+                account_id=account_id,
+                start_date=start_date,
+                end_date=end_date,
+                category_id=category_id,
+                include_subcategories=include_subcategories,
+            )
+            yield from stream_export(rows, export_format, compress=gzip)
+        finally:
+            db.close()
+
+    filename = f"transactions.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/{transaction_id}",
+    response_model=TransactionRead,
+    dependencies=[Depends(conditional_get(TRANSACTIONS))],
+)
 def get_by_id(
     transaction_id: int,
     db: Session = Depends(get_db),
@@ -1,11 +1,18 @@
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-TransactionType = Literal["purchase", "pix_in", "pix_out", "unknown"]
+TransactionType = Literal["purchase", "pix_in", "pix_out", "deposit", "unknown"]
 PaymentMethod = Literal["credit_card", "debit_card", "pix", "boleto"]
 
+# Money coming into the account; every other type is spending.
+INFLOW_TRANSACTION_TYPES = ("pix_in", "deposit")
+
+ExportFormat = Literal["csv", "ndjson"]
+
+BULK_CREATE_MAX_ITEMS = 5000
+
 
 class TransactionCreate(BaseModel):
     account_id: int
@@ -41,6 +48,12 @@ class TransactionRead(BaseModel):
         from_attributes = True
 
 
+class TransactionCreateResult(TransactionRead):
+    # An existing transaction this one looks like: a repeat from the same
+    # source or a near match from another one. Stored all the same.
+    possible_duplicate_of: int | None = None
+
+
 class TransactionUpdate(BaseModel):
     account_id: int | None = None
     amount: float | None = None
@@ -60,3 +73,59 @@ class TransactionListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+
+
+class TransactionBulkCreate(BaseModel):
+    items: list[TransactionCreate] = Field(
+        ..., min_length=1, max_length=BULK_CREATE_MAX_ITEMS
+    )
+    allow_duplicates: bool = False
+
+
+class TransactionBulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "error"]
+    transaction_id: int | None = None
+    possible_duplicate_of: int | None = None
+    detail: str | None = None
+
+
+class TransactionBulkCreateResponse(BaseModel):
+    created: int
+    duplicates: int
+    failed: int
+    results: list[TransactionBulkItemResult]
+
+
+class TransactionBulkFilter(BaseModel):
+    ids: list[int] | None = Field(None, min_length=1, max_length=BULK_CREATE_MAX_ITEMS)
+    merchant_contains: str | None = Field(None, min_length=1, max_length=255)
+    account_id: int | None = None
+    start_date: datetime | None = None
+    end_date: datetime | None = None
+    category_id: int | None = None
+
+
+class TransactionBulkChanges(BaseModel):
+    merchant: str | None = None
+    description: str | None = None
+    transaction_type: TransactionType | None = None
+    payment_method: PaymentMethod | None = None
+    category_id: int | None = None
+
+
+class TransactionBulkUpdate(BaseModel):
+    filter: TransactionBulkFilter
+    changes: TransactionBulkChanges
+
+
+class TransactionBulkUpdateResponse(BaseModel):
+    updated: int
+
+
+class DuplicateMergeResult(BaseModel):
+    groups_found: int
+    transactions_removed: int
+    dry_run: bool
+    # Each group lists the kept transaction id first.
+    groups: list[list[int]]
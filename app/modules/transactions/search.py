@@ -0,0 +1,132 @@
+"""Merchant/description search for transactions.
+
+Postgres answers ``q=`` with the GIN indexes from migration 0005: a
+Portuguese ``tsvector`` for word matches and ``pg_trgm`` for typos and
+partial words. Other databases (SQLite in development and tests) fall back
+to ``SearchIndex``, an in-process inverted index built per user and
+dropped whenever that user's transactions change.
+"""
+
+import re
+from collections import OrderedDict, defaultdict
+
+from sqlalchemy import func, literal, literal_column, or_
+from sqlalchemy.orm import Session
+
+from app.models import Transaction
+from app.modules.ai_agent.rules import normalize
+
+SEARCH_CONFIG = "portuguese"
+MAX_CACHED_INDEXES = 64
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+_indexes: "OrderedDict[int, SearchIndex]" = OrderedDict()
+
+
+def search_document():
+    """``merchant || ' ' || description``, matching the migration 0005 indexes."""
+    empty = literal_column("''")
+    return (
+        func.coalesce(Transaction.merchant, empty)
+        .concat(literal_column("' '"))
+        .concat(func.coalesce(Transaction.description, empty))
+    )
+
+
+def apply_postgres_search(query, text: str):
+    """Filter and rank a Transaction query by full-text and trigram match."""
+    document = search_document()
+    vector = func.to_tsvector(SEARCH_CONFIG, document)
+    tsquery = func.plainto_tsquery(SEARCH_CONFIG, text)
+    lowered = func.lower(document)
+    needle = text.lower()
+    rank = func.ts_rank(vector, tsquery) + func.word_similarity(needle, lowered)
+    return query.filter(
+        or_(vector.op("@@")(tsquery), literal(needle).op("<%")(lowered))
+    ).order_by(rank.desc(), Transaction.id.desc())
+
+
+class SearchIndex:
+    """Inverted word and trigram index over one user's transactions."""
+
+    def __init__(self, rows):
+        self.words: dict[str, set[int]] = defaultdict(set)
+        self.trigrams: dict[str, set[int]] = defaultdict(set)
+        for transaction_id, merchant, description in rows:
+            document = normalize(f"{merchant or ''} {description or ''}")
+            grams = set()
+            for word in _WORD.findall(document):
+                self.words[word].add(transaction_id)
+                grams.update(_trigrams(word))
+            for gram in grams:
+                self.trigrams[gram].add(transaction_id)
+
+    def search(self, text: str) -> list[int]:
+        """Return matching ids, best match first."""
+        query_words = _WORD.findall(normalize(text))
+        if not query_words:
+            return []
+
+        scores: dict[int, float] = defaultdict(float)
+        for query_word in query_words:
+            matched: dict[int, float] = {}
+            for word, ids in self.words.items():
+                if word == query_word:
+                    weight = 1.0
+                elif word.startswith(query_word):
+                    weight = 0.8
+                else:
+                    continue
+                for transaction_id in ids:
+                    matched[transaction_id] = max(
+                        matched.get(transaction_id, 0.0), weight
+                    )
+            for transaction_id, weight in matched.items():
+                scores[transaction_id] += weight / len(query_words)
+
+        query_grams = set()
+        for query_word in query_words:
+            query_grams.update(_trigrams(query_word))
+        shared: dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for transaction_id in self.trigrams.get(gram, ()):
+                shared[transaction_id] += 1
+        for transaction_id, count in shared.items():
+            similarity = count / len(query_grams)
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                scores[transaction_id] += similarity / 2
+
+        return sorted(scores, key=lambda item: (-scores[item], -item))
+
+
+def get_search_index(db: Session, user_id: int) -> SearchIndex:
+    index = _indexes.get(user_id)
+    if index is not None:
+        _indexes.move_to_end(user_id)
+        return index
+    rows = db.query(
+        Transaction.id, Transaction.merchant, Transaction.description
+    ).filter(Transaction.user_id == user_id)
+    index = SearchIndex(rows)
+    _indexes[user_id] = index
+    if len(_indexes) > MAX_CACHED_INDEXES:
+        _indexes.popitem(last=False)
+    return index
+
+
+def invalidate_search_index(user_id: int) -> None:
+    _indexes.pop(user_id, None)
+
+
+def clear_search_indexes() -> None:
+    _indexes.clear()
+
+
+def uses_postgres_search(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
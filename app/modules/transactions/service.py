@@ -1,16 +1,77 @@
 from datetime import UTC, datetime
 
+from sqlalchemy import func, insert, or_, select, update
 from sqlalchemy.orm import Session
 
+from app.core.etag import ACCOUNTS, CATEGORIES, TRANSACTIONS, touch
 from app.core.pagination import paginate_query
-from app.models import Account, Transaction
-from app.modules.ai_agent.service import categorize_with_db
-from app.modules.transactions.schemas import TransactionCreate, TransactionUpdate
+from app.models import Account, Category, Transaction
+from app.modules.accounts.balances import (
+    apply_balance_changes,
+    balance_entry,
+    balance_entry_for_row,
+    balance_entry_for_transaction,
+)
+from app.modules.ai_agent.service import categorize_many_with_db, categorize_with_db
+from app.modules.analytics.rollups import (
+    apply_rollup_changes,
+    entry_for_row,
+    entry_for_transaction,
+    rollup_entry,
+)
+from app.modules.budgets.counters import (
+    apply_spend_changes,
+    spend_entry,
+    spend_entry_for_row,
+    spend_entry_for_transaction,
+)
+from app.modules.categories.tree import subtree_select
+from app.modules.installments.plans import (
+    PLAN_FIELDS,
+    link_installment_rows,
+    link_transaction,
+    refresh_installment_plans,
+    relink_transaction,
+    relink_transactions,
+)
+from app.modules.transactions.dedup import (
+    DuplicateCandidate,
+    DuplicateTransactionError,
+    find_duplicates,
+    iter_duplicate_groups,
+    row_fingerprint,
+    transaction_fingerprint,
+    transaction_source,
+)
+from app.modules.transactions.schemas import (
+    DuplicateMergeResult,
+    TransactionBulkChanges,
+    TransactionBulkFilter,
+    TransactionBulkItemResult,
+    TransactionCreate,
+    TransactionRead,
+    TransactionUpdate,
+)
+from app.modules.transactions.search import (
+    apply_postgres_search,
+    get_search_index,
+    invalidate_search_index,
+    uses_postgres_search,
+)
 
 
 def create_transaction(
-    db: Session, user_id: int, payload: TransactionCreate
+    db: Session,
+    user_id: int,
+    payload: TransactionCreate,
+    allow_duplicate: bool = False,
 ) -> Transaction:
+    """Store one transaction.
+
+    Raises ``DuplicateTransactionError`` when the same purchase was already
+    stored by another source, unless ``allow_duplicate``. A weaker match is
+    returned on the (unmapped) ``possible_duplicate_of`` attribute.
+    """
     account = (
         db.query(Account)
         .filter(Account.id == payload.account_id, Account.user_id == user_id)
@@ -18,45 +79,185 @@ def create_transaction(
     )
     if not account:
         raise ValueError("Account not found")
-    category_id = payload.category_id
-    if category_id is None:
+    row = build_transaction_row(
+        user_id, payload, payload.category_id, datetime.now(UTC)
+    )
+    duplicate = find_duplicates(db, user_id, [row])[0]
+    if duplicate is not None and duplicate.blocking and not allow_duplicate:
+        raise DuplicateTransactionError(duplicate.transaction_id)
+    if row["category_id"] is None:
         categorization = categorize_with_db(
             db, user_id, payload.merchant, payload.description
         )
-        category_id = categorization.category_id
-
-    transaction = Transaction(
-        account_id=payload.account_id,
-        amount=payload.amount,
-        merchant=payload.merchant,
-        description=payload.description,
-        transaction_date=payload.transaction_date or datetime.now(UTC),
-        transaction_type=payload.transaction_type,
-        payment_method=payload.payment_method,
-        card_last4=payload.card_last4,
-        installments_total=payload.installments_total,
-        installments_current=payload.installments_current,
-        category_id=category_id,
-        raw_email_id=payload.raw_email_id,
-    )
+        row["category_id"] = categorization.category_id
+
+    transaction = Transaction(**row)
+    link_transaction(db, transaction)
     db.add(transaction)
+    db.flush()
+    apply_rollup_changes(db, added=[entry_for_transaction(transaction)])
+    apply_balance_changes(db, added=[balance_entry_for_transaction(transaction)])
+    apply_spend_changes(db, added=[spend_entry_for_transaction(transaction)])
+    touch(db, user_id, TRANSACTIONS, ACCOUNTS)
     db.commit()
+    invalidate_search_index(user_id)
     db.refresh(transaction)
+    transaction.possible_duplicate_of = (
+        duplicate.transaction_id if duplicate is not None else None
+    )
     return transaction
 
 
+def create_transactions_bulk(
+    db: Session,
+    user_id: int,
+    payloads: list[TransactionCreate],
+    allow_duplicates: bool = False,
+) -> list[TransactionBulkItemResult]:
+    """Create many transactions with set-based queries.
+
+    Account ownership and duplicates are checked with one query each,
+    uncategorized items are categorized in a single batch and all valid rows
+    go out in one executemany INSERT ... RETURNING. Items referencing an
+    unknown account or already stored by another source are reported
+    individually instead of failing the whole batch; created items that only
+    look like an existing transaction carry ``possible_duplicate_of``.
+    """
+    account_ids = {payload.account_id for payload in payloads}
+    owned_ids = {
+        account_id
+        for (account_id,) in db.query(Account.id).filter(
+            Account.id.in_(account_ids), Account.user_id == user_id
+        )
+    }
+
+    results: list[TransactionBulkItemResult | None] = [None] * len(payloads)
+    rows: dict[int, dict] = {}
+    now = datetime.now(UTC)
+    for index, payload in enumerate(payloads):
+        if payload.account_id not in owned_ids:
+            results[index] = TransactionBulkItemResult(
+                index=index, status="error", detail="Account not found"
+            )
+        else:
+            rows[index] = build_transaction_row(
+                user_id, payload, payload.category_id, now
+            )
+
+    possible_duplicates: dict[int, int] = {}
+    if rows:
+        duplicates = find_duplicates(db, user_id, list(rows.values()))
+        for index, duplicate in zip(list(rows), duplicates):
+            if duplicate is None:
+                continue
+            if duplicate.blocking and not allow_duplicates:
+                results[index] = TransactionBulkItemResult(
+                    index=index,
+                    status="duplicate",
+                    transaction_id=duplicate.transaction_id,
+                    detail=f"Duplicate of transaction {duplicate.transaction_id}",
+                )
+                del rows[index]
+            else:
+                possible_duplicates[index] = duplicate.transaction_id
+
+    uncategorized = [index for index, row in rows.items() if row["category_id"] is None]
+    if uncategorized:
+        categorizations = categorize_many_with_db(
+            db,
+            user_id,
+            [
+                (payloads[index].merchant, payloads[index].description)
+                for index in uncategorized
+            ],
+        )
+        for index, categorization in zip(uncategorized, categorizations):
+            rows[index]["category_id"] = categorization.category_id
+
+    if rows:
+        new_ids = insert_transaction_rows(db, list(rows.values()))
+        db.commit()
+        for index, transaction_id in zip(rows, new_ids):
+            results[index] = TransactionBulkItemResult(
+                index=index,
+                status="created",
+                transaction_id=transaction_id,
+                possible_duplicate_of=possible_duplicates.get(index),
+            )
+
+    return results
+
+
+def insert_transaction_rows(db: Session, rows: list[dict]) -> list[int]:
+    """Insert prepared rows with one executemany and return ids in row order.
+
+    Every row must carry the same keys; see ``build_transaction_row``.
+    The caller owns the commit.
+    """
+    if not rows:
+        return []
+    link_installment_rows(db, rows)
+    ids = db.scalars(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        rows,
+    ).all()
+    apply_rollup_changes(db, added=[entry_for_row(row) for row in rows])
+    apply_balance_changes(db, added=[balance_entry_for_row(row) for row in rows])
+    apply_spend_changes(db, added=[spend_entry_for_row(row) for row in rows])
+    for user_id in {row["user_id"] for row in rows}:
+        touch(db, user_id, TRANSACTIONS, ACCOUNTS)
+        invalidate_search_index(user_id)
+    return ids
+
+
+def build_transaction_row(
+    user_id: int,
+    payload: TransactionCreate,
+    category_id: int | None,
+    now: datetime,
+    import_hash: str | None = None,
+) -> dict:
+    row = {
+        "user_id": user_id,
+        "account_id": payload.account_id,
+        "amount": payload.amount,
+        "merchant": payload.merchant,
+        "description": payload.description,
+        "transaction_date": payload.transaction_date or now,
+        "transaction_type": payload.transaction_type,
+        "payment_method": payload.payment_method,
+        "card_last4": payload.card_last4,
+        "installments_total": payload.installments_total,
+        "installments_current": payload.installments_current,
+        "category_id": category_id,
+        "raw_email_id": payload.raw_email_id,
+        "is_manual": False,
+        "import_hash": import_hash,
+    }
+    row["fingerprint"] = row_fingerprint(row)
+    return row
+
+
+# List pages select only what ``TransactionRead`` exposes (or the ``fields=``
+# subset of it) and hand plain dicts to the router, which encodes them
+# without a per-row Pydantic model.
+TRANSACTION_READ_FIELDS = tuple(TransactionRead.model_fields)
+# Filtered lists read category subtrees too.
+LIST_RESOURCES = (TRANSACTIONS, CATEGORIES)
+
+
 def list_transactions(
     db: Session,
     user_id: int,
     skip: int,
     limit: int,
-) -> tuple[list[Transaction], int]:
-    query = (
-        db.query(Transaction)
-        .join(Account, Transaction.account_id == Account.id)
-        .filter(Account.user_id == user_id)
+    fields: tuple[str, ...] = TRANSACTION_READ_FIELDS,
+) -> tuple[list[dict], int]:
+    query = _read_query(db, user_id, fields)
+    rows, total = paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=(TRANSACTIONS,)
     )
-    return paginate_query(query, skip=skip, limit=limit)
+    return _read_dicts(rows, fields), total
 
 
 def list_transactions_filtered(
@@ -68,23 +269,97 @@ def list_transactions_filtered(
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     category_id: int | None = None,
-) -> tuple[list[Transaction], int]:
-    query = (
-        db.query(Transaction)
-        .join(Account, Transaction.account_id == Account.id)
-        .filter(Account.user_id == user_id)
+    include_subcategories: bool = False,
+    fields: tuple[str, ...] = TRANSACTION_READ_FIELDS,
+) -> tuple[list[dict], int]:
+    query = apply_transaction_filters(
+        _read_query(db, user_id, fields),
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        category_id=category_id,
+        include_subcategories=include_subcategories,
+    )
+    rows, total = paginate_query(
+        query, skip=skip, limit=limit, user_id=user_id, resources=LIST_RESOURCES
+    )
+    return _read_dicts(rows, fields), total
+
+
+def search_transactions(
+    db: Session,
+    user_id: int,
+    q: str,
+    skip: int,
+    limit: int,
+    account_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    category_id: int | None = None,
+    include_subcategories: bool = False,
+    fields: tuple[str, ...] = TRANSACTION_READ_FIELDS,
+) -> tuple[list[dict], int]:
+    """Transactions whose merchant/description match ``q``, best match first."""
+    query = apply_transaction_filters(
+        _read_query(db, user_id, fields),
+        account_id=account_id,
+        start_date=start_date,
+        end_date=end_date,
+        category_id=category_id,
+        include_subcategories=include_subcategories,
     )
+    if uses_postgres_search(db):
+        rows, total = paginate_query(
+            apply_postgres_search(query, q),
+            skip=skip,
+            limit=limit,
+            user_id=user_id,
+            resources=LIST_RESOURCES,
+        )
+        return _read_dicts(rows, fields), total
+
+    ranked_ids = get_search_index(db, user_id).search(q)
+    if not ranked_ids:
+        return [], 0
+    if any(
+        value is not None for value in (account_id, start_date, end_date, category_id)
+    ):
+        allowed = {
+            transaction_id
+            for (transaction_id,) in query.with_entities(Transaction.id).filter(
+                Transaction.id.in_(ranked_ids)
+            )
+        }
+        ranked_ids = [item for item in ranked_ids if item in allowed]
+    page_ids = ranked_ids[skip : skip + limit]
+    by_id = {
+        item["id"]: item
+        for item in _read_dicts(query.filter(Transaction.id.in_(page_ids)), fields)
+    }
+    return [by_id[item] for item in page_ids if item in by_id], len(ranked_ids)
 
+
+def apply_transaction_filters(
+    query,
+    account_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    category_id: int | None = None,
+    include_subcategories: bool = False,
+):
     if account_id is not None:
         query = query.filter(Transaction.account_id == account_id)
+    # transaction_date is naive UTC; comparing it with an aware value would
+    # cast the column and defeat both its indexes and partition pruning.
     if start_date is not None:
-        query = query.filter(Transaction.transaction_date >= start_date)
+        query = query.filter(Transaction.transaction_date >= _naive_utc(start_date))
     if end_date is not None:
-        query = query.filter(Transaction.transaction_date <= end_date)
-    if category_id is not None:
+        query = query.filter(Transaction.transaction_date <= _naive_utc(end_date))
+    if category_id is not None and include_subcategories:
+        query = query.filter(Transaction.category_id.in_(subtree_select(category_id)))
+    elif category_id is not None:
         query = query.filter(Transaction.category_id == category_id)
-
-    return paginate_query(query, skip=skip, limit=limit)
+    return query
 
 
 def get_transaction(
@@ -92,8 +367,7 @@ def get_transaction(
 ) -> Transaction | None:
     return (
         db.query(Transaction)
-        .join(Account, Transaction.account_id == Account.id)
-        .filter(Account.user_id == user_id, Transaction.id == transaction_id)
+        .filter(Transaction.user_id == user_id, Transaction.id == transaction_id)
         .first()
     )
 
@@ -107,6 +381,9 @@ def update_transaction(
     transaction = get_transaction(db, user_id=user_id, transaction_id=transaction_id)
     if not transaction:
         return None
+    previous_entry = entry_for_transaction(transaction)
+    previous_balance = balance_entry_for_transaction(transaction)
+    previous_spend = spend_entry_for_transaction(transaction)
 
     if payload.account_id is not None:
         account = (
@@ -117,6 +394,7 @@ def update_transaction(
         if not account:
             raise ValueError("Account not found")
         transaction.account_id = payload.account_id
+        transaction.user_id = account.user_id
 
     if payload.amount is not None:
         transaction.amount = payload.amount
@@ -138,16 +416,313 @@ def update_transaction(
         transaction.installments_current = payload.installments_current
     if payload.category_id is not None:
         transaction.category_id = payload.category_id
+    if payload.model_fields_set & set(PLAN_FIELDS):
+        relink_transaction(db, transaction)
+    transaction.fingerprint = transaction_fingerprint(
+        transaction.account_id,
+        transaction.amount,
+        transaction.transaction_date,
+        transaction.merchant,
+        transaction.installments_current,
+    )
 
+    db.flush()
+    current_entry = entry_for_transaction(transaction)
+    if current_entry != previous_entry:
+        apply_rollup_changes(db, added=[current_entry], removed=[previous_entry])
+    current_balance = balance_entry_for_transaction(transaction)
+    if current_balance != previous_balance:
+        apply_balance_changes(db, added=[current_balance], removed=[previous_balance])
+    current_spend = spend_entry_for_transaction(transaction)
+    if current_spend != previous_spend:
+        apply_spend_changes(db, added=[current_spend], removed=[previous_spend])
+    touch(db, user_id, TRANSACTIONS, ACCOUNTS)
     db.commit()
+    invalidate_search_index(user_id)
     db.refresh(transaction)
     return transaction
 
 
+def update_transactions_bulk(
+    db: Session,
+    user_id: int,
+    filters: TransactionBulkFilter,
+    changes: TransactionBulkChanges,
+) -> int:
+    """Apply ``changes`` to every matching transaction with one UPDATE.
+
+    Returns the number of rows changed. When the change moves rows between
+    rollup buckets (category or type), the old bucket keys are read first
+    and the new ones come back from ``UPDATE ... RETURNING``, so
+    ``spending_rollups`` and account balances stay consistent without loading
+    ORM objects.
+    Renaming the merchant re-fingerprints the returned rows in one
+    executemany, and changing a plan field moves installment parcels to
+    their new plans.
+    """
+    values = changes.model_dump(exclude_unset=True)
+    if not values:
+        return 0
+    if values.get("category_id") is not None:
+        category_exists = (
+            db.query(Category.id)
+            .filter(
+                Category.id == values["category_id"],
+                or_(Category.user_id == user_id, Category.user_id.is_(None)),
+            )
+            .first()
+        )
+        if not category_exists:
+            raise ValueError("Category not found")
+
+    conditions = [Transaction.user_id == user_id]
+    if filters.ids is not None:
+        conditions.append(Transaction.id.in_(filters.ids))
+    if filters.merchant_contains is not None:
+        conditions.append(
+            func.lower(Transaction.merchant).contains(
+                filters.merchant_contains.lower(), autoescape=True
+            )
+        )
+
+    where = apply_transaction_filters(
+        select(Transaction.id).where(*conditions),
+        account_id=filters.account_id,
+        start_date=filters.start_date,
+        end_date=filters.end_date,
+        category_id=filters.category_id,
+    ).whereclause
+    statement = update(Transaction).where(where).values(**values)
+    options = {"synchronize_session": False}
+
+    moves_buckets = bool({"category_id", "transaction_type"} & values.keys())
+    if not moves_buckets and "merchant" not in values:
+        updated = db.execute(statement, execution_options=options).rowcount
+    else:
+        bucket_columns = (
+            Transaction.user_id,
+            Transaction.account_id,
+            Transaction.category_id,
+            Transaction.transaction_date,
+            Transaction.transaction_type,
+            Transaction.amount,
+        )
+        previous = []
+        if moves_buckets:
+            previous = db.execute(
+                select(*bucket_columns).where(where).with_for_update()
+            ).all()
+        current = db.execute(
+            statement.returning(
+                *bucket_columns, Transaction.id, Transaction.installments_current
+            ),
+            execution_options=options,
+        ).all()
+        if moves_buckets:
+            apply_rollup_changes(
+                db,
+                added=[rollup_entry(*row[:6]) for row in current],
+                removed=[rollup_entry(*row) for row in previous],
+            )
+        if "category_id" in values:
+            apply_spend_changes(
+                db,
+                added=[_spend_entry_for_bucket_row(row) for row in current],
+                removed=[_spend_entry_for_bucket_row(row) for row in previous],
+            )
+        if "transaction_type" in values:
+            apply_balance_changes(
+                db,
+                added=[_balance_entry_for_bucket_row(row) for row in current],
+                removed=[_balance_entry_for_bucket_row(row) for row in previous],
+            )
+        if set(PLAN_FIELDS) & values.keys() and current:
+            relink_transactions(db, [row.id for row in current])
+        if "merchant" in values and current:
+            db.execute(
+                update(Transaction),
+                [
+                    {
+                        "id": row.id,
+                        "fingerprint": transaction_fingerprint(
+                            row.account_id,
+                            row.amount,
+                            row.transaction_date,
+                            values["merchant"],
+                            row.installments_current,
+                        ),
+                    }
+                    for row in current
+                ],
+            )
+        updated = len(current)
+
+    touch(db, user_id, TRANSACTIONS, ACCOUNTS)
+    db.commit()
+    invalidate_search_index(user_id)
+    return updated
+
+
 def delete_transaction(db: Session, user_id: int, transaction_id: int) -> bool:
     transaction = get_transaction(db, user_id=user_id, transaction_id=transaction_id)
     if not transaction:
         return False
     db.delete(transaction)
+    db.flush()
+    apply_rollup_changes(db, removed=[entry_for_transaction(transaction)])
+    apply_balance_changes(db, removed=[balance_entry_for_transaction(transaction)])
+    apply_spend_changes(db, removed=[spend_entry_for_transaction(transaction)])
+    refresh_installment_plans(db, [transaction.installment_plan_id])
+    touch(db, user_id, TRANSACTIONS, ACCOUNTS)
     db.commit()
+    invalidate_search_index(user_id)
     return True
+
+
+MERGE_FIELDS = (
+    "merchant",
+    "description",
+    "transaction_type",
+    "payment_method",
+    "card_last4",
+    "installments_total",
+    "installments_current",
+    "category_id",
+    "raw_email_id",
+    "import_hash",
+)
+
+
+def merge_duplicate_transactions(
+    db: Session, user_id: int, dry_run: bool = False
+) -> DuplicateMergeResult:
+    """Fold transactions recorded by more than one source into one row.
+
+    Candidates are streamed once in (account, amount, date) order and
+    clustered by ``iter_duplicate_groups``. The oldest row of each group is
+    kept, its empty fields are filled from the others (e-mail link, import
+    hash, card, installments, category) and the rest are deleted with the
+    same rollup, balance and installment-plan bookkeeping as ``delete_transaction``.
+    """
+    rows = (
+        db.query(
+            Transaction.id,
+            Transaction.account_id,
+            Transaction.amount,
+            Transaction.transaction_date,
+            Transaction.merchant,
+            Transaction.raw_email_id,
+            Transaction.import_hash,
+        )
+        .filter(
+            Transaction.user_id == user_id, Transaction.transaction_date.is_not(None)
+        )
+        .order_by(
+            Transaction.account_id,
+            Transaction.amount,
+            Transaction.transaction_date,
+            Transaction.id,
+        )
+        .yield_per(1000)
+    )
+    candidates = (
+        DuplicateCandidate(
+            row.id,
+            row.account_id,
+            row.amount,
+            row.transaction_date,
+            row.merchant,
+            transaction_source(row.raw_email_id, row.import_hash),
+        )
+        for row in rows
+    )
+    groups = [
+        sorted(candidate.id for candidate in group)
+        for group in iter_duplicate_groups(candidates)
+    ]
+    result = DuplicateMergeResult(
+        groups_found=len(groups),
+        transactions_removed=sum(len(group) - 1 for group in groups),
+        dry_run=dry_run,
+        groups=groups,
+    )
+    if dry_run or not groups:
+        return result
+
+    for group in groups:
+        keeper, *others = (
+            db.query(Transaction)
+            .filter(Transaction.id.in_(group))
+            .order_by(Transaction.id)
+            .all()
+        )
+        previous_entry = entry_for_transaction(keeper)
+        previous_balance = balance_entry_for_transaction(keeper)
+        previous_spend = spend_entry_for_transaction(keeper)
+        removed = []
+        removed_balances = []
+        removed_spends = []
+        plan_ids = set()
+        for other in others:
+            for field in MERGE_FIELDS:
+                if getattr(keeper, field) is None:
+                    setattr(keeper, field, getattr(other, field))
+            removed.append(entry_for_transaction(other))
+            removed_balances.append(balance_entry_for_transaction(other))
+            removed_spends.append(spend_entry_for_transaction(other))
+            plan_ids.add(other.installment_plan_id)
+            db.delete(other)
+        db.flush()
+        relink_transaction(db, keeper)
+        refresh_installment_plans(db, plan_ids)
+        keeper.fingerprint = transaction_fingerprint(
+            keeper.account_id,
+            keeper.amount,
+            keeper.transaction_date,
+            keeper.merchant,
+            keeper.installments_current,
+        )
+        apply_rollup_changes(
+            db,
+            added=[entry_for_transaction(keeper)],
+            removed=[previous_entry, *removed],
+        )
+        apply_balance_changes(
+            db,
+            added=[balance_entry_for_transaction(keeper)],
+            removed=[previous_balance, *removed_balances],
+        )
+        apply_spend_changes(
+            db,
+            added=[spend_entry_for_transaction(keeper)],
+            removed=[previous_spend, *removed_spends],
+        )
+    touch(db, user_id, TRANSACTIONS, ACCOUNTS)
+    db.commit()
+    invalidate_search_index(user_id)
+    return result
+
+
+def _balance_entry_for_bucket_row(row):
+    return balance_entry(
+        row.account_id, row.transaction_date, row.transaction_type, row.amount
+    )
+
+
+def _spend_entry_for_bucket_row(row):
+    return spend_entry(row.user_id, row.category_id, row.transaction_date, row.amount)
+
+
+def _read_query(db: Session, user_id: int, fields: tuple[str, ...]):
+    columns = [getattr(Transaction, field) for field in fields]
+    return db.query(*columns).filter(Transaction.user_id == user_id)
+
+
+def _read_dicts(rows, fields: tuple[str, ...]) -> list[dict]:
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
@@ -6,14 +6,18 @@ os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
 os.environ.setdefault("SECRET_KEY", "test-secret")
 
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.core.cache import set_redis
 from app.core.database import Base, get_db
 from app.main import app
+from app.modules.categories.index import clear_category_indexes
+from app.modules.transactions.search import clear_search_indexes
 
 engine = create_engine(
     "sqlite+pysqlite://",
@@ -34,6 +38,8 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+redis_client = fakeredis.FakeRedis(decode_responses=True)
+set_redis(redis_client)
 
 
 @pytest.fixture(autouse=True)
@@ -43,6 +49,9 @@ def clean_db():
         db.execute(table.delete())
     db.commit()
     db.close()
+    clear_search_indexes()
+    clear_category_indexes()
+    redis_client.flushall()
     yield
 
 
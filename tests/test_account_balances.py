@@ -0,0 +1,157 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.models import AccountBalanceSnapshot, RecurringSeries
+from app.modules.accounts.balances import rebuild_balances, take_balance_snapshots
+from app.modules.recurring.detection import detect_recurring
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def create_account(client: TestClient, headers: dict, bank_name: str) -> dict:
+    return client.post(
+        "/accounts/",
+        json={"bank_name": bank_name, "account_type": "checking"},
+        headers=headers,
+    ).json()
+
+
+def create_transaction(client, headers, account, amount, day, transaction_type):
+    response = client.post(
+        "/transactions/",
+        json={
+            "account_id": account["id"],
+            "amount": amount,
+            "merchant": f"{transaction_type} {day}",
+            "transaction_date": f"{day}T12:00:00",
+            "transaction_type": transaction_type,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def balance_at(client, headers, account, at=None):
+    params = {"at": at} if at else {}
+    response = client.get(
+        f"/accounts/{account['id']}/balance", params=params, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def snapshots(db_session) -> dict[tuple[int, date], float]:
+    db_session.expire_all()
+    return {
+        (row.account_id, row.snapshot_date): round(row.balance, 2)
+        for row in db_session.query(AccountBalanceSnapshot)
+    }
+
+
+def test_balances_follow_writes_and_snapshots(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    checking = create_account(client, headers, "Nubank")
+    savings = create_account(client, headers, "Inter")
+
+    create_transaction(client, headers, checking, 1000.0, "2026-03-01", "deposit")
+    create_transaction(client, headers, checking, 200.0, "2026-03-02", "purchase")
+    create_transaction(client, headers, savings, 500.0, "2026-03-02", "pix_in")
+    assert balance_at(client, headers, checking)["balance"] == 800.0
+
+    take_balance_snapshots(db_session, date(2026, 3, 2))
+    take_balance_snapshots(db_session, date(2026, 3, 4))
+    db_session.commit()
+    late = create_transaction(client, headers, checking, 50.0, "2026-03-05", "purchase")
+    # Backdated purchase: both checking snapshots must move.
+    backdated = create_transaction(
+        client, headers, checking, 30.0, "2026-03-01", "purchase"
+    )
+    assert snapshots(db_session) == {
+        (checking["id"], date(2026, 3, 2)): 770.0,
+        (checking["id"], date(2026, 3, 4)): 770.0,
+        (savings["id"], date(2026, 3, 2)): 500.0,
+        (savings["id"], date(2026, 3, 4)): 500.0,
+    }
+
+    result = balance_at(client, headers, checking, "2026-03-05T18:00:00")
+    assert result["balance"] == 720.0
+    assert result["snapshot_date"] == "2026-03-04"
+    assert (
+        balance_at(client, headers, checking, "2026-03-01T23:00:00")["balance"] == 970.0
+    )
+
+    client.put(
+        f"/transactions/{late['id']}",
+        json={"transaction_type": "deposit"},
+        headers=headers,
+    )
+    client.delete(f"/transactions/{backdated['id']}", headers=headers)
+    assert balance_at(client, headers, checking)["balance"] == 850.0
+    account = client.get(f"/accounts/{checking['id']}", headers=headers).json()
+    assert account["last_balance"] == 850.0
+
+    maintained = snapshots(db_session)
+    rebuild_balances(db_session)
+    db_session.commit()
+    assert snapshots(db_session) == maintained
+
+    net_worth = client.get(
+        "/accounts/net-worth",
+        params={"start_date": "2026-03-03", "end_date": "2026-03-31"},
+        headers=headers,
+    ).json()
+    assert net_worth["current_net_worth"] == 1350.0
+    assert net_worth["points"] == [
+        {"day": "2026-03-03", "net_worth": 1300.0},
+        {"day": "2026-03-04", "net_worth": 1300.0},
+    ]
+
+    invalid = client.get(
+        "/accounts/net-worth",
+        params={"start_date": "2026-04-01", "end_date": "2026-03-01"},
+        headers=headers,
+    )
+    assert invalid.status_code == 400
+    other = register_and_login(client, "other@example.com")
+    forbidden = client.get(f"/accounts/{checking['id']}/balance", headers=other)
+    assert forbidden.status_code == 404
+
+
+def test_delete_account_removes_derived_rows(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    response = client.post(
+        "/transactions/",
+        json={
+            "account_id": account["id"],
+            "amount": 100.0,
+            "merchant": "Netflix",
+            "transaction_date": "2026-02-04T12:00:00",
+        },
+        headers=headers,
+    )
+    detect_recurring(db_session)
+    take_balance_snapshots(db_session, date(2026, 2, 4))
+    db_session.commit()
+    client.delete(f"/transactions/{response.json()['id']}", headers=headers)
+
+    derived = (AccountBalanceSnapshot, RecurringSeries)
+    assert all(db_session.query(model).count() for model in derived)
+
+    connection = db_session.connection()
+    connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    try:
+        deleted = client.delete(f"/accounts/{account['id']}", headers=headers)
+    finally:
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    assert deleted.status_code == 200
+    db_session.expire_all()
+    assert not any(db_session.query(model).count() for model in derived)
@@ -0,0 +1,170 @@
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.models import Transaction
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def setup_account(client: TestClient, headers: dict) -> tuple[int, int, int]:
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "checking"},
+        headers=headers,
+    ).json()
+    food = client.post("/categories/", json={"name": "Food"}, headers=headers).json()
+    fuel = client.post("/categories/", json={"name": "Fuel"}, headers=headers).json()
+    return account["id"], food["id"], fuel["id"]
+
+
+def test_spending_analytics_groups_by_category_and_period(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account_id, food_id, fuel_id = setup_account(client, headers)
+    items = [
+        (30.0, "2026-02-02T12:00:00", food_id, "iFood", "purchase"),
+        (20.0, "2026-02-04T12:00:00", food_id, "iFood", "purchase"),
+        (100.0, "2026-02-10T12:00:00", fuel_id, "Posto Shell", "purchase"),
+        (80.0, "2026-03-03T12:00:00", fuel_id, "Posto Shell", "purchase"),
+        (10.0, "2026-03-04T12:00:00", food_id, None, "pix_out"),
+        (5000.0, "2026-03-05T12:00:00", None, "Salario", "deposit"),
+    ]
+    client.post(
+        "/transactions/bulk",
+        json={
+            "items": [
+                {
+                    "account_id": account_id,
+                    "amount": amount,
+                    "transaction_date": date,
+                    "category_id": category_id,
+                    "merchant": merchant,
+                    "transaction_type": transaction_type,
+                }
+                for amount, date, category_id, merchant, transaction_type in items
+            ]
+        },
+        headers=headers,
+    )
+
+    response = client.get(
+        "/analytics/spending",
+        params={"period": "month", "end_date": "2026-03-31T23:59:59"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_amount"] == 240.0
+    assert data["transaction_count"] == 5
+    buckets = {
+        (bucket["period_start"], bucket["category_id"]): bucket["total_amount"]
+        for bucket in data["buckets"]
+    }
+    assert buckets == {
+        ("2026-02-01", food_id): 50.0,
+        ("2026-02-01", fuel_id): 100.0,
+        ("2026-03-01", fuel_id): 80.0,
+        ("2026-03-01", food_id): 10.0,
+    }
+    assert data["month_over_month"] == {
+        "current_month": "2026-03",
+        "current_total": 90.0,
+        "previous_month": "2026-02",
+        "previous_total": 150.0,
+        "delta": -60.0,
+        "delta_percent": -40.0,
+    }
+    assert [merchant["merchant"] for merchant in data["top_merchants"]] == [
+        "Posto Shell",
+        "iFood",
+    ]
+
+    weekly = client.get(
+        "/analytics/spending", params={"period": "week"}, headers=headers
+    ).json()
+    # 2026-02-02 and 2026-02-04 fall in the week starting Monday 2026-02-02.
+    assert {
+        "period_start": "2026-02-02",
+        "category_id": food_id,
+        "total_amount": 50.0,
+        "transaction_count": 2,
+    } in weekly["buckets"]
+
+
+def test_spending_analytics_three_year_history_is_fast(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account_id, food_id, fuel_id = setup_account(client, headers)
+    start = datetime(2023, 1, 1)
+    items = [
+        {
+            "account_id": account_id,
+            "amount": float(day % 90 + 1),
+            "transaction_date": (start + timedelta(hours=day * 8)).isoformat(),
+            "category_id": food_id if day % 3 else fuel_id,
+            "merchant": f"Loja {day % 40}",
+        }
+        for day in range(3 * 365 * 3)
+    ]
+    for offset in range(0, len(items), 5000):
+        client.post(
+            "/transactions/bulk",
+            json={"items": items[offset : offset + 5000]},
+            headers=headers,
+        )
+
+    started = time.perf_counter()
+    response = client.get(
+        "/analytics/spending", params={"period": "week"}, headers=headers
+    )
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    assert response.json()["transaction_count"] == len(items)
+    assert elapsed < 0.5
+
+
+def test_spending_analytics_merges_merchant_spellings(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    account_id, food_id, _ = setup_account(client, headers)
+    items = [
+        (30.0, food_id, "iFood"),
+        (25.0, food_id, "IFOOD"),
+        (20.0, food_id, "Ifood  "),
+        (60.0, None, "Xq7 Comercio"),
+    ]
+    client.post(
+        "/transactions/bulk",
+        json={
+            "items": [
+                {
+                    "account_id": account_id,
+                    "amount": amount,
+                    "transaction_date": "2026-02-02T12:00:00",
+                    "category_id": category_id,
+                    "merchant": merchant,
+                }
+                for amount, category_id, merchant in items
+            ]
+        },
+        headers=headers,
+    )
+    # Rows from before auto-categorization have no category.
+    db_session.query(Transaction).filter(Transaction.merchant == "Xq7 Comercio").update(
+        {Transaction.category_id: None}
+    )
+    db_session.commit()
+
+    data = client.get("/analytics/spending", headers=headers).json()
+    assert [
+        (merchant["merchant"], merchant["total_amount"], merchant["transaction_count"])
+        for merchant in data["top_merchants"]
+    ] == [("IFOOD", 75.0, 3), ("Xq7 Comercio", 60.0, 1)]
+    assert {
+        (bucket["category_id"], bucket["total_amount"]) for bucket in data["buckets"]
+    } == {(None, 60.0), (food_id, 75.0)}
@@ -0,0 +1,131 @@
+from datetime import UTC, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.models import Account, Budget, BudgetPeriod, Category, User
+from app.modules.budgets.schemas import BudgetUpdate
+from app.modules.budgets.service import update_budget
+from app.modules.notifications.alerts import BudgetSpend, evaluate_budget_alerts
+from app.modules.notifications.service import pop_notifications
+from app.modules.transactions.schemas import TransactionCreate
+from app.modules.transactions.service import create_transaction
+
+
+def seed(db_session):
+    user = User(email="alerts@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    parent = Category(user_id=user.id, name="Casa")
+    db_session.add(parent)
+    db_session.flush()
+    child = Category(user_id=user.id, name="Luz", parent_id=parent.id)
+    account = Account(user_id=user.id, bank_name="Nubank", account_type="checking")
+    db_session.add_all([child, account])
+    db_session.flush()
+    budget = Budget(
+        user_id=user.id,
+        category_id=parent.id,
+        amount_limit=100.0,
+        period=BudgetPeriod.monthly,
+        start_date=datetime.now(UTC).replace(tzinfo=None) - timedelta(days=3),
+    )
+    db_session.add(budget)
+    db_session.commit()
+    return user, account, budget, child
+
+
+def test_transaction_writes_queue_threshold_alerts_once(db_session):
+    user, account, budget, child = seed(db_session)
+
+    def spend(amount):
+        payload = TransactionCreate(
+            account_id=account.id,
+            amount=amount,
+            merchant=f"Loja {amount}",
+            category_id=child.id,
+            transaction_date=datetime.now(UTC),
+        )
+        create_transaction(db_session, user.id, payload)
+
+    spend(50.0)
+    assert pop_notifications() == []
+    spend(35.0)
+    spend(1.0)
+    spend(20.0)
+
+    alerts = pop_notifications()
+    assert [alert.data["threshold"] for alert in alerts] == [80, 100]
+    assert [alert.data["amount_spent"] for alert in alerts] == [85.0, 106.0]
+    assert {alert.data["budget_id"] for alert in alerts} == {budget.id}
+    assert alerts[0].kind == "budget_threshold"
+    assert alerts[0].user_id == user.id
+    assert pop_notifications() == []
+
+
+def test_changing_the_limit_rearms_alerts(db_session):
+    user, account, budget, child = seed(db_session)
+
+    def spend(amount):
+        payload = TransactionCreate(
+            account_id=account.id,
+            amount=amount,
+            merchant=f"Loja {amount}",
+            category_id=child.id,
+            transaction_date=datetime.now(UTC),
+        )
+        create_transaction(db_session, user.id, payload)
+
+    spend(85.0)
+    assert [alert.data["threshold"] for alert in pop_notifications()] == [80]
+    update_budget(db_session, user.id, budget.id, BudgetUpdate(amount_limit=200.0))
+    spend(10.0)
+    assert pop_notifications() == []
+    spend(70.0)
+    alerts = pop_notifications()
+    assert [alert.data["threshold"] for alert in alerts] == [80]
+    assert alerts[0].data["amount_limit"] == 200.0
+
+
+def test_jumping_thresholds_reports_the_highest():
+    start = datetime(2026, 3, 1)
+    spend = BudgetSpend(1, 7, 3, 200.0, start, start + timedelta(days=31), 250.0)
+
+    alerts = evaluate_budget_alerts([spend], now=start)
+    assert [alert.data["threshold"] for alert in alerts] == [100]
+    assert evaluate_budget_alerts([spend._replace(amount_spent=170.0)]) == []
+    next_window = spend._replace(period_start=start + timedelta(days=31))
+    assert len(evaluate_budget_alerts([next_window], now=start)) == 1
+
+
+def test_alert_markers_are_cleared_when_queueing_fails(monkeypatch):
+    start = datetime(2026, 3, 1)
+    spend = BudgetSpend(1, 7, 3, 200.0, start, start + timedelta(days=31), 170.0)
+
+    monkeypatch.setattr(
+        "app.modules.notifications.alerts.enqueue_notifications",
+        lambda notifications: False,
+    )
+    assert evaluate_budget_alerts([spend], now=start) == []
+    monkeypatch.undo()
+
+    retried = evaluate_budget_alerts([spend], now=start)
+    assert [alert.data["threshold"] for alert in retried] == [80]
+
+
+def test_send_notification_is_queued(client: TestClient):
+    client.post(
+        "/auth/register", json={"email": "user@example.com", "password": "secret"}
+    )
+    token = client.post(
+        "/auth/token", data={"username": "user@example.com", "password": "secret"}
+    ).json()["access_token"]
+
+    response = client.post(
+        "/notifications/send",
+        json={"channel": "email", "message": "Olá"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.json() == {"status": "queued", "channel": "email"}
+    [queued] = pop_notifications()
+    assert queued.message == "Olá"
+    assert queued.created_at.tzinfo is None
@@ -0,0 +1,166 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import event
+
+from app.core.cache import get_redis
+from app.models import Account, Budget, BudgetPeriod, Category, User
+from app.modules.budgets.counters import (
+    apply_spend_changes,
+    cached_spent,
+    spend_entry,
+)
+from app.modules.budgets.service import get_budget_summaries, get_budget_summary
+from app.modules.budgets.windows import resolve_period_window
+from app.modules.transactions.schemas import (
+    TransactionBulkChanges,
+    TransactionBulkFilter,
+    TransactionCreate,
+    TransactionUpdate,
+)
+from app.modules.transactions.service import (
+    create_transaction,
+    delete_transaction,
+    update_transaction,
+    update_transactions_bulk,
+)
+
+
+def seed(db_session):
+    user = User(email="counters@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    parent = Category(user_id=user.id, name="Casa")
+    db_session.add(parent)
+    db_session.flush()
+    child = Category(user_id=user.id, name="Luz", parent_id=parent.id)
+    other = Category(user_id=user.id, name="Lazer")
+    account = Account(user_id=user.id, bank_name="Nubank", account_type="checking")
+    db_session.add_all([child, other, account])
+    db_session.flush()
+    budget = Budget(
+        user_id=user.id,
+        category_id=parent.id,
+        amount_limit=100.0,
+        period=BudgetPeriod.monthly,
+        start_date=datetime.now(UTC).replace(tzinfo=None) - timedelta(days=3),
+    )
+    db_session.add(budget)
+    db_session.commit()
+    return user, account, budget, child, other
+
+
+def spend(db_session, user, account, category, amount, days_ago=0):
+    payload = TransactionCreate(
+        account_id=account.id,
+        amount=amount,
+        merchant=f"Loja {amount}",
+        category_id=category.id,
+        transaction_date=datetime.now(UTC) - timedelta(days=days_ago),
+    )
+    return create_transaction(db_session, user.id, payload)
+
+
+def transaction_statements(db_session, action) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return sum("transactions" in statement for statement in statements)
+
+
+def test_counters_follow_transaction_writes(db_session):
+    user, account, budget, child, other = seed(db_session)
+    spend(db_session, user, account, child, 10.0)
+    assert [
+        get_budget_summary(db_session, user.id, budget.id, flag).amount_spent
+        for flag in (True, False)
+    ] == [10.0, 0.0]
+    assert get_redis().keys("budget_spent:*")
+
+    first = spend(db_session, user, account, budget.category, 5.0)
+    moved = spend(db_session, user, account, child, 7.0)
+    spend(db_session, user, account, child, 50.0, days_ago=40)
+    update_transaction(db_session, user.id, first.id, TransactionUpdate(amount=8.0))
+    update_transaction(
+        db_session, user.id, moved.id, TransactionUpdate(category_id=other.id)
+    )
+    delete_transaction(db_session, user.id, moved.id)
+    update_transactions_bulk(
+        db_session,
+        user.id,
+        TransactionBulkFilter(ids=[first.id]),
+        TransactionBulkChanges(category_id=child.id),
+    )
+
+    summaries = []
+    assert (
+        transaction_statements(
+            db_session,
+            lambda: summaries.extend(
+                [
+                    get_budget_summary(db_session, user.id, budget.id, True),
+                    get_budget_summary(db_session, user.id, budget.id, False),
+                ]
+            ),
+        )
+        == 0
+    )
+    assert [item.amount_spent for item in summaries] == [18.0, 0.0]
+
+    get_redis().flushall()
+    assert [
+        get_budget_summary(db_session, user.id, budget.id, flag).amount_spent
+        for flag in (True, False)
+    ] == [18.0, 0.0]
+
+
+def test_rebuild_racing_a_write_sums_again(db_session):
+    user, account, budget, child, _ = seed(db_session)
+    window_start, _ = resolve_period_window(
+        budget.start_date, budget.period, datetime.now(UTC).replace(tzinfo=None)
+    )
+    # The budget's own-category counter: a write adds to it only if present.
+    scope = (budget.id, False, window_start)
+    sums = []
+
+    def compute(scopes):
+        if not sums:
+            # Summed before a write that commits before the counter is stored.
+            sums.append(0.0)
+            spend(db_session, user, account, budget.category, 7.0)
+        else:
+            sums.append(7.0)
+        return {scope: sums[-1]}
+
+    assert cached_spent(user.id, [scope], compute) == {scope: 7.0}
+    assert sums == [0.0, 7.0]
+    assert (
+        transaction_statements(
+            db_session,
+            lambda: sums.append(
+                get_budget_summary(db_session, user.id, budget.id, False).amount_spent
+            ),
+        )
+        == 0
+    )
+    assert sums[-1] == 7.0
+
+
+def test_counters_ignore_rolled_back_writes(db_session):
+    user, _, budget, child, _ = seed(db_session)
+    assert get_budget_summaries(db_session, user.id)[0].amount_spent == 0.0
+
+    apply_spend_changes(
+        db_session, added=[spend_entry(user.id, child.id, datetime.now(UTC), 30.0)]
+    )
+    db_session.rollback()
+    db_session.commit()
+
+    assert get_budget_summaries(db_session, user.id)[0].amount_spent == 0.0
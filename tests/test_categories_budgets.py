@@ -1,7 +1,10 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 from fastapi.testclient import TestClient
 
+from app.models import BudgetPeriod
+from app.modules.budgets.windows import resolve_period_window
+
 
 def register_and_login(client: TestClient) -> dict:
     response = client.post(
@@ -110,3 +113,163 @@ def test_budget_summary_with_subcategories(client: TestClient):
     )
     assert summary_without.status_code == 200
     assert summary_without.json()["amount_spent"] == 0.0
+
+
+def test_all_budget_summaries(client: TestClient):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+    parent = client.post("/categories/", json={"name": "Casa"}, headers=headers).json()
+    child = client.post(
+        "/categories/", json={"name": "Luz", "parent_id": parent["id"]}, headers=headers
+    ).json()
+    other = client.post("/categories/", json={"name": "Lazer"}, headers=headers).json()
+    budgets = [
+        client.post(
+            "/budgets/",
+            json={"category_id": category_id, "amount_limit": 100.0, "period": period},
+            headers=headers,
+        ).json()
+        for category_id, period in (
+            (parent["id"], "monthly"),
+            (child["id"], "weekly"),
+            (other["id"], "yearly"),
+        )
+    ]
+    for category_id, amount in ((child["id"], 30.0), (parent["id"], 5.0)):
+        client.post(
+            "/transactions/",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "merchant": "Loja",
+                "category_id": category_id,
+                "transaction_date": datetime.now(UTC).isoformat(),
+            },
+            headers=headers,
+        )
+
+    response = client.get("/budgets/summary", headers=headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["budget_id"] for item in items] == [item["id"] for item in budgets]
+    assert [item["amount_spent"] for item in items] == [35.0, 30.0, 0.0]
+    assert items[0]["amount_remaining"] == 65.0
+    for item in items:
+        single = client.get(f"/budgets/{item['budget_id']}/summary", headers=headers)
+        assert single.json() == item
+
+    flat = client.get(
+        "/budgets/summary", params={"include_subcategories": False}, headers=headers
+    )
+    assert [item["amount_spent"] for item in flat.json()["items"]] == [5.0, 30.0, 0.0]
+
+
+def test_category_filters_include_subtree(client: TestClient):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+    parent = client.post("/categories/", json={"name": "Casa"}, headers=headers).json()
+    child = client.post(
+        "/categories/",
+        json={"name": "Contas", "parent_id": parent["id"]},
+        headers=headers,
+    ).json()
+    grandchild = client.post(
+        "/categories/", json={"name": "Luz", "parent_id": child["id"]}, headers=headers
+    ).json()
+    other = client.post("/categories/", json={"name": "Lazer"}, headers=headers).json()
+    for category_id, amount in (
+        (grandchild["id"], 40.0),
+        (parent["id"], 10.0),
+        (other["id"], 99.0),
+    ):
+        client.post(
+            "/transactions/",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "merchant": "Loja",
+                "category_id": category_id,
+                "transaction_date": datetime.now(UTC).isoformat(),
+            },
+            headers=headers,
+        )
+
+    subtree = client.get(
+        "/transactions/",
+        params={"category_id": parent["id"], "include_subcategories": True},
+        headers=headers,
+    ).json()
+    assert sorted(item["amount"] for item in subtree["items"]) == [10.0, 40.0]
+    only_parent = client.get(
+        "/transactions/", params={"category_id": parent["id"]}, headers=headers
+    ).json()
+    assert [item["amount"] for item in only_parent["items"]] == [10.0]
+
+    spending = client.get(
+        "/analytics/spending", params={"category_id": child["id"]}, headers=headers
+    ).json()
+    assert spending["total_amount"] == 40.0
+
+
+def test_budget_windows_are_offset_from_start_date():
+    start = datetime(2025, 1, 31, 9)
+    assert resolve_period_window(
+        start, BudgetPeriod.monthly, now=datetime(2025, 3, 30)
+    ) == (datetime(2025, 2, 28, 9), datetime(2025, 3, 31, 9))
+    assert resolve_period_window(
+        start, BudgetPeriod.monthly, now=datetime(2030, 5, 31, 10)
+    ) == (datetime(2030, 5, 31, 9), datetime(2030, 6, 30, 9))
+    assert resolve_period_window(
+        start, BudgetPeriod.yearly, now=datetime(2025, 1, 31, 8)
+    ) == (start, datetime(2026, 1, 31, 9))
+    assert resolve_period_window(
+        start, BudgetPeriod.weekly, now=datetime(2025, 2, 14, 9)
+    ) == (datetime(2025, 2, 14, 9), datetime(2025, 2, 21, 9))
+    assert resolve_period_window(
+        start, BudgetPeriod.monthly, now=datetime(2024, 12, 1)
+    ) == (start, datetime(2025, 2, 28, 9))
+
+
+def test_budget_history(client: TestClient):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+    category = client.post("/categories/", json={"name": "Casa"}, headers=headers)
+    category_id = category.json()["id"]
+    now = datetime.now(UTC)
+    budget = client.post(
+        "/budgets/",
+        json={
+            "category_id": category_id,
+            "amount_limit": 100.0,
+            "period": "weekly",
+            "start_date": (now - timedelta(days=15)).isoformat(),
+        },
+        headers=headers,
+    ).json()
+    for days_ago, amount in ((14, 30.0), (13, 20.0), (1, 120.0)):
+        client.post(
+            "/transactions/",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "merchant": "Loja",
+                "category_id": category_id,
+                "transaction_date": (now - timedelta(days=days_ago)).isoformat(),
+            },
+            headers=headers,
+        )
+
+    response = client.get(
+        f"/budgets/{budget['id']}/history", params={"periods": 5}, headers=headers
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["amount_spent"] for item in items] == [50.0, 0.0, 120.0]
+    assert [item["amount_remaining"] for item in items] == [50.0, 100.0, -20.0]
+    assert items[1]["period_end"] == items[2]["period_start"]
+
+    latest = client.get(
+        f"/budgets/{budget['id']}/history", params={"periods": 1}, headers=headers
+    ).json()["items"]
+    assert [item["amount_spent"] for item in latest] == [120.0]
+    assert client.get("/budgets/999/history", headers=headers).status_code == 404
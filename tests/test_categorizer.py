@@ -1,5 +1,11 @@
+from sqlalchemy import event
+
+from app.models import Category, User
 from app.modules.ai_agent.schemas import CategorizationRequest
-from app.modules.ai_agent.service import categorize_transaction
+from app.modules.ai_agent.service import categorize_transaction, categorize_with_db
+from app.modules.categories.index import get_category_index
+from app.modules.categories.schemas import CategoryCreate
+from app.modules.categories.service import create_category
 
 
 def test_transport_uber():
@@ -14,3 +20,51 @@ def test_food_market():
     result = categorize_transaction(payload)
     assert result.category_name == "Alimentação"
     assert result.subcategory_name == "Supermercado"
+
+
+def count_category_queries(db_session, action) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return sum("FROM categories" in statement for statement in statements)
+
+
+def test_categorize_with_db_uses_cached_category_index(db_session):
+    user = User(email="index@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    transport = Category(user_id=user.id, name="transporte")
+    db_session.add(transport)
+    db_session.commit()
+
+    first = categorize_with_db(db_session, user.id, "Uber Trip", None)
+    assert first.category_id == transport.id
+
+    results = []
+    queries = count_category_queries(
+        db_session,
+        lambda: results.extend(
+            categorize_with_db(db_session, user.id, merchant, None)
+            for merchant in ("Uber Trip", "99 Pop", "Cabify")
+        ),
+    )
+    assert queries == 0
+    assert {result.category_id for result in results} == {transport.id}
+
+    child = create_category(
+        db_session,
+        user.id,
+        CategoryCreate(name="Uber/99", parent_id=transport.id),
+    )
+    assert categorize_with_db(db_session, user.id, "Uber", None).category_id == (
+        child.id
+    )
+    assert get_category_index(db_session, user.id).has_children(transport.id)
@@ -0,0 +1,119 @@
+import fakeredis
+from fastapi.testclient import TestClient
+
+from app.core.cache import get_redis, set_redis
+from app.modules.accounts import router as accounts_router
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def test_unchanged_lists_answer_304_until_a_write(client: TestClient, monkeypatch):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "checking"},
+        headers=headers,
+    ).json()
+
+    first = client.get("/accounts/", headers=headers)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("list query must not run on a 304")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(accounts_router, "list_accounts", fail)
+        cached = client.get("/accounts/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    other_page = client.get("/accounts/", params={"skip": 1}, headers=headers)
+    assert other_page.headers["etag"] != etag
+    other_user = register_and_login(client, "other@example.com")
+    response = client.get("/accounts/", headers={**other_user, "If-None-Match": etag})
+    assert response.status_code == 200
+
+    # A transaction moves the account balance, so account ETags change too.
+    client.post(
+        "/transactions/",
+        json={"account_id": account["id"], "amount": 10.0, "merchant": "Padaria"},
+        headers=headers,
+    )
+    changed = client.get("/accounts/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    category_etag = client.get("/categories/", headers=headers).headers["etag"]
+    client.post("/categories/", json={"name": "Mercado"}, headers=headers)
+    response = client.get(
+        "/categories/", headers={**headers, "If-None-Match": category_etag}
+    )
+    assert response.status_code == 200
+
+
+def test_requests_are_served_without_redis(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    server = fakeredis.FakeServer()
+    server.connected = False
+    previous = get_redis()
+    set_redis(fakeredis.FakeRedis(server=server, decode_responses=True))
+    try:
+        created = client.post(
+            "/accounts/",
+            json={"bank_name": "Nubank", "account_type": "checking"},
+            headers=headers,
+        )
+        assert created.status_code == 200
+        response = client.get("/accounts/", headers={**headers, "If-None-Match": "*"})
+    finally:
+        set_redis(previous)
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert response.json()["total"] == 1
+
+
+def test_subcategory_list_etag_follows_category_moves(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "checking"},
+        headers=headers,
+    ).json()
+    food = client.post("/categories/", json={"name": "Alimentação"}, headers=headers)
+    leisure = client.post("/categories/", json={"name": "Lazer"}, headers=headers)
+    bars = client.post(
+        "/categories/",
+        json={"name": "Bares", "parent_id": leisure.json()["id"]},
+        headers=headers,
+    ).json()
+    client.post(
+        "/transactions/",
+        json={"account_id": account["id"], "amount": 30.0, "category_id": bars["id"]},
+        headers=headers,
+    )
+
+    params = {"category_id": food.json()["id"], "include_subcategories": "true"}
+    first = client.get("/transactions/", params=params, headers=headers)
+    assert first.json()["total"] == 0
+
+    client.put(
+        f"/categories/{bars['id']}",
+        json={"name": "Bares", "parent_id": food.json()["id"]},
+        headers=headers,
+    )
+    moved = client.get(
+        "/transactions/",
+        params=params,
+        headers={**headers, "If-None-Match": first.headers["etag"]},
+    )
+    assert moved.status_code == 200
+    assert moved.headers["etag"] != first.headers["etag"]
+    assert moved.json()["total"] == 1
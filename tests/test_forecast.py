@@ -0,0 +1,178 @@
+from datetime import UTC, date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.models import (
+    Account,
+    Budget,
+    BudgetPeriod,
+    Category,
+    RecurringSeries,
+    Transaction,
+    User,
+)
+from app.modules.forecast import service as forecast_service
+from app.modules.forecast.service import build_forecast
+from app.modules.recurring.detection import detect_recurring
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def create_transaction(client, headers, account, merchant, amount, day, **extra):
+    response = client.post(
+        "/transactions/",
+        json={
+            "account_id": account["id"],
+            "amount": amount,
+            "merchant": merchant,
+            "transaction_date": f"{day}T10:00:00",
+            **extra,
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+
+def test_forecast_projects_installments_and_recurring(
+    client: TestClient, db_session, monkeypatch
+):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "checking"},
+        headers=headers,
+    ).json()
+    create_transaction(
+        client,
+        headers,
+        account,
+        "Salario",
+        3000.0,
+        "2026-03-01",
+        transaction_type="deposit",
+    )
+    create_transaction(
+        client,
+        headers,
+        account,
+        "Loja Tech",
+        100.0,
+        "2026-03-05",
+        installments_total=3,
+        installments_current=1,
+    )
+    for day in ("2025-12-05", "2026-01-05", "2026-02-05"):
+        create_transaction(client, headers, account, "NETFLIX.COM", 55.9, day)
+    detect_recurring(db_session)
+    user_id = db_session.query(User.id).scalar()
+
+    forecast = build_forecast(db_session, user_id, days=60, today=date(2026, 3, 10))
+    [checking] = forecast.accounts
+    balances = {point.day: point.balance for point in checking.points}
+    assert checking.starting_balance == 2732.3
+    # Netflix was due on 03-05 and is late within the grace period.
+    assert balances[date(2026, 3, 10)] == 2676.4
+    assert balances[date(2026, 4, 4)] == 2676.4
+    # Parcel 2/3 and the next Netflix charge.
+    assert balances[date(2026, 4, 5)] == 2520.5
+    assert checking.ending_balance == 2364.6
+    assert checking.lowest_balance_day == date(2026, 5, 5)
+    assert forecast.points[0].scheduled_amount == -55.9
+    assert forecast.ending_balance == 2364.6
+
+    first = client.get("/forecast/", params={"days": 90}, headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()["points"]) == 90
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached forecast must not be rebuilt")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(forecast_service, "build_forecast", fail)
+        cached = client.get("/forecast/", params={"days": 90}, headers=headers)
+    assert cached.json() == first.json()
+
+    category = client.post("/categories/", json={"name": "Lazer"}, headers=headers)
+    client.post(
+        "/budgets/",
+        json={
+            "category_id": category.json()["id"],
+            "amount_limit": 300.0,
+            "period": "monthly",
+        },
+        headers=headers,
+    )
+    budgeted = client.get("/forecast/", params={"days": 90}, headers=headers).json()
+    assert budgeted["points"][0]["budgeted_amount"] > 0
+    assert budgeted["ending_balance"] < first.json()["ending_balance"]
+    assert budgeted["accounts"] == first.json()["accounts"]
+
+
+def test_forecast_counts_nested_budgets_and_scheduled_charges_once(db_session):
+    today = datetime.now(UTC).date()
+    month_start = datetime(today.year, today.month, 1)
+    user = User(email="forecast@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    food = Category(user_id=user.id, name="Alimentação")
+    account = Account(user_id=user.id, bank_name="Nubank", account_type="checking")
+    db_session.add_all([food, account])
+    db_session.flush()
+    restaurants = Category(user_id=user.id, name="Restaurantes", parent_id=food.id)
+    db_session.add(restaurants)
+    db_session.flush()
+    for category, limit in ((food, 300.0), (restaurants, 100.0)):
+        db_session.add(
+            Budget(
+                user_id=user.id,
+                category_id=category.id,
+                amount_limit=limit,
+                period=BudgetPeriod.monthly,
+                start_date=month_start,
+            )
+        )
+    last_charge = month_start - timedelta(days=5)
+    db_session.add_all(
+        [
+            Transaction(
+                user_id=user.id,
+                account_id=account.id,
+                amount=50.0,
+                merchant="Clube do Vinho",
+                category_id=restaurants.id,
+                transaction_date=last_charge,
+            ),
+            RecurringSeries(
+                user_id=user.id,
+                account_id=account.id,
+                merchant="Clube do Vinho",
+                merchant_key="clube do vinho",
+                occurrence_count=3,
+                first_seen_at=last_charge - timedelta(days=61),
+                last_seen_at=last_charge,
+                last_amount=50.0,
+                amount_sum=150.0,
+                amount_sq_sum=7500.0,
+                cadence="monthly",
+                next_expected_date=today,
+            ),
+        ]
+    )
+    db_session.commit()
+
+    # A horizon that ends with the current budget window.
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    days = (next_month.date() - today).days
+    forecast = build_forecast(db_session, user.id, days=days, today=today)
+    budgeted = sum(point.budgeted_amount for point in forecast.points)
+    scheduled = sum(point.scheduled_amount for point in forecast.points)
+    assert scheduled == -50.0
+    # Only the Alimentação budget counts, less the scheduled charge.
+    assert abs(budgeted - 250.0) < 0.05
+    assert forecast.ending_balance == -300.0
@@ -1,7 +1,8 @@
+from datetime import datetime
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-from app.models import RawEmail
+from app.models import Account, RawEmail, Transaction, User
 from app.modules.email_parser.schemas import ParsedTransaction, RawEmailIngest
 from app.modules.gmail_sync.schemas import GmailMessage, GmailSyncConfig
 from app.modules.gmail_sync.service import sync_gmail_emails
@@ -80,6 +81,70 @@ def test_sync_gmail_emails_creates_transactions(db_session):
     assert create_transaction.call_count == 2
 
 
+def test_sync_gmail_emails_keeps_repeated_purchases(db_session):
+    user = User(email="gmail@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    account = Account(user_id=user.id, bank_name="Nubank", account_type="checking")
+    db_session.add(account)
+    db_session.commit()
+
+    body = "Compra de R$ 12,50 aprovada em STARBUCKS"
+    gmail_messages = [
+        GmailMessage(
+            id=f"msg-{number}",
+            thread_id=f"t{number}",
+            from_address="no-reply@nubank.com.br",
+            subject="Compra aprovada",
+            body=body,
+            bank_source="nubank",
+        )
+        for number in (1, 2)
+    ]
+    parsed = [
+        ParsedTransaction(
+            success=True,
+            bank_source="nubank",
+            amount=12.5,
+            merchant="STARBUCKS",
+            transaction_type="purchase",
+            payment_method="credit_card",
+            transaction_date=datetime(2026, 3, 10, hour),
+            description=None,
+            subject=None,
+            reason="test",
+        )
+        for hour in (9, 17)
+    ]
+
+    with (
+        patch(
+            "app.modules.gmail_sync.service.get_gmail_service", return_value=MagicMock()
+        ),
+        patch(
+            "app.modules.gmail_sync.service.search_messages",
+            return_value=["msg-1", "msg-2"],
+        ),
+        patch(
+            "app.modules.gmail_sync.service.fetch_message_content",
+            side_effect=gmail_messages,
+        ),
+        patch("app.modules.gmail_sync.service.parse_email", side_effect=parsed),
+    ):
+        result = sync_gmail_emails(
+            db=db_session,
+            credentials_dict={"token": "x"},
+            account_id=account.id,
+            config=GmailSyncConfig(query="", max_results=10),
+            user_id=user.id,
+        )
+
+    assert result.transactions_created == 2
+    assert result.duplicates_skipped == 0
+    assert result.possible_duplicates == 1
+    assert db_session.query(Transaction).filter_by(user_id=user.id).count() == 2
+
+
 def test_sync_gmail_emails_skips_non_bank(db_session):
     config = GmailSyncConfig(query="", max_results=10)
 
@@ -0,0 +1,142 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.models import InstallmentPlan
+from app.modules.installments.plans import rebuild_installment_plans
+from app.modules.installments.service import get_future_commitments
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def parcel(account_id, merchant, amount, date, current, total):
+    return {
+        "account_id": account_id,
+        "amount": amount,
+        "merchant": merchant,
+        "transaction_date": date,
+        "transaction_type": "purchase",
+        "card_last4": "1234",
+        "installments_current": current,
+        "installments_total": total,
+    }
+
+
+def test_installment_plans_are_grouped_at_ingest(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "credit_card"},
+        headers=headers,
+    ).json()
+
+    client.post(
+        "/transactions/",
+        json=parcel(account["id"], "MAGAZINE LUIZA", 100.0, "2026-01-15T10:00", 1, 10),
+        headers=headers,
+    )
+    third = client.post(
+        "/transactions/",
+        json=parcel(
+            account["id"], "Magazine Luiza PARC 03/10", 100.0, "2026-03-15T10:00", 3, 10
+        ),
+        headers=headers,
+    ).json()
+    client.post(
+        "/transactions/bulk",
+        json={
+            "items": [
+                parcel(
+                    account["id"], "Magazine Luiza", 100.0, "2026-02-15T10:00", 2, 10
+                ),
+                parcel(account["id"], "Loja Tenis", 50.0, "2026-03-01T10:00", 1, 3),
+            ]
+        },
+        headers=headers,
+    )
+
+    plans = client.get("/installments/plans", headers=headers).json()
+    assert plans["total"] == 2
+    by_merchant = {plan["merchant"]: plan for plan in plans["items"]}
+    magalu = by_merchant["MAGAZINE LUIZA"]
+    assert magalu["parcel_count"] == 3
+    assert magalu["last_installment_seen"] == 3
+    assert magalu["start_month"] == "2026-01"
+    assert magalu["remaining_amount"] == 700.0
+
+    user_id = db_session.query(InstallmentPlan.user_id).first()[0]
+    commitments = get_future_commitments(
+        db_session, user_id=user_id, months=3, now=datetime(2026, 4, 1)
+    )
+    assert [(month.month, month.total_amount) for month in commitments.months] == [
+        ("2026-04", 150.0),
+        ("2026-05", 150.0),
+        ("2026-06", 100.0),
+    ]
+
+    client.delete(f"/transactions/{third['id']}", headers=headers)
+    plans = client.get("/installments/plans", headers=headers).json()
+    magalu = next(p for p in plans["items"] if p["merchant"] == "MAGAZINE LUIZA")
+    assert (magalu["parcel_count"], magalu["last_installment_seen"]) == (2, 2)
+
+    response = client.get(
+        "/installments/commitments", params={"months": 60}, headers=headers
+    )
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    before = {
+        (plan.merchant_key, plan.parcel_count, plan.last_installment_seen)
+        for plan in db_session.query(InstallmentPlan)
+    }
+    assert rebuild_installment_plans(db_session) == 2
+    db_session.commit()
+    after = {
+        (plan.merchant_key, plan.parcel_count, plan.last_installment_seen)
+        for plan in db_session.query(InstallmentPlan)
+    }
+    assert before == after
+
+
+def test_bulk_edit_moves_parcels_between_plans(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "credit_card"},
+        headers=headers,
+    ).json()
+    created = client.post(
+        "/transactions/bulk",
+        json={
+            "items": [
+                parcel(account["id"], "Loja Tenis", 50.0, "2026-01-10T10:00", 1, 3),
+                parcel(account["id"], "Loja Tenis", 50.0, "2026-02-10T10:00", 2, 3),
+            ]
+        },
+        headers=headers,
+    ).json()
+    ids = [result["transaction_id"] for result in created["results"]]
+
+    def plans():
+        items = client.get("/installments/plans", headers=headers).json()["items"]
+        return sorted((plan["merchant"], plan["parcel_count"]) for plan in items)
+
+    client.patch(
+        "/transactions/bulk",
+        json={"filter": {"ids": ids}, "changes": {"merchant": "Centauro"}},
+        headers=headers,
+    )
+    assert plans() == [("Centauro", 2)]
+
+    client.patch(
+        "/transactions/bulk",
+        json={"filter": {"ids": ids[:1]}, "changes": {"transaction_type": "pix_in"}},
+        headers=headers,
+    )
+    assert plans() == [("Centauro", 1)]
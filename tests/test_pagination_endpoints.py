@@ -1,7 +1,11 @@
 from datetime import UTC, datetime
 
 import pytest
+from sqlalchemy import event
 
+from app.core.config import settings
+from app.core.etag import TRANSACTIONS, touch
+from app.core.pagination import clear_count_cache, paginate_query
 from app.models import Account, Budget, BudgetPeriod, Category, Transaction, User
 
 
@@ -110,3 +114,106 @@ class TestPagination:
         assert data["skip"] == 1
         assert data["limit"] == 1
         assert len(data["items"]) == 1
+
+
+def count_statements(db_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", before_cursor_execute)
+    return statements, lambda: event.remove(
+        db_session.get_bind(), "before_cursor_execute", before_cursor_execute
+    )
+
+
+def test_paginate_query_single_round_trip(db_session):
+    user = User(email="pager@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    account = create_account(db_session, user_id=user.id, name="Nubank")
+    for amount in [10.0, 20.0, 30.0]:
+        create_transaction(db_session, account_id=account.id, amount=amount)
+
+    query = db_session.query(Transaction).filter(Transaction.account_id == account.id)
+    statements, stop = count_statements(db_session)
+    try:
+        items, total = paginate_query(query, skip=1, limit=1)
+    finally:
+        stop()
+
+    assert total == 3
+    assert len(items) == 1
+    assert isinstance(items[0], Transaction)
+    assert len(statements) == 1
+
+    items, total = paginate_query(query, skip=5, limit=1)
+    assert items == []
+    assert total == 3
+
+
+def test_paginate_query_reuses_large_totals(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "pagination_exact_count_threshold", 2)
+    clear_count_cache()
+    user = User(email="pager@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    account = create_account(db_session, user_id=user.id, name="Nubank")
+    for amount in [10.0, 20.0, 30.0]:
+        create_transaction(db_session, account_id=account.id, amount=amount)
+
+    query = db_session.query(Transaction).filter(Transaction.account_id == account.id)
+    scope = {"user_id": user.id, "resources": (TRANSACTIONS,)}
+    # The first large total marks the scope; the next page caches it.
+    for _ in range(2):
+        _, total = paginate_query(query, skip=0, limit=2, **scope)
+        assert total == 3
+
+    create_transaction(db_session, account_id=account.id, amount=40.0)
+    statements, stop = count_statements(db_session)
+    try:
+        items, cached_total = paginate_query(query, skip=2, limit=2, **scope)
+    finally:
+        stop()
+
+    assert cached_total == 3
+    assert len(items) == 2
+    assert "OVER" not in statements[0]
+
+    # A write bumps the version in the key; the stale total is never read.
+    touch(db_session, user.id, TRANSACTIONS)
+    db_session.commit()
+    assert paginate_query(query, skip=0, limit=2, **scope)[1] == 4
+
+    monkeypatch.setattr(settings, "pagination_count_cache_max_entries", 1)
+    other = query.filter(Transaction.amount > 15.0)
+    assert paginate_query(other, skip=0, limit=2, **scope)[1] == 3
+    statements, stop = count_statements(db_session)
+    try:
+        # Evicted by the total of ``other``, so counted again.
+        assert paginate_query(query, skip=0, limit=2, **scope)[1] == 4
+    finally:
+        stop()
+        clear_count_cache()
+    assert "OVER" in statements[-1]
+
+
+def test_small_pages_skip_the_count_cache(db_session, monkeypatch):
+    clear_count_cache()
+    user = User(email="pager@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    account = create_account(db_session, user_id=user.id, name="Nubank")
+    create_transaction(db_session, account_id=account.id, amount=10.0)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("small lists must not read ETag versions")
+
+    monkeypatch.setattr("app.core.pagination.resource_versions", fail)
+    query = db_session.query(Transaction).filter(Transaction.account_id == account.id)
+    for _ in range(2):
+        _, total = paginate_query(
+            query, skip=0, limit=2, user_id=user.id, resources=(TRANSACTIONS,)
+        )
+        assert total == 1
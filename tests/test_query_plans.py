@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.models import Account, Budget, BudgetPeriod, Category, Transaction, User
+from app.modules.accounts.service import list_accounts
+from app.modules.budgets.service import (
+    get_budget_history,
+    get_budget_summaries,
+    get_budget_summary,
+    list_budgets,
+)
+from app.modules.categories.service import list_categories
+from app.modules.transactions.service import (
+    get_transaction,
+    list_transactions,
+    list_transactions_filtered,
+)
+
+
+@pytest.fixture
+def seeded(db_session):
+    start = datetime(2024, 1, 1)
+    users = []
+    for user_index in range(3):
+        user = User(email=f"plan{user_index}@example.com", password_hash="x")
+        db_session.add(user)
+        db_session.flush()
+        parent = Category(user_id=user.id, name="Alimentação")
+        db_session.add(parent)
+        db_session.flush()
+        child = Category(user_id=user.id, name="Mercado", parent_id=parent.id)
+        db_session.add(child)
+        db_session.flush()
+        accounts = []
+        for bank in ["Nubank", "Inter", "Itau"]:
+            account = Account(user_id=user.id, bank_name=bank, account_type="checking")
+            db_session.add(account)
+            accounts.append(account)
+        db_session.flush()
+        db_session.add_all(
+            Transaction(
+                user_id=user.id,
+                account_id=accounts[i % 3].id,
+                amount=float(i % 97),
+                category_id=child.id if i % 2 else parent.id,
+                transaction_date=start + timedelta(hours=7 * i),
+            )
+            for i in range(600)
+        )
+        budget = Budget(
+            user_id=user.id,
+            category_id=parent.id,
+            amount_limit=500.0,
+            period=BudgetPeriod.monthly,
+            start_date=start,
+        )
+        db_session.add(budget)
+        db_session.flush()
+        users.append((user, accounts, budget))
+    db_session.commit()
+    db_session.execute(text("ANALYZE"))
+    return users
+
+
+def capture(db_session, call):
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        captured.append((statement, parameters))
+
+    bind = db_session.get_bind()
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        call()
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def full_scans(db_session, captured, table):
+    scans = []
+    for statement, parameters in captured:
+        if table not in statement:
+            continue
+        cursor = db_session.connection().connection.cursor()
+        plan = cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        for row in plan:
+            detail = row[-1]
+            if detail.startswith(f"SCAN {table}") and "USING" not in detail:
+                scans.append(detail)
+    return scans
+
+
+def test_hot_queries_use_indexes(db_session, seeded):
+    user, accounts, budget = seeded[1]
+
+    queries = {
+        "accounts": capture(
+            db_session, lambda: list_accounts(db_session, user.id, skip=0, limit=50)
+        ),
+        "budgets": capture(
+            db_session, lambda: list_budgets(db_session, user.id, skip=0, limit=50)
+        ),
+        "categories": capture(
+            db_session, lambda: list_categories(db_session, user.id, skip=0, limit=50)
+        ),
+    }
+    queries["transactions"] = capture(
+        db_session,
+        lambda: list_transactions_filtered(
+            db_session,
+            user.id,
+            skip=0,
+            limit=50,
+            account_id=accounts[0].id,
+            start_date=datetime(2024, 2, 1),
+            end_date=datetime(2024, 3, 1),
+        ),
+    ) + capture(
+        db_session,
+        lambda: get_budget_summary(
+            db_session, user.id, budget.id, include_subcategories=False
+        ),
+    )
+
+    for table, captured in queries.items():
+        assert captured, table
+        assert full_scans(db_session, captured, table) == [], table
+
+
+def test_all_budget_summaries_use_one_transactions_query(db_session, seeded):
+    user, _, budget = seeded[0]
+    db_session.add(
+        Budget(
+            user_id=user.id,
+            category_id=budget.category_id,
+            amount_limit=100.0,
+            period=BudgetPeriod.weekly,
+            start_date=datetime(2024, 1, 1),
+        )
+    )
+    db_session.commit()
+
+    result = []
+    captured = capture(
+        db_session, lambda: result.extend(get_budget_summaries(db_session, user.id))
+    )
+    on_transactions = [item for item in captured if "transactions" in item[0]]
+    assert len(on_transactions) == 1
+    assert full_scans(db_session, on_transactions, "transactions") == []
+    assert result == [
+        get_budget_summary(db_session, user.id, item.budget_id, True) for item in result
+    ]
+
+
+def test_budget_history_uses_one_transactions_query(db_session, seeded):
+    user, _, budget = seeded[0]
+
+    result = []
+    captured = capture(
+        db_session,
+        lambda: result.append(get_budget_history(db_session, user.id, budget.id, 12)),
+    )
+    on_transactions = [item for item in captured if "transactions" in item[0]]
+    assert len(on_transactions) == 1
+    assert full_scans(db_session, on_transactions, "transactions") == []
+    assert len(result[0].items) == 12
+    assert result[0].items[-1].amount_spent == (
+        get_budget_summary(db_session, user.id, budget.id, True).amount_spent
+    )
+
+
+def test_user_scoped_transaction_reads_skip_account_join(db_session, seeded):
+    user, accounts, _ = seeded[2]
+    transaction_id = (
+        db_session.query(Transaction.id)
+        .filter(Transaction.account_id == accounts[1].id)
+        .limit(1)
+        .scalar()
+    )
+
+    captured = capture(
+        db_session, lambda: list_transactions(db_session, user.id, skip=0, limit=50)
+    ) + capture(
+        db_session,
+        lambda: get_transaction(db_session, user.id, transaction_id=transaction_id),
+    )
+
+    assert all("JOIN accounts" not in statement for statement, _ in captured)
+    assert full_scans(db_session, captured, "transactions") == []
+    assert db_session.get(Transaction, transaction_id).user_id == user.id
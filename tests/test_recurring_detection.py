@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.models import JobWatermark, Transaction
+from app.modules.recurring.detection import detect_recurring
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def charge(client, headers, account, merchant, amount, day):
+    response = client.post(
+        "/transactions/",
+        json={
+            "account_id": account["id"],
+            "amount": amount,
+            "merchant": merchant,
+            "transaction_date": f"{day}T10:00:00",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+
+def recurring(client, headers) -> list[dict]:
+    response = client.get("/recurring/", params={"active_only": False}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["items"]
+
+
+def test_monthly_charges_are_detected_incrementally(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "credit_card"},
+        headers=headers,
+    ).json()
+    for day, reference in (("2026-01-05", 8871), ("2026-02-05", 9120)):
+        charge(client, headers, account, f"NETFLIX.COM {reference}", 55.9, day)
+    charge(client, headers, account, "Netflix.com 9377", 55.9, "2026-03-06")
+    for day, amount in (
+        ("2026-01-02", 18.5),
+        ("2026-01-03", 42.0),
+        ("2026-02-20", 9.9),
+    ):
+        charge(client, headers, account, "Uber Trip", amount, day)
+
+    result = detect_recurring(db_session, batch_size=4)
+    assert result.transactions_scanned == 6
+    assert result.recurring_series == 1
+    [series] = recurring(client, headers)
+    assert series["cadence"] == "monthly"
+    assert series["occurrence_count"] == 3
+    assert series["next_expected_date"] == "2026-04-06"
+
+    charge(client, headers, account, "NETFLIX.COM 9501", 59.9, "2026-04-05")
+    assert detect_recurring(db_session).transactions_scanned == 1
+    [series] = recurring(client, headers)
+    assert series["occurrence_count"] == 4
+    assert series["last_amount"] == 59.9
+    assert series["next_expected_date"] == "2026-05-05"
+
+    # Backdated: the series is recounted from history instead of appended.
+    charge(client, headers, account, "NETFLIX.COM 8002", 55.9, "2025-12-05")
+    detect_recurring(db_session)
+    [series] = recurring(client, headers)
+    assert series["occurrence_count"] == 5
+    assert series["first_seen_at"] == "2025-12-05T10:00:00"
+    assert detect_recurring(db_session, full=True).transactions_scanned == 8
+    assert recurring(client, headers) == [series]
+
+    # Long past its expected date, so no longer active.
+    assert client.get("/recurring/", headers=headers).json()["total"] == 0
+    other = register_and_login(client, "other@example.com")
+    assert recurring(client, other) == []
+
+
+def test_late_commits_behind_the_watermark_are_picked_up(
+    client: TestClient, db_session
+):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "credit_card"},
+        headers=headers,
+    ).json()
+    for day in ("2026-01-05", "2026-02-05", "2026-03-05"):
+        charge(client, headers, account, "Spotify", 21.9, day)
+    detect_recurring(db_session)
+    watermark = db_session.get(JobWatermark, "recurring")
+    assert [series["occurrence_count"] for series in recurring(client, headers)] == [3]
+
+    # Stamped before the watermark but committed after the previous run.
+    charge(client, headers, account, "Spotify", 21.9, "2026-04-05")
+    db_session.query(Transaction).filter(
+        Transaction.transaction_date == datetime(2026, 4, 5, 10)
+    ).update({Transaction.created_at: watermark.last_created_at - timedelta(minutes=1)})
+    db_session.commit()
+
+    assert detect_recurring(db_session).transactions_scanned == 0
+    [series] = recurring(client, headers)
+    assert series["occurrence_count"] == 4
+    assert series["next_expected_date"] == "2026-05-05"
+    # Re-reading the overlap recounts instead of folding rows in twice.
+    detect_recurring(db_session)
+    assert recurring(client, headers) == [series]
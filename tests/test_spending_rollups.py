@@ -0,0 +1,110 @@
+from fastapi.testclient import TestClient
+
+from app.models import SpendingRollup
+from app.modules.analytics.rollups import rebuild_spending_rollups
+
+
+def register_and_login(client: TestClient, email: str) -> dict:
+    client.post("/auth/register", json={"email": email, "password": "secret"})
+    token_response = client.post(
+        "/auth/token", data={"username": email, "password": "secret"}
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def snapshot(db_session) -> set[tuple]:
+    db_session.expire_all()
+    return {
+        (
+            row.user_id,
+            row.account_id,
+            row.category_id,
+            row.month,
+            round(row.total_amount, 2),
+            row.transaction_count,
+            row.min_amount,
+            row.max_amount,
+        )
+        for row in db_session.query(SpendingRollup)
+    }
+
+
+def test_rollups_follow_every_write_and_match_rebuild(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    account = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "checking"},
+        headers=headers,
+    ).json()
+    food = client.post("/categories/", json={"name": "Food"}, headers=headers).json()
+    fuel = client.post("/categories/", json={"name": "Fuel"}, headers=headers).json()
+
+    def create(amount, date, category_id, transaction_type="purchase"):
+        response = client.post(
+            "/transactions/",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "transaction_date": date,
+                "category_id": category_id,
+                "transaction_type": transaction_type,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    small = create(10.0, "2026-01-05T10:00:00", food["id"])
+    create(25.0, "2026-01-20T10:00:00", food["id"])
+    large = create(40.0, "2026-01-25T10:00:00", food["id"])
+    create(1000.0, "2026-01-10T10:00:00", food["id"], transaction_type="deposit")
+    client.post(
+        "/transactions/bulk",
+        json={
+            "items": [
+                {
+                    "account_id": account["id"],
+                    "amount": 60.0,
+                    "transaction_date": "2026-02-02T10:00:00",
+                    "category_id": fuel["id"],
+                }
+            ]
+        },
+        headers=headers,
+    )
+
+    monthly = client.get(
+        "/analytics/monthly", params={"start_month": "2026-01"}, headers=headers
+    ).json()["items"]
+    january = next(item for item in monthly if item["month"] == "2026-01")
+    assert january["category_id"] == food["id"]
+    assert january["total_amount"] == 75.0
+    assert january["transaction_count"] == 3
+    assert (january["min_amount"], january["max_amount"]) == (10.0, 40.0)
+
+    # Moving the cheapest item out of the bucket forces a min recompute.
+    client.put(
+        f"/transactions/{small['id']}",
+        json={"category_id": fuel["id"], "transaction_date": "2026-02-10T10:00:00"},
+        headers=headers,
+    )
+    client.delete(f"/transactions/{large['id']}", headers=headers)
+
+    totals = client.get(
+        "/analytics/monthly", params={"by_category": "false"}, headers=headers
+    ).json()["items"]
+    assert [(item["month"], item["total_amount"]) for item in totals] == [
+        ("2026-01", 25.0),
+        ("2026-02", 70.0),
+    ]
+    assert totals[0]["min_amount"] == 25.0
+
+    incremental = snapshot(db_session)
+    rebuild_spending_rollups(db_session)
+    db_session.commit()
+    assert snapshot(db_session) == incremental
+
+    bad_month = client.get(
+        "/analytics/monthly", params={"start_month": "2026-13"}, headers=headers
+    )
+    assert bad_month.status_code == 422
@@ -0,0 +1,180 @@
+from fastapi.testclient import TestClient
+
+from app.modules.statement_import.parser import (
+    iter_csv_lines,
+    iter_ofx_lines,
+    parse_statement_amount,
+)
+
+CSV_STATEMENT = """Data;Descrição;Valor;Parcela
+01/02/2026;Uber Trip;-25,90;
+01/02/2026;Uber Trip;-25,90;
+03/02/2026;Salario;5.000,00;
+05/02/2026;Magalu;-120,00;2/10
+sem data;Loja;-1,00;
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260210120000[-3:BRT]<TRNAMT>-59.90<FITID>A1<NAME>NETFLIX.COM</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260211
+<TRNAMT>100.00
+<FITID>A2
+<MEMO>PIX RECEBIDO
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def register_and_login(client: TestClient) -> dict:
+    response = client.post(
+        "/auth/register",
+        json={"email": "user@example.com", "password": "secret"},
+    )
+    assert response.status_code == 201
+    token_response = client.post(
+        "/auth/token",
+        data={"username": "user@example.com", "password": "secret"},
+    )
+    assert token_response.status_code == 200
+    token = token_response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, headers: dict) -> dict:
+    response = client.post(
+        "/accounts/",
+        json={"bank_name": "Nubank", "account_type": "checking"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_parse_statement_amount_formats():
+    assert parse_statement_amount("1.234,56") == 1234.56
+    assert parse_statement_amount("1,234.56") == 1234.56
+    assert parse_statement_amount("R$ -10,00") == -10.0
+    assert parse_statement_amount("(12.50)") == -12.5
+
+
+def test_iter_csv_lines_maps_columns_and_reports_errors():
+    parsed = list(iter_csv_lines(CSV_STATEMENT.splitlines(keepends=True)))
+    assert len(parsed) == 5
+    assert parsed[0].merchant == "Uber Trip"
+    assert parsed[0].amount == -25.9
+    assert parsed[2].amount == 5000.0
+    assert (parsed[3].installments_current, parsed[3].installments_total) == (2, 10)
+    assert isinstance(parsed[4], ValueError)
+
+
+def test_iter_ofx_lines():
+    parsed = list(iter_ofx_lines(OFX_STATEMENT.splitlines(keepends=True)))
+    assert [line.external_id for line in parsed] == ["A1", "A2"]
+    assert parsed[0].amount == -59.9
+    assert parsed[0].merchant == "NETFLIX.COM"
+    assert parsed[0].transaction_date.hour == 12
+    assert parsed[1].is_credit
+    assert parsed[1].merchant == "PIX RECEBIDO"
+
+
+def test_upload_csv_statement_is_idempotent(client: TestClient):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+
+    def upload():
+        return client.post(
+            "/imports/statement",
+            data={"account_id": str(account["id"])},
+            files={"file": ("extrato.csv", CSV_STATEMENT.encode("utf-8"), "text/csv")},
+            headers=headers,
+        )
+
+    response = upload()
+    assert response.status_code == 200
+    result = response.json()
+    assert result["format"] == "csv"
+    assert result["imported"] == 4
+    assert result["failed"] == 1
+    assert result["duplicates"] == 0
+
+    again = upload().json()
+    assert again["imported"] == 0
+    assert again["duplicates"] == 4
+
+    items = client.get("/transactions/", headers=headers).json()["items"]
+    assert len(items) == 4
+    assert all(item["amount"] > 0 for item in items)
+    types = sorted(item["transaction_type"] for item in items)
+    assert types == ["deposit", "purchase", "purchase", "purchase"]
+
+
+def test_upload_ofx_statement(client: TestClient):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+
+    response = client.post(
+        "/imports/statement",
+        data={"account_id": str(account["id"])},
+        files={"file": ("extrato.ofx", OFX_STATEMENT.encode("latin-1"), "text/plain")},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["format"] == "ofx"
+    assert response.json()["imported"] == 2
+
+
+def test_upload_statement_rejects_unknown_account(client: TestClient):
+    headers = register_and_login(client)
+    response = client.post(
+        "/imports/statement",
+        data={"account_id": "999"},
+        files={"file": ("extrato.csv", CSV_STATEMENT.encode("utf-8"), "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 404
+
+
+def test_repeat_counter_stays_bounded(client: TestClient, monkeypatch):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+    monkeypatch.setattr("app.modules.statement_import.service.MAX_TRACKED_LINES", 2)
+
+    def upload(rows):
+        statement = "Data;Estabelecimento;Valor\n" + "".join(
+            f"{day}/03/2026;{merchant};-10,00\n" for day, merchant in rows
+        )
+        return client.post(
+            "/imports/statement",
+            data={"account_id": str(account["id"])},
+            files={"file": ("extrato.csv", statement.encode("utf-8"), "text/csv")},
+            headers=headers,
+        )
+
+    # Date order lets the counter forget the days it has left.
+    in_order = [("01", "Cafe"), ("01", "Cafe"), ("02", "Bar"), ("03", "Cafe")]
+    in_order += [("03", "Cafe"), ("04", "Bar")]
+    assert upload(in_order).json()["imported"] == 6
+    assert upload(in_order).json()["duplicates"] == 6
+
+    out_of_order = [("10", "Cafe"), ("12", "Bar"), ("11", "Cafe"), ("13", "Bar")]
+    response = upload(out_of_order)
+    assert response.status_code == 400
+    assert "date order" in response.json()["detail"]
+
+
+def test_upload_statement_rejects_non_object_column_map(client: TestClient):
+    headers = register_and_login(client)
+    account = create_account(client, headers)
+    for column_map in ("[1]", '"merchant"', '{"merchant": 1}'):
+        response = client.post(
+            "/imports/statement",
+            data={"account_id": str(account["id"]), "column_map": column_map},
+            files={"file": ("extrato.csv", CSV_STATEMENT.encode("utf-8"), "text/csv")},
+            headers=headers,
+        )
+        assert response.status_code == 400
@@ -0,0 +1,22 @@
+from datetime import date
+
+from app.modules.transactions.partitions import (
+    ensure_transaction_partitions,
+    partition_ranges,
+)
+
+
+def test_partition_ranges_cover_whole_intervals():
+    assert partition_ranges(date(2025, 11, 20), date(2026, 1, 3), "month") == [
+        ("transactions_p2025_11", date(2025, 11, 1), date(2025, 12, 1)),
+        ("transactions_p2025_12", date(2025, 12, 1), date(2026, 1, 1)),
+        ("transactions_p2026_01", date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+    assert partition_ranges(date(2025, 6, 1), date(2026, 2, 1), "year") == [
+        ("transactions_p2025", date(2025, 1, 1), date(2026, 1, 1)),
+        ("transactions_p2026", date(2026, 1, 1), date(2027, 1, 1)),
+    ]
+
+
+def test_ensure_partitions_is_a_noop_without_postgres(db_session):
+    assert ensure_transaction_partitions(db_session, interval="month") == []
@@ -1,7 +1,12 @@
+import gzip
+import json
 from datetime import UTC, datetime, timedelta
 
 from fastapi.testclient import TestClient
 
+from app.models import Transaction
+from app.modules.transactions.dedup import backfill_fingerprints
+
 
 def register_and_login(client: TestClient, email: str) -> dict:
     response = client.post(
@@ -130,3 +135,454 @@ def test_transaction_account_ownership(client: TestClient):
         headers=headers_user1,
     )
     assert create_response.status_code == 404
+
+
+def test_transaction_bulk_create(client: TestClient):
+    headers_user1 = register_and_login(client, "user1@example.com")
+    headers_user2 = register_and_login(client, "user2@example.com")
+    account = create_account(client, headers_user1, "Nubank")
+    foreign_account = create_account(client, headers_user2, "Inter")
+
+    items = [
+        {"account_id": account["id"], "amount": 10.0, "merchant": "Uber Trip"},
+        {"account_id": foreign_account["id"], "amount": 20.0, "merchant": "Loja"},
+        {"account_id": account["id"], "amount": 30.0, "merchant": "Uber Trip"},
+    ]
+    response = client.post(
+        "/transactions/bulk", json={"items": items}, headers=headers_user1
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    statuses = [result["status"] for result in data["results"]]
+    assert statuses == ["created", "error", "created"]
+
+    created_ids = [result["transaction_id"] for result in data["results"][::2]]
+    first = client.get(f"/transactions/{created_ids[0]}", headers=headers_user1)
+    second = client.get(f"/transactions/{created_ids[1]}", headers=headers_user1)
+    assert first.json()["amount"] == 10.0
+    assert second.json()["amount"] == 30.0
+    assert first.json()["category_id"] is not None
+    assert first.json()["category_id"] == second.json()["category_id"]
+
+    empty = client.post("/transactions/bulk", json={"items": []}, headers=headers_user1)
+    assert empty.status_code == 422
+
+
+def test_transaction_export_streams_csv_and_ndjson(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    other_account = create_account(client, headers, "Inter")
+    for account_id, amount in [
+        (account["id"], 10.0),
+        (account["id"], 20.0),
+        (other_account["id"], 30.0),
+    ]:
+        response = client.post(
+            "/transactions/",
+            json={"account_id": account_id, "amount": amount, "merchant": "Loja"},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    csv_response = client.get("/transactions/export", headers=headers)
+    assert csv_response.status_code == 200
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    lines = csv_response.text.strip().splitlines()
+    assert lines[0].startswith("id,account_id,amount")
+    assert len(lines) == 4
+
+    ndjson_response = client.get(
+        "/transactions/export",
+        params={"format": "ndjson", "account_id": account["id"]},
+        headers=headers,
+    )
+    assert ndjson_response.status_code == 200
+    records = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert sorted(record["amount"] for record in records) == [10.0, 20.0]
+
+    gzip_response = client.get(
+        "/transactions/export", params={"gzip": "true"}, headers=headers
+    )
+    assert gzip_response.status_code == 200
+    assert gzip_response.headers["content-type"] == "application/gzip"
+    assert len(gzip.decompress(gzip_response.content).splitlines()) == 4
+
+
+def test_transaction_search(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    other_headers = register_and_login(client, "other@example.com")
+    account = create_account(client, headers, "Nubank")
+    other_account = create_account(client, other_headers, "Inter")
+    for merchant, description in [
+        ("IFOOD *RESTAURANTE", "Pedido jantar"),
+        ("Posto Shell", "Combustível"),
+        ("Posto Ipiranga", None),
+        ("Mercado", "compra no ifood mercado"),
+    ]:
+        client.post(
+            "/transactions/",
+            json={
+                "account_id": account["id"],
+                "amount": 10.0,
+                "merchant": merchant,
+                "description": description,
+            },
+            headers=headers,
+        )
+    client.post(
+        "/transactions/",
+        json={"account_id": other_account["id"], "amount": 5.0, "merchant": "iFood"},
+        headers=other_headers,
+    )
+
+    response = client.get("/transactions/", params={"q": "ifood"}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert {item["merchant"] for item in data["items"]} == {
+        "IFOOD *RESTAURANTE",
+        "Mercado",
+    }
+
+    response = client.get(
+        "/transactions/", params={"q": "posto shell"}, headers=headers
+    )
+    merchants = [item["merchant"] for item in response.json()["items"]]
+    assert merchants[0] == "Posto Shell"
+    assert "Posto Ipiranga" in merchants
+
+    typo = client.get("/transactions/", params={"q": "combustivel"}, headers=headers)
+    assert [item["merchant"] for item in typo.json()["items"]] == ["Posto Shell"]
+
+    created = client.post(
+        "/transactions/",
+        json={"account_id": account["id"], "amount": 7.0, "merchant": "Shell Select"},
+        headers=headers,
+    ).json()
+    response = client.get("/transactions/", params={"q": "shell"}, headers=headers)
+    assert created["id"] in [item["id"] for item in response.json()["items"]]
+
+    client.delete(f"/transactions/{created['id']}", headers=headers)
+    response = client.get("/transactions/", params={"q": "shell"}, headers=headers)
+    assert response.json()["total"] == 1
+
+
+def test_transaction_duplicates_are_detected(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    payload = {
+        "account_id": account["id"],
+        "amount": 42.5,
+        "merchant": "Padaria Real",
+        "transaction_date": "2026-03-10T09:00:00",
+    }
+
+    first = client.post("/transactions/", json=payload, headers=headers)
+    assert first.status_code == 200
+    assert first.json()["possible_duplicate_of"] is None
+
+    # A second purchase later that day is real, only flagged.
+    later = {**payload, "transaction_date": "2026-03-10T18:00:00"}
+    repeated = client.post("/transactions/", json=later, headers=headers)
+    assert repeated.status_code == 200
+    assert repeated.json()["possible_duplicate_of"] == first.json()["id"]
+
+    # So is a near match two days later, with a different spelling.
+    nearby = {
+        **payload,
+        "merchant": "PADARIA REAL LTDA",
+        "transaction_date": "2026-03-12T00:00:00",
+    }
+    response = client.post(
+        "/transactions/bulk",
+        json={"items": [nearby, {**payload, "merchant": "Padaria Nova"}]},
+        headers=headers,
+    )
+    data = response.json()
+    assert [result["status"] for result in data["results"]] == [
+        "created",
+        "created",
+    ]
+    assert data["duplicates"] == 0
+    assert [result["possible_duplicate_of"] for result in data["results"]] == [
+        first.json()["id"],
+        None,
+    ]
+
+    # The statement line of the same day repeats a manual entry exactly.
+    statement = (
+        "Data;Estabelecimento;Valor\n"
+        "10/03/2026;Padaria Real;-42,50\n"
+        "14/03/2026;Padaria Real;-42,50\n"
+    )
+    imported = client.post(
+        "/imports/statement",
+        data={"account_id": str(account["id"])},
+        files={"file": ("extrato.csv", statement.encode("utf-8"), "text/csv")},
+        headers=headers,
+    ).json()
+    assert imported["imported"] == 1
+    assert imported["duplicates"] == 1
+    assert imported["possible_duplicates"] == 1
+
+    imported_line = {**payload, "transaction_date": "2026-03-14T12:00:00"}
+    refused = client.post("/transactions/", json=imported_line, headers=headers)
+    assert refused.status_code == 409
+    forced = client.post(
+        "/transactions/",
+        params={"allow_duplicate": "true"},
+        json=imported_line,
+        headers=headers,
+    )
+    assert forced.status_code == 200
+
+
+def test_merge_duplicate_transactions(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    statement = "Data;Estabelecimento;Valor\n11/03/2026;Uber Trip;-18,90\n"
+    client.post(
+        "/imports/statement",
+        data={"account_id": str(account["id"])},
+        files={"file": ("extrato.csv", statement.encode("utf-8"), "text/csv")},
+        headers=headers,
+    )
+    payload = {
+        "account_id": account["id"],
+        "amount": 18.9,
+        "merchant": "UBER *TRIP",
+        "transaction_date": "2026-03-10T22:00:00",
+        "card_last4": "1234",
+    }
+    for _ in range(2):
+        response = client.post(
+            "/transactions/",
+            params={"allow_duplicate": "true"},
+            json=payload,
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    preview = client.post(
+        "/transactions/duplicates/merge",
+        params={"dry_run": "true"},
+        headers=headers,
+    ).json()
+    # Two manual entries may be two real rides; only import + manual merge.
+    assert preview["groups_found"] == 1
+    assert preview["transactions_removed"] == 1
+    assert client.get("/transactions/", headers=headers).json()["total"] == 3
+
+    merged = client.post("/transactions/duplicates/merge", headers=headers).json()
+    assert merged["groups"] == preview["groups"]
+    items = client.get("/transactions/", headers=headers).json()["items"]
+    assert len(items) == 2
+    keeper = next(item for item in items if item["id"] == merged["groups"][0][0])
+    assert keeper["merchant"] == "Uber Trip"
+    assert keeper["card_last4"] == "1234"
+
+
+def test_backfill_fingerprints_in_batches(client: TestClient, db_session):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    for day in range(1, 6):
+        response = client.post(
+            "/transactions/",
+            json={
+                "account_id": account["id"],
+                "amount": 10 + day,
+                "merchant": "Padaria",
+                "transaction_date": f"2026-03-0{day}T12:00:00",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+    db_session.query(Transaction).update({Transaction.fingerprint: None})
+    db_session.commit()
+
+    assert backfill_fingerprints(db_session, batch_size=2) == 5
+    db_session.commit()
+    assert (
+        db_session.query(Transaction).filter(Transaction.fingerprint.is_(None)).count()
+        == 0
+    )
+    assert backfill_fingerprints(db_session, batch_size=2) == 0
+
+
+def test_transaction_list_matches_detail_serialization(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    created = client.post(
+        "/transactions/",
+        json={
+            "account_id": account["id"],
+            "amount": 129.9,
+            "merchant": "Magazine Luiza",
+            "transaction_date": "2026-02-04T10:15:30.250000",
+            "transaction_type": "purchase",
+            "payment_method": "credit_card",
+            "card_last4": "1234",
+            "installments_total": 10,
+            "installments_current": 1,
+        },
+        headers=headers,
+    ).json()
+
+    assert created.pop("possible_duplicate_of") is None
+
+    listing = client.get("/transactions/", headers=headers)
+    assert listing.headers["content-type"] == "application/json"
+    assert listing.json()["items"] == [created]
+    assert listing.json()["total"] == 1
+
+    etag = listing.headers["etag"]
+    cached = client.get("/transactions/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_list_sparse_fieldsets(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    account = create_account(client, headers, "Nubank")
+    created = client.post(
+        "/transactions/",
+        json={
+            "account_id": account["id"],
+            "amount": 42.0,
+            "merchant": "Padaria Real",
+            "transaction_date": "2026-02-04T10:00:00",
+        },
+        headers=headers,
+    ).json()
+
+    response = client.get(
+        "/transactions/",
+        params={"fields": "amount,merchant,transaction_date"},
+        headers=headers,
+    )
+    assert response.json()["items"] == [
+        {
+            "id": created["id"],
+            "amount": 42.0,
+            "merchant": "Padaria Real",
+            "transaction_date": "2026-02-04T10:00:00",
+        }
+    ]
+    searched = client.get(
+        "/transactions/",
+        params={"q": "padaria", "fields": "merchant"},
+        headers=headers,
+    )
+    assert searched.json()["items"] == [
+        {"id": created["id"], "merchant": "Padaria Real"}
+    ]
+    filtered = client.get(
+        "/transactions/",
+        params={"account_id": account["id"], "fields": "id"},
+        headers=headers,
+    )
+    assert filtered.json()["items"] == [{"id": created["id"]}]
+
+    invalid = client.get(
+        "/transactions/", params={"fields": "amount,import_hash"}, headers=headers
+    )
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"] == "Unknown fields: import_hash"
+
+    accounts = client.get(
+        "/accounts/", params={"fields": "bank_name,last_balance"}, headers=headers
+    )
+    assert accounts.json()["items"] == [
+        {"id": account["id"], "bank_name": "Nubank", "last_balance": -42.0}
+    ]
+
+
+def test_transaction_bulk_update(client: TestClient):
+    headers = register_and_login(client, "user@example.com")
+    other_headers = register_and_login(client, "other@example.com")
+    account = create_account(client, headers, "Nubank")
+    other_account = create_account(client, other_headers, "Inter")
+    transport = client.post(
+        "/categories/", json={"name": "Transporte"}, headers=headers
+    ).json()
+    foreign_category = client.post(
+        "/categories/", json={"name": "Alheia"}, headers=other_headers
+    ).json()
+
+    def create(headers, account_id, merchant, date):
+        return client.post(
+            "/transactions/",
+            json={
+                "account_id": account_id,
+                "amount": 20.0,
+                "merchant": merchant,
+                "transaction_date": date,
+            },
+            headers=headers,
+        ).json()
+
+    create(headers, account["id"], "UBER *TRIP", "2026-01-10T10:00:00")
+    create(headers, account["id"], "Uber Eats", "2026-02-10T10:00:00")
+    create(headers, account["id"], "Padaria", "2026-02-11T10:00:00")
+    foreign = create(other_headers, other_account["id"], "UBER", "2026-02-10T10:00")
+
+    response = client.patch(
+        "/transactions/bulk",
+        json={
+            "filter": {"merchant_contains": "uber"},
+            "changes": {"category_id": transport["id"]},
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated": 2}
+
+    listed = client.get(
+        "/transactions/", params={"category_id": transport["id"]}, headers=headers
+    ).json()
+    assert sorted(item["merchant"] for item in listed["items"]) == [
+        "UBER *TRIP",
+        "Uber Eats",
+    ]
+    untouched = client.get(f"/transactions/{foreign['id']}", headers=other_headers)
+    assert untouched.json()["category_id"] != transport["id"]
+
+    monthly = client.get(
+        "/analytics/monthly", params={"start_month": "2026-01"}, headers=headers
+    ).json()["items"]
+    assert {
+        (item["month"], item["category_id"])
+        for item in monthly
+        if item["category_id"] == transport["id"]
+    } == {("2026-01", transport["id"]), ("2026-02", transport["id"])}
+
+    renamed = client.patch(
+        "/transactions/bulk",
+        json={
+            "filter": {
+                "start_date": "2026-02-01T00:00:00",
+                "account_id": account["id"],
+            },
+            "changes": {"description": "fevereiro"},
+        },
+        headers=headers,
+    )
+    assert renamed.json() == {"updated": 2}
+
+    forbidden = client.patch(
+        "/transactions/bulk",
+        json={
+            "filter": {"merchant_contains": "padaria"},
+            "changes": {"category_id": foreign_category["id"]},
+        },
+        headers=headers,
+    )
+    assert forbidden.status_code == 404
+
+    unfiltered = client.patch(
+        "/transactions/bulk",
+        json={"filter": {}, "changes": {"description": "tudo"}},
+        headers=headers,
+    )
+    assert unfiltered.status_code == 400